@@ -1,9 +1,19 @@
 import pandas as pd
 from tkinter import filedialog, messagebox
+from ingestion import FileIngestor, IngestionCache, DEFAULT_WORKERS, HAS_PYARROW, optimize_dtypes
 
 # Global variables
 selected_files = []
 merged_df = None
+# Parsed-file cache shared by every process_files call (None until first used or without pyarrow)
+ingestion_cache = None
+
+def get_ingestion_cache():
+    """Return the shared parsed-file cache, or None if pyarrow is not installed."""
+    global ingestion_cache
+    if ingestion_cache is None and HAS_PYARROW:
+        ingestion_cache = IngestionCache()
+    return ingestion_cache
 
 def select_files(file_selection_var, file_list_var):
     file_type = file_selection_var.get()
@@ -26,7 +36,9 @@ def select_files(file_selection_var, file_list_var):
             selected_files.append(folder)
             file_list_var.set(folder)
 
-def process_files(delimiter_var, remove_spaces_var, ignore_special_chars_var, pivot_button, assign_headers_screen):
+def process_files(delimiter_var, remove_spaces_var, ignore_special_chars_var, pivot_button, assign_headers_screen,
+                  workers_var=None):
+    """Read and merge the selected files; returns the memory report of the type optimization."""
     global merged_df
     if not selected_files:
         messagebox.showerror("Error", "No files or folder selected!")
@@ -37,35 +49,27 @@ def process_files(delimiter_var, remove_spaces_var, ignore_special_chars_var, pi
     ignore_special_chars = ignore_special_chars_var.get()
 
     try:
-        dataframes = []
-        for file in selected_files:
-            if file.endswith(".csv"):
-                df = pd.read_csv(file, delimiter=delimiter)
-            elif file.endswith(".xlsx"):
-                df = pd.read_excel(file)
-            else:
-                continue
-
-            # Apply cleaning options
-            if remove_spaces:
-                df.columns = df.columns.str.strip()
-            if ignore_special_chars:
-                df.columns = df.columns.str.replace(r'[^\w\s]', '', regex=True)
+        ingestor = FileIngestor(max_workers=int(workers_var.get()) if workers_var else DEFAULT_WORKERS,
+                                cache=get_ingestion_cache())
+        dataframes = ingestor.read_files(selected_files, delimiter, remove_spaces, ignore_special_chars)
 
-            dataframes.append(df)
+        if ingestor.errors:
+            failed = "\n".join(f"{file}: {error}" for file, error in ingestor.errors.items())
+            messagebox.showwarning("Warning", f"Some files could not be read:\n{failed}")
 
         if not dataframes:
             messagebox.showerror("Error", "No valid files found!")
             return
 
-        # Merge all DataFrames
-        merged_df = pd.concat(dataframes, ignore_index=True)
+        # Merge all DataFrames and shrink them to compact dtypes
+        merged_df, report = optimize_dtypes(pd.concat(dataframes, ignore_index=True))
 
         # Enable the Pivot Table Button
         pivot_button.config(state="normal")
 
         # Open header assignment screen
         assign_headers_screen(merged_df)
+        return report
 
     except Exception as e:
         messagebox.showerror("Error", f"Failed to process files: {e}")
@@ -0,0 +1,565 @@
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.subplots as sp
+import numpy as np
+from downsampling import downsample, DEFAULT_MAX_POINTS
+from type_detection import ColumnTypeProfiler
+from correlation import correlation_pairs, compute_correlation, cluster_order, strongest_columns, top_k_per_column
+from ingestion import DEFAULT_WORKERS
+from reports import write_report, REPORT_DIR
+
+# Wider correlation selections show only the most correlated columns in the heatmap
+MAX_HEATMAP_COLUMNS = 50
+
+ANALYSIS_TYPES = {
+    "time_series": "generate_time_series_analysis",
+    "category": "generate_category_analysis",
+    "correlation": "generate_correlation_analysis",
+    "distribution": "generate_distribution_analysis",
+    "comparative": "generate_comparative_analysis",
+    "trend": "generate_trend_analysis",
+    "dashboard": "build_smart_dashboard"
+}
+
+
+class ReportGenerator:
+    """Builds the analysis reports for a DataFrame and writes them to disk.
+
+    Nothing here touches Tk, so reports can be generated from the GUI's
+    worker threads as well as from the headless command line.
+    """
+
+    def __init__(self, df, output_dir=REPORT_DIR):
+        self.aggregate_cache = {}
+        self.type_profiler = None
+        self.df = df
+        self.output_dir = output_dir
+        self.max_points = DEFAULT_MAX_POINTS
+        self.downsample_method = "lttb"
+        self.compress_reports = False
+
+    @property
+    def df(self):
+        return self._df
+
+    @df.setter
+    def df(self, df):
+        # Aggregates of the previous DataFrame must not be served for the new one
+        self._df = df
+        self.clear_aggregate_cache()
+
+    def generate(self, analysis, **kwargs):
+        """Generate an analysis by its short name (see ANALYSIS_TYPES) and return the output file."""
+        if analysis not in ANALYSIS_TYPES:
+            raise ValueError(f"Unknown analysis: {analysis}")
+        return getattr(self, ANALYSIS_TYPES[analysis])(**kwargs)
+
+    def downsample_trace(self, x, y):
+        """Sort a trace by x and reduce it to the configured point budget."""
+        return downsample(x, y, self.max_points, self.downsample_method)
+
+    def points_note(self, n_rows):
+        """Title note giving the original row count behind downsampled traces."""
+        if n_rows > self.max_points:
+            return f"{n_rows:,} rows, line traces downsampled to {self.max_points:,} points"
+        return f"{n_rows:,} rows"
+
+    def get_category_aggregates(self, category_col, value_col):
+        """Per-category aggregates of a value column, computed in one groupby pass.
+
+        Every aggregate is a plain sum, count, min or max, so partial results
+        of row chunks could be merged. The squared deviations from each
+        category's mean ('m2', from which std is derived) come from sums of
+        the values shifted by the column mean, which avoids the cancellation
+        of raw sums of squares on large, tightly spread values. 'rows' counts
+        a category's rows, including missing values. Results are cached per
+        column pair until self.df is replaced; call clear_aggregate_cache
+        after changing it in place.
+        """
+        key = (category_col, value_col)
+        cube = self.aggregate_cache.get(key)
+        if cube is None:
+            values = self.df[value_col].astype('float64')
+            shift = values.mean()
+            shifted = values - (0.0 if np.isnan(shift) else shift)
+            cube = pd.DataFrame({'category': self.df[category_col], 'value': values, 'shifted': shifted,
+                                 'squared': shifted * shifted}).groupby('category', observed=True).agg(
+                rows=('value', 'size'),
+                count=('value', 'count'),
+                sum=('value', 'sum'),
+                min=('value', 'min'),
+                max=('value', 'max'),
+                shifted=('shifted', 'sum'),
+                squared=('squared', 'sum')
+            )
+            cube.index.name = category_col
+            count = cube['count'].where(cube['count'] > 0)
+            cube['mean'] = cube['sum'] / count
+            cube['m2'] = (cube.pop('squared') - (cube.pop('shifted') ** 2 / count).fillna(0)).clip(lower=0)
+            cube['std'] = np.sqrt(cube['m2'] / (count - 1).where(count > 1))
+            self.aggregate_cache[key] = cube
+        return cube
+
+    def clear_aggregate_cache(self):
+        """Drop cached aggregates, e.g. after the DataFrame was modified in place."""
+        self.aggregate_cache.clear()
+
+    def generate_time_series_analysis(self, date_col, value_col):
+        """Generate time series analysis with multiple visualizations."""
+        # Convert date column to datetime, in date order so moving averages follow time
+        df = self.df[[date_col, value_col]].copy()
+        df[date_col] = self.get_type_profiler().to_datetime(date_col)
+        df = df.sort_values(date_col, kind="stable")
+        
+        # Create subplots
+        fig = sp.make_subplots(rows=2, cols=2, 
+                              subplot_titles=("Time Series", "Monthly Trend", 
+                                            "Yearly Trend", "Moving Average"))
+
+        # Time Series Plot
+        x, y = self.downsample_trace(df[date_col], df[value_col])
+        fig.add_trace(
+            go.Scatter(x=x, y=y, mode='lines+markers', name='Time Series'),
+            row=1, col=1
+        )
+
+        # Monthly Trend
+        monthly = df.groupby(df[date_col].dt.to_period('M'))[value_col].mean()
+        fig.add_trace(
+            go.Bar(x=monthly.index.astype(str), y=monthly.values, name='Monthly Average'),
+            row=1, col=2
+        )
+
+        # Yearly Trend
+        yearly = df.groupby(df[date_col].dt.year)[value_col].mean()
+        fig.add_trace(
+            go.Bar(x=yearly.index, y=yearly.values, name='Yearly Average'),
+            row=2, col=1
+        )
+
+        # Moving Average
+        window = 7
+        df['MA'] = df[value_col].rolling(window=window).mean()
+        x, y = self.downsample_trace(df[date_col], df['MA'])
+        fig.add_trace(
+            go.Scatter(x=x, y=y, mode='lines', name=f'{window}-day MA'),
+            row=2, col=2
+        )
+
+        # Update layout
+        fig.update_layout(height=800, width=1200,
+                          title_text=f"Time Series Analysis ({self.points_note(len(df))})")
+        
+        # Save the report
+        output_file = write_report(fig, 'time_series_analysis', directory=self.output_dir,
+                                   compress=self.compress_reports)
+        return output_file
+
+    def generate_category_analysis(self, category_col, value_col):
+        """Generate category analysis with multiple visualizations."""
+        # Create subplots
+        fig = sp.make_subplots(rows=2, cols=2, 
+                              subplot_titles=("Category Distribution", "Category Comparison",
+                                            "Top Categories", "Category Statistics"))
+
+        # All grouped statistics come from one aggregation pass
+        cube = self.get_category_aggregates(category_col, value_col)
+
+        # Category Distribution
+        counts = cube['rows'].sort_values(ascending=False, kind="stable")
+        fig.add_trace(
+            go.Bar(x=counts.index,
+                  y=counts.values,
+                  name='Distribution'),
+            row=1, col=1
+        )
+
+        # Category Comparison
+        category_means = cube['mean']
+        fig.add_trace(
+            go.Bar(x=category_means.index, y=category_means.values, name='Mean Values'),
+            row=1, col=2
+        )
+
+        # Top Categories
+        top_categories = cube['sum'].nlargest(10)
+        fig.add_trace(
+            go.Bar(x=top_categories.index, y=top_categories.values, name='Top Categories'),
+            row=2, col=1
+        )
+
+        # Category Statistics
+        fig.add_trace(
+            go.Box(x=self.df[category_col], y=self.df[value_col], name='Statistics'),
+            row=2, col=2
+        )
+
+        # Update layout
+        fig.update_layout(height=800, width=1200, title_text="Category Analysis")
+        
+        # Save the report
+        output_file = write_report(fig, 'category_analysis', directory=self.output_dir,
+                                   compress=self.compress_reports)
+        return output_file
+
+    def generate_correlation_analysis(self, selected_columns, method="pearson"):
+        """Generate correlation analysis."""
+        # Calculate correlation matrix in column blocks
+        corr_matrix = compute_correlation(self.df, selected_columns, method=method,
+                                          max_workers=DEFAULT_WORKERS)
+
+        # Wide selections only show their most correlated columns
+        shown = selected_columns
+        if len(selected_columns) > MAX_HEATMAP_COLUMNS:
+            shown = strongest_columns(corr_matrix, MAX_HEATMAP_COLUMNS)
+        # Cluster so correlated columns sit next to each other
+        order = cluster_order(corr_matrix.loc[shown, shown])
+        heatmap = go.Heatmap(
+            z=corr_matrix.loc[order, order],
+            x=order,
+            y=order,
+            colorscale='RdBu',
+            zmin=-1,
+            zmax=1
+        )
+
+        title = f'Correlation Analysis ({method.capitalize()})'
+        if len(shown) < len(selected_columns):
+            # Create correlation heatmap with each column's strongest partners below it
+            fig = sp.make_subplots(rows=2, cols=1, row_heights=[0.7, 0.3],
+                                   specs=[[{}], [{"type": "table"}]],
+                                   subplot_titles=(f"{len(shown)} of {len(selected_columns)} columns",
+                                                   "Top Correlations per Column"))
+            fig.add_trace(heatmap, row=1, col=1)
+            top = top_k_per_column(corr_matrix, k=3)
+            fig.add_trace(
+                go.Table(
+                    header=dict(values=['Column', 'Partner', 'Correlation']),
+                    cells=dict(values=[top['column'], top['partner'], top['correlation'].round(3)])
+                ),
+                row=2, col=1
+            )
+            height = 1200
+        else:
+            # Create correlation heatmap
+            fig = go.Figure(data=heatmap)
+            height = 800
+
+        # Update layout
+        fig.update_layout(
+            title=title,
+            height=height,
+            width=1200
+        )
+
+        # Save the report
+        output_file = write_report(fig, 'correlation_analysis', directory=self.output_dir,
+                                   compress=self.compress_reports)
+        return output_file
+
+    def generate_distribution_analysis(self, column):
+        """Generate distribution analysis."""
+        # Create subplots
+        fig = sp.make_subplots(rows=2, cols=2, 
+                              subplot_titles=("Histogram", "Box Plot",
+                                            "Density Plot", "Q-Q Plot"))
+
+        # Histogram
+        fig.add_trace(
+            go.Histogram(x=self.df[column], name='Histogram'),
+            row=1, col=1
+        )
+
+        # Box Plot
+        fig.add_trace(
+            go.Box(y=self.df[column], name='Box Plot'),
+            row=1, col=2
+        )
+
+        # Density Plot
+        fig.add_trace(
+            go.Histogram(x=self.df[column], histnorm='probability density', name='Density'),
+            row=2, col=1
+        )
+
+        # Q-Q Plot
+        sorted_data = np.sort(self.df[column].dropna())
+        theoretical_quantiles = np.percentile(sorted_data, np.linspace(0, 100, len(sorted_data)))
+        fig.add_trace(
+            go.Scatter(x=theoretical_quantiles, y=sorted_data, mode='markers', name='Q-Q Plot'),
+            row=2, col=2
+        )
+
+        # Update layout
+        fig.update_layout(height=800, width=1200, title_text="Distribution Analysis")
+        
+        # Save the report
+        output_file = write_report(fig, 'distribution_analysis', directory=self.output_dir,
+                                   compress=self.compress_reports)
+        return output_file
+
+    def generate_comparative_analysis(self, category_col, value_col):
+        """Generate comparative analysis."""
+        # Create subplots
+        fig = sp.make_subplots(rows=2, cols=2, 
+                              subplot_titles=("Category Comparison", "Category Distribution",
+                                            "Category Statistics", "Category Trends"),
+                              specs=[[{}, {}], [{"type": "table"}, {}]])
+
+        # All grouped statistics come from one aggregation pass
+        cube = self.get_category_aggregates(category_col, value_col)
+
+        # Category Comparison
+        category_means = cube['mean']
+        fig.add_trace(
+            go.Bar(x=category_means.index, y=category_means.values, name='Mean Values'),
+            row=1, col=1
+        )
+
+        # Category Distribution
+        fig.add_trace(
+            go.Box(x=self.df[category_col], y=self.df[value_col], name='Distribution'),
+            row=1, col=2
+        )
+
+        # Category Statistics
+        stats = cube[['mean', 'std', 'min', 'max']]
+        fig.add_trace(
+            go.Table(
+                header=dict(values=['Category'] + list(stats.columns)),
+                cells=dict(values=[stats.index] + [stats[col] for col in stats.columns])
+            ),
+            row=2, col=1
+        )
+
+        # Category Trends
+        if pd.api.types.is_datetime64_any_dtype(self.df[category_col]):
+            trend = cube['mean']
+            fig.add_trace(
+                go.Scatter(x=trend.index, y=trend.values, mode='lines+markers', name='Trend'),
+                row=2, col=2
+            )
+
+        # Update layout
+        fig.update_layout(height=800, width=1200, title_text="Comparative Analysis")
+        
+        # Save the report
+        output_file = write_report(fig, 'comparative_analysis', directory=self.output_dir,
+                                   compress=self.compress_reports)
+        return output_file
+
+    def generate_trend_analysis(self, date_col, value_col):
+        """Generate trend analysis."""
+        # Convert date column to datetime, in date order so moving averages follow time
+        df = self.df[[date_col, value_col]].copy()
+        df[date_col] = self.get_type_profiler().to_datetime(date_col)
+        df = df.sort_values(date_col, kind="stable")
+        
+        # Create subplots
+        fig = sp.make_subplots(rows=2, cols=2, 
+                              subplot_titles=("Trend Line", "Seasonal Decomposition",
+                                            "Moving Average", "Trend Statistics"),
+                              specs=[[{}, {}], [{}, {"type": "table"}]])
+
+        # Trend Line
+        x, y = self.downsample_trace(df[date_col], df[value_col])
+        fig.add_trace(
+            go.Scatter(x=x, y=y, mode='lines+markers', name='Trend'),
+            row=1, col=1
+        )
+
+        # Seasonal Decomposition
+        # Calculate moving average
+        window = 12
+        df['MA'] = df[value_col].rolling(window=window).mean()
+        x, y = self.downsample_trace(df[date_col], df['MA'])
+        fig.add_trace(
+            go.Scatter(x=x, y=y, mode='lines', name='Seasonal'),
+            row=1, col=2
+        )
+
+        # Moving Average
+        window = 7
+        df['MA'] = df[value_col].rolling(window=window).mean()
+        x, y = self.downsample_trace(df[date_col], df['MA'])
+        fig.add_trace(
+            go.Scatter(x=x, y=y, mode='lines', name=f'{window}-day MA'),
+            row=2, col=1
+        )
+
+        # Trend Statistics
+        stats = df[value_col].describe()
+        fig.add_trace(
+            go.Table(
+                header=dict(values=['Statistic', 'Value']),
+                cells=dict(values=[stats.index, stats.values])
+            ),
+            row=2, col=2
+        )
+
+        # Update layout
+        fig.update_layout(height=800, width=1200,
+                          title_text=f"Trend Analysis ({self.points_note(len(df))})")
+        
+        # Save the report
+        output_file = write_report(fig, 'trend_analysis', directory=self.output_dir,
+                                   compress=self.compress_reports)
+        return output_file
+
+    def get_type_profiler(self):
+        """Return the column type profiler for the current DataFrame."""
+        if self.type_profiler is None or self.type_profiler.df is not self.df:
+            self.type_profiler = ColumnTypeProfiler(self.df)
+        return self.type_profiler
+
+    def detect_data_types(self):
+        """Automatically detect column types and patterns in the data."""
+        self.column_types = {
+            'date_columns': [],
+            'numeric_columns': [],
+            'categorical_columns': [],
+            'text_columns': []
+        }
+        
+        # Detect column types from dtypes and a shared row sample
+        for col, profile in self.get_type_profiler().profile().items():
+            self.column_types[f"{profile['type']}_columns"].append(col)
+        
+        # Find potential relationships
+        self.relationships = {
+            'time_series': [],
+            'category_analysis': [],
+            'correlation_pairs': []
+        }
+        
+        # Find time series relationships
+        for date_col in self.column_types['date_columns']:
+            for num_col in self.column_types['numeric_columns']:
+                self.relationships['time_series'].append((date_col, num_col))
+        
+        # Find category analysis relationships
+        for cat_col in self.column_types['categorical_columns']:
+            for num_col in self.column_types['numeric_columns']:
+                self.relationships['category_analysis'].append((cat_col, num_col))
+        
+        # Find correlation pairs (strongest first) from one matrix computation
+        if len(self.column_types['numeric_columns']) > 1:
+            self.relationships['correlation_pairs'] = correlation_pairs(
+                self.df, self.column_types['numeric_columns'], threshold=0.3)
+        
+        return self.column_types, self.relationships
+
+    def build_smart_dashboard(self):
+        """Build the smart dashboard, write it to disk and return the output file."""
+        # Detect data types and relationships
+        self.detect_data_types()
+        
+        # Create a dashboard with multiple subplots
+        fig = sp.make_subplots(
+            rows=3, cols=2,
+            specs=[
+                [{"type": "table"}, {"type": "xy"}],
+                [{"type": "xy"}, {"type": "xy"}],
+                [{"type": "xy"}, {"type": "table"}]
+            ],
+            subplot_titles=(
+                "Data Overview", "Key Trends",
+                "Category Analysis", "Distribution Analysis",
+                "Correlation Analysis", "Insights"
+            )
+        )
+        
+        # 1. Data Overview (Table)
+        overview_data = {
+            'Column': list(self.df.columns),
+            'Type': [],
+            'Unique Values': [],
+            'Missing Values': []
+        }
+        
+        for col in self.df.columns:
+            col_type = 'Numeric' if col in self.column_types['numeric_columns'] else \
+                      'Date' if col in self.column_types['date_columns'] else \
+                      'Category' if col in self.column_types['categorical_columns'] else 'Text'
+            overview_data['Type'].append(col_type)
+            overview_data['Unique Values'].append(self.df[col].nunique())
+            overview_data['Missing Values'].append(self.df[col].isnull().sum())
+            
+        fig.add_trace(
+            go.Table(
+                header=dict(values=list(overview_data.keys())),
+                cells=dict(values=list(overview_data.values()))
+            ),
+            row=1, col=1
+        )
+        
+        # 2. Key Trends (Time Series if available)
+        # Date columns were detected on a sample; confirm the one used against all values
+        profiler = self.get_type_profiler()
+        time_series = [(date_col, value_col) for date_col, value_col in self.relationships['time_series']
+                       if profiler.confirm(date_col)['type'] == 'date']
+        if time_series:
+            date_col, value_col = time_series[0]
+            dates = profiler.to_datetime(date_col)
+            monthly = self.df[value_col].groupby(dates.dt.to_period('M')).mean()
+            
+            fig.add_trace(
+                go.Scatter(x=monthly.index.astype(str), y=monthly.values, mode='lines+markers'),
+                row=1, col=2
+            )
+        
+        # 3. Category Analysis
+        if self.relationships['category_analysis']:
+            cat_col, value_col = self.relationships['category_analysis'][0]
+            top_categories = self.get_category_aggregates(cat_col, value_col)['mean'].nlargest(10)
+            
+            fig.add_trace(
+                go.Bar(x=top_categories.index, y=top_categories.values),
+                row=2, col=1
+            )
+        
+        # 4. Distribution Analysis
+        if self.column_types['numeric_columns']:
+            num_col = self.column_types['numeric_columns'][0]
+            fig.add_trace(
+                go.Histogram(x=self.df[num_col], name='Distribution'),
+                row=2, col=2
+            )
+        
+        # 5. Correlation Analysis
+        if self.relationships['correlation_pairs']:
+            num_col1, num_col2, _ = self.relationships['correlation_pairs'][0]
+            fig.add_trace(
+                go.Scatter(x=self.df[num_col1], y=self.df[num_col2], mode='markers'),
+                row=3, col=1
+            )
+        
+        # 6. Insights (Text)
+        insights = []
+        if self.relationships['time_series']:
+            insights.append("Time series data detected. Consider analyzing trends over time.")
+        if self.relationships['category_analysis']:
+            insights.append("Categorical data found. Look for patterns across different categories.")
+        if self.relationships['correlation_pairs']:
+            insights.append("Strong correlations detected between numeric columns.")
+        
+        fig.add_trace(
+            go.Table(
+                header=dict(values=['Key Insights']),
+                cells=dict(values=[insights])
+            ),
+            row=3, col=2
+        )
+        
+        # Update layout
+        fig.update_layout(
+            height=1200,
+            width=1600,
+            title_text="Automatic Data Analysis Dashboard",
+            showlegend=False
+        )
+        
+        # Save the report
+        output_file = write_report(fig, 'smart_dashboard', directory=self.output_dir,
+                                   compress=self.compress_reports)
+        return output_file
@@ -0,0 +1,125 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from text_cleaning import clean_strings
+from type_detection import ColumnTypeProfiler
+
+try:
+    import scipy.sparse
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+# Bytes per stored one in a pandas sparse column: a uint8 value and an int32 row position
+SPARSE_ENTRY_BYTES = 5
+# dtype of one-hot indicator columns, by which later numeric steps recognise them
+INDICATOR_DTYPE = pd.SparseDtype(np.uint8, 0)
+
+
+def categorical_columns(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> List[str]:
+    """The given columns, or the columns the type profiler classifies as categorical (except booleans)."""
+    if columns:
+        return list(columns)
+    profiles = ColumnTypeProfiler(df).profile()
+    return [col for col, profile in profiles.items()
+            if profile['type'] == 'categorical' and not pd.api.types.is_bool_dtype(df[col].dtype)]
+
+
+def as_categorical(series: pd.Series) -> pd.Series:
+    """The column as a categorical, so the steps below work on codes and categories only."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return series.astype("category")
+
+
+def category_counts(series: pd.Series) -> np.ndarray:
+    """Rows per category of a categorical column, from its codes."""
+    codes = series.cat.codes.to_numpy()
+    return np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+
+
+def standardize_categories(series: pd.Series) -> pd.Series:
+    """Merge categories that differ only in case or whitespace (" north", "North ", "NORTH").
+
+    Only the distinct values are compared: categories are grouped by their
+    trimmed, lower-cased form, each group takes its most frequent spelling
+    (trimmed), and the codes are remapped to the groups.
+    """
+    series = as_categorical(series)
+    categories = pd.Series(series.cat.categories)
+    if not pd.api.types.is_string_dtype(categories.dtype):
+        return series
+    keys = clean_strings(categories, strip=True, collapse_spaces=True, case="Lowercase")
+    groups, _ = pd.factorize(keys)
+    counts = category_counts(series)
+
+    # Sort categories by group, most used first, and take each group's first
+    order = np.lexsort((-counts, groups))
+    representatives = order[np.r_[True, groups[order][1:] != groups[order][:-1]]]
+    labels = clean_strings(categories.iloc[representatives], strip=True, collapse_spaces=True)
+
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, groups[np.maximum(codes, 0)], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=pd.Index(labels)),
+                     index=series.index, name=series.name)
+
+
+def fill_with_mode(series: pd.Series) -> Tuple[pd.Series, int]:
+    """Fill missing values with the most frequent category; returns the column and the number filled."""
+    series = as_categorical(series)
+    codes = series.cat.codes.to_numpy()
+    missing = codes < 0
+    counts = category_counts(series)
+    if not missing.any() or not counts.any():
+        return series, 0
+    codes = np.where(missing, counts.argmax(), codes)
+    filled = pd.Categorical.from_codes(codes, dtype=series.dtype)
+    return pd.Series(filled, index=series.index, name=series.name), int(missing.sum())
+
+
+def one_hot_estimate(series: pd.Series) -> Dict[str, int]:
+    """Size of the one-hot encoding of a column: its columns, and its bytes as sparse and as dense uint8."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        n_columns = int((category_counts(series) > 0).sum())
+    else:
+        n_columns = int(series.nunique())
+    ones = int(series.notna().sum())
+    return {'columns': n_columns, 'sparse_bytes': ones * SPARSE_ENTRY_BYTES,
+            'dense_bytes': len(series) * n_columns}
+
+
+def is_indicator_column(series: pd.Series) -> bool:
+    """Whether a column is a one-hot indicator added by one_hot_frame."""
+    return series.dtype == INDICATOR_DTYPE
+
+
+def one_hot_matrix(series: pd.Series) -> Tuple["scipy.sparse.csr_matrix", List[str]]:
+    """One-hot encoding of a column as a SciPy CSR matrix (rows x used categories) and its labels.
+
+    The matrix is built directly from the category codes: each row with a
+    value has a single one, in its code's column.
+    """
+    if not HAS_SCIPY:
+        raise ImportError("Sparse one-hot matrices require scipy (pip install scipy)")
+    series = as_categorical(series).cat.remove_unused_categories()
+    codes = series.cat.codes.to_numpy()
+    rows = np.flatnonzero(codes >= 0)
+    matrix = scipy.sparse.csr_matrix((np.ones(len(rows), dtype=np.uint8), (rows, codes[rows])),
+                                     shape=(len(series), len(series.cat.categories)))
+    return matrix, [str(category) for category in series.cat.categories]
+
+
+def one_hot_frame(series: pd.Series, prefix: Optional[str] = None) -> pd.DataFrame:
+    """One-hot encoding of a column as INDICATOR_DTYPE columns named <prefix>_<category>.
+
+    Only the ones are stored. SciPy (optional) builds the columns straight
+    from the codes when installed; pd.get_dummies(sparse=True) is the fallback.
+    """
+    prefix = series.name if prefix is None else prefix
+    if not HAS_SCIPY:
+        return pd.get_dummies(as_categorical(series).cat.remove_unused_categories(), prefix=prefix,
+                              sparse=True, dtype=np.uint8)
+    matrix, labels = one_hot_matrix(series)
+    return pd.DataFrame.sparse.from_spmatrix(matrix, index=series.index,
+                                             columns=[f"{prefix}_{label}" for label in labels])
@@ -0,0 +1,473 @@
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from categorical_cleaning import (as_categorical, categorical_columns, fill_with_mode, one_hot_frame,
+                                  standardize_categories)
+from date_cleaning import date_components, detect_date_columns, standardize_dates
+from duplicates import DUPLICATE_KEEP, duplicate_mask
+from numeric_cleaning import NUMERIC_PARSE_THRESHOLD, convert_numeric, parse_rate
+from outliers import OUTLIER_ACTIONS, OUTLIER_METHODS, default_outlier_columns, numeric_columns, outlier_mask
+from text_cleaning import TEXT_CASES, clean_text, is_text_column
+from type_detection import DATE_PARSE_THRESHOLD
+
+MISSING_VALUE_STRATEGIES = ("Replace with Default", "Drop Rows", "Drop Columns")
+# Rows the cleaning window previews a plan on
+PREVIEW_ROWS = 1_000
+
+
+def typed_default(series: pd.Series, value):
+    """``value`` as a fill for ``series``, or None if a date or number column cannot hold it.
+
+    Filling such a column with text (e.g. 'Unknown') would turn it back into text.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        converted = pd.to_datetime(pd.Series([value]), errors="coerce").iloc[0]
+    elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        converted = pd.to_numeric(pd.Series([value]), errors="coerce").iloc[0]
+    else:
+        return value
+    return None if pd.isna(converted) else converted
+
+
+def fill_missing(series: pd.Series, value) -> pd.Series:
+    """A copy of ``series`` with missing values replaced by ``value``."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+
+class PlanExecution:
+    """The working state while a CleaningPlan runs over a DataFrame.
+
+    Steps work on a shallow copy of the input, so the caller's frame is
+    never modified, and replace whole columns with ``set_column``. Row
+    filters are not applied when a step asks for them: they are combined
+    into one pending mask, and dropped columns are only remembered, until
+    ``materialize`` takes the kept rows of the kept columns in one pass.
+    Steps that need statistics over the kept rows call ``materialize`` first.
+    Steps describe what they did with ``log``, which builds the run's report.
+    """
+
+    def __init__(self, df: pd.DataFrame, progress_callback: Optional[Callable[[str], None]] = None):
+        self.df = df.copy(deep=False)
+        self.mask: Optional[np.ndarray] = None
+        self.dropped: List[str] = []
+        self.report: List[str] = []
+        self.progress_callback = progress_callback
+        self._has_missing: Dict[str, bool] = {}
+
+    def log(self, message: str) -> None:
+        self.report.append(message)
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def columns(self, selected: Optional[Sequence[str]] = None) -> List[str]:
+        """The columns still in the data, optionally only those in ``selected``."""
+        if selected is None:
+            return [col for col in self.df.columns if col not in self.dropped]
+        unknown = [col for col in selected if col not in self.df.columns]
+        if unknown:
+            raise ValueError(f"Columns not found: {', '.join(unknown)}")
+        return [col for col in selected if col not in self.dropped]
+
+    def has_missing(self, col: str) -> bool:
+        """Whether a column has missing values in the kept rows (cached per column)."""
+        if col not in self._has_missing:
+            isna = self.df[col].isna().to_numpy()
+            if self.mask is not None:
+                isna = isna & self.mask
+            self._has_missing[col] = bool(isna.any())
+        return self._has_missing[col]
+
+    def missing_columns(self) -> List[str]:
+        return [col for col in self.columns() if self.has_missing(col)]
+
+    def set_column(self, col: str, values, has_missing: Optional[bool] = None) -> None:
+        """Replace a column; pass ``has_missing`` if the step knows it."""
+        self.df[col] = values
+        if has_missing is None:
+            self._has_missing.pop(col, None)
+        else:
+            self._has_missing[col] = has_missing
+
+    def add_columns(self, columns: pd.DataFrame) -> None:
+        """Append many new columns (without missing values) at once."""
+        self.df = pd.concat([self.df, columns], axis=1)
+        self.mark_complete(columns.columns)
+
+    def filter(self, keep: np.ndarray) -> None:
+        """Keep only the rows where ``keep`` is True (applied by ``materialize``)."""
+        self.mask = keep if self.mask is None else self.mask & keep
+        # Removing rows can only remove missing values
+        self._has_missing = {col: False for col, missing in self._has_missing.items() if not missing}
+
+    def mark_complete(self, columns: Sequence[str]) -> None:
+        """Record that these columns have no missing values in the kept rows."""
+        self._has_missing.update((col, False) for col in columns)
+
+    def drop_columns(self, columns: Sequence[str]) -> None:
+        self.dropped.extend(col for col in columns if col not in self.dropped)
+
+    def materialize(self) -> pd.DataFrame:
+        """Apply the pending column drops and row filter and return the data."""
+        if self.dropped:
+            self.df = self.df.drop(columns=self.dropped)
+            self.dropped = []
+        if self.mask is not None:
+            if not self.mask.all():
+                filtered = self.df[self.mask]
+                # Selecting rows turns sparse uint8 columns (one-hot indicators) into sparse int64
+                sparse = {col: dtype for col, dtype in self.df.dtypes.items()
+                          if isinstance(dtype, pd.SparseDtype) and filtered[col].dtype != dtype}
+                self.df = filtered.astype(sparse) if sparse else filtered
+            self.mask = None
+        return self.df
+
+
+def missing_values_step(execution: PlanExecution, strategy: str, default_value="Unknown") -> None:
+    """Missing value handling that only touches the columns with missing values.
+
+    'Replace with Default' leaves date and number columns missing when the
+    default is not a date or number (see typed_default).
+    """
+    if strategy not in MISSING_VALUE_STRATEGIES:
+        raise ValueError(f"Unknown missing value strategy: {strategy}")
+    columns = execution.missing_columns()
+    if not columns:
+        execution.log("Missing values: no columns with missing values")
+        return
+    if strategy == "Replace with Default":
+        kept = []
+        for col in columns:
+            value = typed_default(execution.df[col], default_value)
+            if value is None:
+                kept.append(col)
+            else:
+                execution.set_column(col, fill_missing(execution.df[col], value), has_missing=False)
+        if kept:
+            execution.log(f"Missing values: {', '.join(map(str, kept))} left missing, "
+                          f"{default_value!r} is not a date or number")
+    elif strategy == "Drop Rows":
+        if columns:
+            execution.filter(execution.df[columns].notna().all(axis=1).to_numpy())
+            execution.mark_complete(columns)
+    else:
+        execution.drop_columns(columns)
+
+
+def duplicates_step(execution: PlanExecution, columns: Optional[Sequence[str]] = None,
+                    keep: str = "first") -> None:
+    """Removal of rows that repeat an earlier row's ``columns`` (all columns by default).
+
+    ``keep`` is 'first', 'last' or 'none' (drop every copy). Duplicates are
+    judged among the rows kept so far, so pending filters are applied first.
+    """
+    if keep not in DUPLICATE_KEEP:
+        raise ValueError(f"Unknown duplicate strategy: {keep}")
+    columns = execution.columns(columns) if columns else None
+    df = execution.materialize()
+    start = time.perf_counter()
+    duplicates = duplicate_mask(df, columns, keep)
+    seconds = time.perf_counter() - start
+    if duplicates.any():
+        execution.filter(~duplicates)
+    execution.log(f"Duplicates: {int(duplicates.sum()):,} of {len(df):,} rows removed in {seconds:.2f}s")
+
+
+def text_cleaning_step(execution: PlanExecution, columns: Optional[Sequence[str]] = None,
+                       strip: bool = False, collapse_spaces: bool = False, case: str = "No Change",
+                       remove_special: bool = False) -> None:
+    """Text cleaning of ``columns`` (every text column by default), timed per column."""
+    if case not in TEXT_CASES:
+        raise ValueError(f"Unknown text case: {case}")
+    if columns:
+        targets = execution.columns(columns)
+    else:
+        targets = [col for col in execution.columns() if is_text_column(execution.df[col])]
+    if not targets:
+        execution.log("Text cleaning: no text columns")
+        return
+
+    for col in targets:
+        series = execution.df[col]
+        start = time.perf_counter()
+        cleaned = clean_text(series, strip=strip, collapse_spaces=collapse_spaces, case=case,
+                             remove_special=remove_special)
+        seconds = time.perf_counter() - start
+        execution.set_column(col, cleaned)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            work = f"{len(series.cat.categories):,} categories -> {len(cleaned.cat.categories):,}"
+        else:
+            work = f"{len(series):,} values"
+        execution.log(f"Text cleaning {col}: {work} in {seconds:.2f}s")
+
+
+def date_cleaning_step(execution: PlanExecution, columns: Optional[Sequence[str]] = None,
+                       date_format: Optional[str] = None, extract_components: bool = False) -> None:
+    """Parse ``columns`` (the detected date columns by default) to datetime64 once.
+
+    Analyses then use the stored dates instead of parsing the strings again.
+    With ``extract_components`` the year, month, week and day are added as
+    <column>_year, <column>_month and so on.
+    """
+    if columns:
+        targets = execution.columns(columns)
+    else:
+        targets = detect_date_columns(execution.df, execution.columns())
+    if not targets:
+        execution.log("Date cleaning: no date columns")
+        return
+
+    for col in targets:
+        series = execution.df[col]
+        start = time.perf_counter()
+        dates, used_format = standardize_dates(series, date_format)
+        seconds = time.perf_counter() - start
+        if dates is series:
+            message = f"Date cleaning {col}: already dates"
+        else:
+            present = int(series.notna().sum())
+            unparsed = int(dates.isna().sum()) - (len(series) - present)
+            # Detected columns were judged on a sample; leave them alone if most values are not dates
+            if not columns and unparsed > present * (1 - DATE_PARSE_THRESHOLD):
+                execution.log(f"Date cleaning {col}: skipped, {unparsed:,} of {present:,} values "
+                              f"do not match {used_format}")
+                continue
+            execution.set_column(col, dates)
+            message = f"Date cleaning {col}: parsed with {used_format} in {seconds:.2f}s"
+            if unparsed:
+                message += f", {unparsed:,} values could not be parsed"
+        if extract_components:
+            for name, values in date_components(dates).items():
+                execution.set_column(f"{col}_{name}", values)
+            message += ", components added"
+        execution.log(message)
+
+
+def numeric_cleaning_step(execution: PlanExecution, columns: Optional[Sequence[str]] = None,
+                          remove_currency: bool = False, convert_percentage: bool = False,
+                          handle_scientific: bool = False, decimals: Optional[int] = None) -> None:
+    """Convert ``columns`` to compact numbers (by default, the text columns that hold numbers).
+
+    With ``decimals`` the numbers are rounded, and so are the float columns
+    when no columns are given. Values that cannot be converted become
+    missing and are counted in the report.
+    """
+    options = {"remove_currency": remove_currency, "convert_percentage": convert_percentage,
+               "handle_scientific": handle_scientific}
+    if columns:
+        targets = execution.columns(columns)
+    else:
+        targets = [col for col in execution.columns()
+                   if (is_text_column(execution.df[col])
+                       and parse_rate(execution.df[col], **options) >= NUMERIC_PARSE_THRESHOLD)
+                   or (decimals is not None and pd.api.types.is_float_dtype(execution.df[col].dtype))]
+    if not targets:
+        execution.log("Numeric cleaning: no numeric text columns")
+        return
+
+    for col in targets:
+        series = execution.df[col]
+        start = time.perf_counter()
+        numbers, n_unparsable, examples = convert_numeric(series, decimals, **options)
+        seconds = time.perf_counter() - start
+        execution.set_column(col, numbers)
+        message = f"Numeric cleaning {col}: {series.dtype} -> {numbers.dtype} in {seconds:.2f}s"
+        if n_unparsable:
+            quoted = ", ".join(repr(value) for value in examples)
+            message += f", {n_unparsable:,} values could not be converted (e.g. {quoted})"
+        execution.log(message)
+
+
+def categorical_cleaning_step(execution: PlanExecution, columns: Optional[Sequence[str]] = None,
+                              standardize: bool = False, fill_mode: bool = False,
+                              one_hot: bool = False) -> None:
+    """Cleaning of ``columns`` (the detected categorical columns by default) on their category codes.
+
+    Cleaned columns are stored as categoricals. ``one_hot`` adds sparse
+    <column>_<category> indicator columns and keeps the column itself.
+    """
+    targets = categorical_columns(execution.df, execution.columns(columns) if columns else None)
+    if not targets:
+        execution.log("Categorical cleaning: no categorical columns")
+        return
+    if one_hot:
+        # Pending row filters would otherwise have to index every indicator column
+        execution.materialize()
+
+    for col in targets:
+        if col in execution.dropped:
+            continue
+        series = execution.df[col]
+        start = time.perf_counter()
+        cleaned = as_categorical(series) if standardize or fill_mode else series
+        details = []
+        if standardize:
+            before = len(cleaned.cat.categories)
+            cleaned = standardize_categories(cleaned)
+            details.append(f"{before:,} -> {len(cleaned.cat.categories):,} categories")
+        if fill_mode:
+            cleaned, filled = fill_with_mode(cleaned)
+            if filled:
+                details.append(f"{filled:,} missing values filled")
+        if cleaned is not series:
+            execution.set_column(col, cleaned)
+        if one_hot:
+            indicators = one_hot_frame(cleaned, prefix=col)
+            execution.add_columns(indicators)
+            details.append(f"{len(indicators.columns):,} sparse indicator columns added")
+        seconds = time.perf_counter() - start
+        execution.log(f"Categorical cleaning {col}: {', '.join(details) or 'no change'} in {seconds:.2f}s")
+
+
+def outliers_step(execution: PlanExecution, columns: Optional[Sequence[str]] = None, method: str = "iqr",
+                  threshold: Optional[float] = None, group_by: Optional[str] = None,
+                  action: str = "flag") -> None:
+    """Outlier detection on ``columns``, optionally within each ``group_by`` group.
+
+    By default every numeric column is checked except identifiers, date
+    components and flags such as one-hot indicators (see
+    outliers.default_outlier_columns).
+
+    ``method`` is 'iqr', 'zscore' or 'mad' (``threshold`` defaults per
+    method). All the columns are judged at once on one float block.
+    'flag' adds a boolean <column>_outlier column per column and 'exclude'
+    drops every row with an outlier in any of them.
+    """
+    if method not in OUTLIER_METHODS:
+        raise ValueError(f"Unknown outlier method: {method}")
+    if action not in OUTLIER_ACTIONS:
+        raise ValueError(f"Unknown outlier action: {action}")
+    if group_by is not None and group_by not in execution.columns():
+        raise ValueError(f"Columns not found: {group_by}")
+    # The bounds depend on which rows are kept
+    df = execution.materialize()
+    exclude = [group_by] if group_by else []
+    if columns:
+        targets = numeric_columns(df, execution.columns(columns), exclude=exclude)
+    else:
+        targets = default_outlier_columns(df, exclude=exclude)
+    if not targets:
+        execution.log("Outliers: no numeric columns")
+        return
+
+    start = time.perf_counter()
+    flags = outlier_mask(df, targets, method, threshold, group_by)
+    counts = flags.sum(axis=0)
+    rows = flags.any(axis=1)
+    if action == "exclude":
+        execution.filter(~rows)
+    else:
+        execution.add_columns(pd.DataFrame(flags, index=df.index, columns=[f"{col}_outlier" for col in targets]))
+    seconds = time.perf_counter() - start
+    by_column = ", ".join(f"{col} {count:,}" for col, count in zip(targets, counts) if count)
+    within = f" within {group_by} groups" if group_by else ""
+    verb = "excluded" if action == "exclude" else "flagged"
+    execution.log(f"Outliers ({method}{within}): {int(rows.sum()):,} rows {verb}"
+                  f"{f' ({by_column})' if by_column else ''} in {seconds:.2f}s")
+
+
+# Steps a plan can record, by name: each is called as function(execution, **options)
+CLEANING_STEPS: Dict[str, Callable[..., None]] = {
+    "missing_values": missing_values_step,
+    "duplicates": duplicates_step,
+    "text_cleaning": text_cleaning_step,
+    "date_cleaning": date_cleaning_step,
+    "numeric_cleaning": numeric_cleaning_step,
+    "categorical_cleaning": categorical_cleaning_step,
+    "outliers": outliers_step
+}
+
+
+def is_row_local(step: Dict) -> bool:
+    """Whether a step gives the same result applied chunk by chunk as on the whole frame."""
+    if step["step"] == "missing_values":
+        # Dropping columns depends on every row of the column
+        return step.get("strategy") != "Drop Columns"
+    if step["step"] == "date_cleaning":
+        # Without both, each chunk would detect its own columns and formats
+        return bool(step.get("columns")) and step.get("date_format") is not None
+    if step["step"] == "numeric_cleaning":
+        # Each chunk would pick its own compact dtype
+        return False
+    return step["step"] == "text_cleaning"
+
+
+def fuse_steps(steps: List[Dict]) -> List[Dict]:
+    """Drop steps that cannot change the data left by the step before them.
+
+    Dropping rows or columns leaves no missing values behind, so a
+    missing_values step directly after such a step, or after the same
+    step, is a no-op. (Replacing may leave date and number columns missing.)
+    """
+    fused = []
+    for step in steps:
+        if (fused and fused[-1]["step"] == "missing_values" and step["step"] == "missing_values"
+                and (fused[-1].get("strategy") != "Replace with Default" or fused[-1] == step)):
+            continue
+        fused.append(step)
+    return fused
+
+
+def describe_step(step: Dict) -> str:
+    """A short label for a recorded step, e.g. 'missing values: strategy=Drop Rows'."""
+    options = ", ".join(f"{key}={value}" for key, value in step.items() if key != "step")
+    name = step["step"].replace("_", " ")
+    return f"{name}: {options}" if options else name
+
+
+class CleaningPlan:
+    """Cleaning steps that are recorded first and run later, all at once.
+
+    Recording a step does no work. ``preview`` runs the plan on the first
+    rows only, so the effect of the options shows instantly, and
+    ``execute`` runs it once on the full data: redundant steps are dropped,
+    each step only touches the columns it applies to, and the row and
+    column removals of all steps are applied together in one pass at the
+    end. Column-wide decisions (like dropping columns with missing values)
+    are made on the preview rows alone, so a preview can differ from the
+    full run.
+    """
+
+    def __init__(self, steps: Optional[List[Dict]] = None):
+        self.steps: List[Dict] = list(steps or [])
+        # What the last execute() did, as written by the steps
+        self.report: List[str] = []
+
+    def add(self, step: str, **options) -> None:
+        if step not in CLEANING_STEPS:
+            raise ValueError(f"Unknown cleaning step: {step}")
+        self.steps.append({"step": step, **options})
+
+    def clear(self) -> None:
+        self.steps = []
+
+    def describe(self) -> List[str]:
+        return [describe_step(step) for step in self.steps]
+
+    def preview(self, df: pd.DataFrame, rows: int = PREVIEW_ROWS) -> pd.DataFrame:
+        """The result of the plan on the first ``rows`` rows of ``df``."""
+        return self.execute(df.head(rows))
+
+    def execute(self, df: pd.DataFrame,
+                progress_callback: Optional[Callable[[str], None]] = None) -> pd.DataFrame:
+        """Run the plan on ``df`` and return the cleaned data; ``df`` itself is not modified."""
+        execution = PlanExecution(df, progress_callback)
+        for step in fuse_steps(self.steps):
+            if step["step"] not in CLEANING_STEPS:
+                raise ValueError(f"Unknown cleaning step: {step['step']}")
+            if progress_callback:
+                progress_callback(f"Cleaning: {step['step'].replace('_', ' ')}...")
+            options = {key: value for key, value in step.items() if key != "step"}
+            CLEANING_STEPS[step["step"]](execution, **options)
+        self.report = execution.report
+        return execution.materialize()
+
+
+def apply_cleaning_steps(df: pd.DataFrame, steps: List[Dict],
+                         progress_callback: Optional[Callable[[str], None]] = None) -> pd.DataFrame:
+    """Run recorded cleaning steps on ``df`` and return the cleaned data."""
+    return CleaningPlan(steps).execute(df, progress_callback)
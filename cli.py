@@ -0,0 +1,280 @@
+"""Headless batch entry point: load, clean, merge and write reports without the GUI.
+
+Example:
+    python cli.py sales/ --relationship orders.customer_id=customers.id \
+        --missing drop-rows --analysis dashboard --analysis category:region,sales
+
+A run can be saved as a pipeline spec with --save-pipeline and replayed later
+(e.g. from a scheduled job) with --pipeline; specs saved from the GUI replay
+the same way.
+"""
+import argparse
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from analysis import ANALYSIS_TYPES
+from data_merger import DEFAULT_MAX_MERGE_ROWS, FANOUT_STRATEGIES
+from downsampling import DOWNSAMPLING_METHODS
+from duplicates import DUPLICATE_KEEP
+from ingestion import IngestionCache, DEFAULT_WORKERS, DEFAULT_CHUNK_SIZE, HAS_PYARROW
+from outliers import OUTLIER_ACTIONS, OUTLIER_METHODS
+from pipeline import Pipeline
+
+MISSING_OPTIONS = {
+    "default": "Replace with Default",
+    "drop-rows": "Drop Rows",
+    "drop-columns": "Drop Columns"
+}
+
+TEXT_CASE_OPTIONS = {
+    "lower": "Lowercase",
+    "upper": "Uppercase",
+    "title": "Title Case"
+}
+
+# Positional arguments of each analysis, in the order given after the colon
+ANALYSIS_ARGUMENTS = {
+    "time_series": ("date_col", "value_col"),
+    "trend": ("date_col", "value_col"),
+    "category": ("category_col", "value_col"),
+    "comparative": ("category_col", "value_col"),
+    "distribution": ("column",),
+    "correlation": ("selected_columns",),
+    "dashboard": ()
+}
+
+
+def parse_analysis(spec: str) -> Tuple[str, Dict]:
+    """Parse 'name[:col1,col2,...]' into an analysis name and its keyword arguments."""
+    name, _, args = spec.partition(":")
+    name = name.strip().lower().replace("-", "_")
+    if name not in ANALYSIS_TYPES:
+        raise ValueError(f"Unknown analysis '{name}' (choose from {', '.join(ANALYSIS_TYPES)})")
+    columns = [col.strip() for col in args.split(",") if col.strip()]
+    params = ANALYSIS_ARGUMENTS[name]
+
+    if params == ("selected_columns",):
+        if len(columns) < 2:
+            raise ValueError("correlation needs at least two columns")
+        return name, {"selected_columns": columns}
+    if len(columns) != len(params):
+        expected = ",".join(params) if params else "no columns"
+        raise ValueError(f"{name} expects {expected}, got '{args}'")
+    return name, dict(zip(params, columns))
+
+
+def parse_column_ref(ref: str) -> Tuple[str, str]:
+    """Parse 'table.column' (table names are lower case, as DataMerger stores them)."""
+    table, sep, column = ref.partition(".")
+    if not sep or not table or not column:
+        raise ValueError(f"Expected table.column, got '{ref}'")
+    return table.strip().lower(), column.strip()
+
+
+def parse_rename(spec: str) -> Tuple[str, str]:
+    old, sep, new = spec.partition("=")
+    if not sep or not old.strip() or not new.strip():
+        raise ValueError(f"Expected OLD=NEW, got '{spec}'")
+    return old.strip(), new.strip()
+
+
+def split_columns(text: Optional[str]) -> List[str]:
+    return [col.strip() for col in (text or "").split(",") if col.strip()]
+
+
+def build_pipeline(args) -> Pipeline:
+    """The pipeline to run: a loaded spec or one built from the inputs, plus the options given."""
+    if args.pipeline:
+        pipeline = Pipeline.load(args.pipeline)
+        if args.inputs:
+            pipeline.spec["inputs"]["paths"] = list(args.inputs)
+    else:
+        if not args.inputs:
+            raise ValueError("Give input files or a folder, or a pipeline spec with --pipeline")
+        pipeline = Pipeline()
+        pipeline.set_inputs(args.inputs, args.delimiter, args.remove_spaces, args.ignore_special_chars,
+                            optimize=not args.no_optimize, streaming=args.streaming, chunk_size=args.chunk_size)
+        if len(args.inputs) == 1 and os.path.isdir(args.inputs[0]):
+            relationships = []
+            for spec in args.relationship:
+                left, sep, right = spec.partition("=")
+                if not sep:
+                    raise ValueError(f"Expected table1.col1=table2.col2, got '{spec}'")
+                (table1, col1), (table2, col2) = parse_column_ref(left), parse_column_ref(right)
+                relationships.append((table1, table2, col1, col2))
+            primary_keys = dict(parse_column_ref(ref) for ref in args.primary_key)
+            pipeline.set_merge(primary_keys, relationships, max_rows=args.max_merge_rows,
+                               fanout_strategy=args.fanout,
+                               detect_relationships=not args.no_detect_relationships,
+                               use_values=not args.no_value_relationships,
+                               keep_first=split_columns(args.keep_first))
+
+    if args.header:
+        pipeline.set_headers({**pipeline.spec["headers"], **dict(parse_rename(spec) for spec in args.header)})
+    # As in the cleaning window, a default is filled in after the type steps
+    fill = args.missing and MISSING_OPTIONS[args.missing] == "Replace with Default"
+    if args.missing and not fill:
+        pipeline.add_cleaning_step("missing_values", strategy=MISSING_OPTIONS[args.missing],
+                                   default_value=args.default_value)
+    if args.drop_duplicates:
+        pipeline.add_cleaning_step("duplicates", columns=split_columns(args.duplicate_columns) or None,
+                                   keep=args.drop_duplicates)
+    if args.strip_text or args.collapse_spaces or args.text_case or args.remove_special_chars:
+        pipeline.add_cleaning_step("text_cleaning", strip=args.strip_text, collapse_spaces=args.collapse_spaces,
+                                   case=TEXT_CASE_OPTIONS.get(args.text_case, "No Change"),
+                                   remove_special=args.remove_special_chars)
+    if args.parse_dates or args.date_columns or args.date_components:
+        pipeline.add_cleaning_step("date_cleaning", columns=split_columns(args.date_columns) or None, date_format=args.date_format,
+                                   extract_components=args.date_components)
+    if args.convert_numbers or args.numeric_columns or args.round is not None:
+        pipeline.add_cleaning_step("numeric_cleaning", columns=split_columns(args.numeric_columns) or None,
+                                   remove_currency=args.remove_currency,
+                                   convert_percentage=args.convert_percentages,
+                                   handle_scientific=args.scientific, decimals=args.round)
+    if args.standardize_categories or args.fill_mode or args.one_hot:
+        pipeline.add_cleaning_step("categorical_cleaning",
+                                   columns=split_columns(args.categorical_columns) or None,
+                                   standardize=args.standardize_categories, fill_mode=args.fill_mode,
+                                   one_hot=args.one_hot)
+    if fill:
+        pipeline.add_cleaning_step("missing_values", strategy="Replace with Default", default_value=args.default_value)
+    if args.outliers:
+        pipeline.add_cleaning_step("outliers", columns=split_columns(args.outlier_columns) or None,
+                                   method=args.outliers, threshold=args.outlier_threshold,
+                                   group_by=args.outlier_group, action=args.outlier_action)
+    if args.save_data:
+        pipeline.set_output(args.save_data)
+
+    settings = {"output_dir": args.output_dir, "max_points": args.max_points,
+                "downsample_method": args.downsample, "compress": args.compress or None}
+    pipeline.set_report_settings(**{key: value for key, value in settings.items() if value is not None})
+    for spec in args.analysis:
+        name, kwargs = parse_analysis(spec)
+        pipeline.add_analysis(name, **kwargs)
+    return pipeline
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate InsightForge reports without the GUI.")
+    parser.add_argument("inputs", nargs="*",
+                        help="CSV/XLSX files to combine, or one folder of related tables to merge")
+    parser.add_argument("--pipeline", metavar="SPEC",
+                        help="replay a saved pipeline (.json/.yaml); inputs given here replace its inputs")
+    parser.add_argument("--save-pipeline", metavar="SPEC", help="also save this run as a pipeline spec")
+
+    ingestion = parser.add_argument_group("ingestion")
+    ingestion.add_argument("--delimiter", default=",")
+    ingestion.add_argument("--remove-spaces", action="store_true", help="strip spaces from headers")
+    ingestion.add_argument("--ignore-special-chars", action="store_true",
+                           help="remove special characters from headers")
+    ingestion.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="file reading workers")
+    ingestion.add_argument("--cache", action="store_true", help="reuse parsed files from the ingestion cache")
+    ingestion.add_argument("--no-optimize", action="store_true", help="keep the parsed data types")
+    ingestion.add_argument("--streaming", action="store_true", help="read CSVs in chunks spilled to disk")
+    ingestion.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per streamed chunk")
+
+    merging = parser.add_argument_group("merging (folder input)")
+    merging.add_argument("--relationship", action="append", default=[], metavar="T1.C1=T2.C2",
+                         help="add a relationship (repeatable)")
+    merging.add_argument("--primary-key", action="append", default=[], metavar="TABLE.COLUMN",
+                         help="set a table's primary key (repeatable)")
+    merging.add_argument("--no-detect-relationships", action="store_true")
+    merging.add_argument("--no-value-relationships", action="store_true",
+                         help="only detect relationships from column names")
+    merging.add_argument("--max-merge-rows", type=int, default=DEFAULT_MAX_MERGE_ROWS)
+    merging.add_argument("--fanout", choices=FANOUT_STRATEGIES, default="abort",
+                         help="what to do when a merge would exceed --max-merge-rows")
+    merging.add_argument("--keep-first", metavar="COLUMNS",
+                         help="comma-separated numeric columns that --fanout aggregate keeps instead of summing")
+
+    cleaning = parser.add_argument_group("cleaning")
+    cleaning.add_argument("--header", action="append", default=[], metavar="OLD=NEW",
+                          help="rename a column (repeatable)")
+    cleaning.add_argument("--missing", choices=MISSING_OPTIONS, help="missing value strategy")
+    cleaning.add_argument("--default-value", default="Unknown")
+    cleaning.add_argument("--drop-duplicates", choices=DUPLICATE_KEEP, metavar="KEEP",
+                          help="remove duplicate rows, keeping the first, last or none of each group")
+    cleaning.add_argument("--duplicate-columns", metavar="COLUMNS",
+                          help="comma-separated columns that identify duplicates (all columns by default)")
+    cleaning.add_argument("--strip-text", action="store_true", help="strip whitespace around text values")
+    cleaning.add_argument("--collapse-spaces", action="store_true", help="collapse runs of whitespace in text")
+    cleaning.add_argument("--text-case", choices=TEXT_CASE_OPTIONS, help="change the case of text values")
+    cleaning.add_argument("--remove-special-chars", action="store_true",
+                          help="remove characters other than letters, digits and spaces from text")
+    cleaning.add_argument("--parse-dates", action="store_true",
+                          help="store date columns as datetimes (detected columns unless --date-columns)")
+    cleaning.add_argument("--date-columns", metavar="COLUMNS", help="comma-separated date columns to parse")
+    cleaning.add_argument("--date-format", metavar="FORMAT",
+                          help="strftime format of the date columns (inferred if not given)")
+    cleaning.add_argument("--date-components", action="store_true",
+                          help="add year, month, week and day columns for each parsed date column")
+    cleaning.add_argument("--numeric-columns", metavar="COLUMNS",
+                          help="comma-separated columns to convert to numbers (detected if not given)")
+    cleaning.add_argument("--convert-numbers", action="store_true",
+                          help="convert text columns that hold numbers to compact numeric types")
+    cleaning.add_argument("--remove-currency", action="store_true", help="accept currency symbols in numbers")
+    cleaning.add_argument("--convert-percentages", action="store_true", help="read '12%%' as 0.12")
+    cleaning.add_argument("--scientific", action="store_true", help="accept numbers like 1.5e3 or 1.5 x 10^3")
+    cleaning.add_argument("--categorical-columns", metavar="COLUMNS",
+                          help="comma-separated categorical columns to clean (detected if not given)")
+    cleaning.add_argument("--standardize-categories", action="store_true",
+                          help="merge categories that differ only in case or whitespace")
+    cleaning.add_argument("--fill-mode", action="store_true",
+                          help="fill missing categorical values with the most frequent category")
+    cleaning.add_argument("--one-hot", action="store_true",
+                          help="add sparse indicator columns for each category")
+    cleaning.add_argument("--round", type=int, metavar="DECIMALS", help="round converted and float columns")
+    cleaning.add_argument("--outliers", choices=OUTLIER_METHODS, metavar="METHOD",
+                          help="detect outliers in numeric columns with iqr, zscore or mad")
+    cleaning.add_argument("--outlier-columns", metavar="COLUMNS",
+                          help="comma-separated columns to check for outliers (all numeric columns by default)")
+    cleaning.add_argument("--outlier-threshold", type=float, metavar="K",
+                          help="IQRs, standard deviations or MADs beyond which a value is an outlier "
+                               "(1.5, 3 and 3.5 by default)")
+    cleaning.add_argument("--outlier-group", metavar="COLUMN",
+                          help="judge outliers within each group of this column (e.g. per category)")
+    cleaning.add_argument("--outlier-action", choices=OUTLIER_ACTIONS, default="flag",
+                          help="add <column>_outlier flag columns (default) or exclude outlier rows")
+    cleaning.add_argument("--save-data", metavar="PATH", help="write the cleaned data to a .csv or .xlsx file")
+
+    reports = parser.add_argument_group("reports")
+    reports.add_argument("--analysis", action="append", default=[], metavar="NAME[:COLUMNS]",
+                         help="e.g. dashboard, time_series:date,sales, correlation:a,b,c (repeatable)")
+    reports.add_argument("--output-dir")
+    reports.add_argument("--report-workers", type=int, default=1, help="analyses generated in parallel")
+    reports.add_argument("--max-points", type=int)
+    reports.add_argument("--downsample", choices=DOWNSAMPLING_METHODS)
+    reports.add_argument("--compress", action="store_true", help="write gzip-compressed reports")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        pipeline = build_pipeline(args)
+        if args.save_pipeline:
+            pipeline.save(args.save_pipeline)
+            print(f"Saved pipeline to {args.save_pipeline}")
+    except (ValueError, ImportError, OSError) as e:
+        parser.error(str(e))
+
+    cache = IngestionCache() if args.cache and HAS_PYARROW else None
+    try:
+        df, written, errors = pipeline.run(progress_callback=print, workers=args.workers,
+                                           report_workers=args.report_workers, cache=cache)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Data ready: {len(df):,} rows, {len(df.columns)} columns")
+
+    for output_file in written:
+        print(f"Wrote {output_file}")
+    for name, error in errors.items():
+        print(f"Failed to generate {name}: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+# Rows used for correlation discovery on large frames
+DEFAULT_CORRELATION_SAMPLE = 200_000
+# Columns per block and rows per chunk for the blocked correlation engine
+DEFAULT_BLOCK_SIZE = 256
+DEFAULT_ROW_CHUNK = 100_000
+CORRELATION_METHODS = ("pearson", "spearman")
+
+
+def numeric_block(df: pd.DataFrame, columns: Sequence[str], sample_size: Optional[int] = None,
+                  random_state: int = 0) -> np.ndarray:
+    """Columns as one float32 array (rows x columns), centered, with NaN for missing values.
+
+    Columns are centered on their mean in float64 before the cast, so the
+    float32 products that follow do not lose precision to large offsets.
+    """
+    if sample_size is not None and len(df) > sample_size:
+        df = df.sample(sample_size, random_state=random_state)
+    block = df[list(columns)].to_numpy(dtype=np.float64, na_value=np.nan)
+    with warnings.catch_warnings():
+        # All-missing columns have no mean; they end up with no correlations
+        warnings.simplefilter("ignore", RuntimeWarning)
+        means = np.nanmean(block, axis=0) if len(block) else np.zeros(block.shape[1])
+    block = block - np.nan_to_num(means)
+    return block.astype(np.float32)
+
+
+def pairwise_correlation(block: np.ndarray, min_periods: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+    """Pearson correlation of every column pair using pairwise-complete rows.
+
+    Matches DataFrame.corr() semantics (each pair only uses rows where both
+    values are present) with a handful of matrix products instead of one
+    pass per pair. Returns the correlation matrix and the pairwise row counts.
+    """
+    present = ~np.isnan(block)
+    values = np.where(present, block, 0).astype(np.float32)
+    mask = present.astype(np.float32)
+
+    counts = mask.T @ mask                       # rows where both columns are present
+    sums = values.T @ mask                       # sum of x over rows where y is present
+    squares = (values * values).T @ mask         # sum of x^2 over rows where y is present
+    products = values.T @ values                 # sum of x*y over rows where both are present
+    # The k x k combinations are cheap; float64 keeps their products from overflowing
+    counts, sums, squares, products = (m.astype(np.float64) for m in (counts, sums, squares, products))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = counts * products - sums * sums.T
+        variance_x = counts * squares - sums * sums
+        corr = covariance / np.sqrt(variance_x * variance_x.T)
+    corr = np.clip(corr, -1.0, 1.0)
+    corr[counts < min_periods] = np.nan
+    return corr, counts.astype(np.int64)
+
+
+def correlation_matrix(df: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                       sample_size: Optional[int] = None) -> pd.DataFrame:
+    """Pearson correlation matrix of numeric columns, optionally on a row sample."""
+    if columns is None:
+        columns = list(df.select_dtypes(include=['number']).columns)
+    corr, _ = pairwise_correlation(numeric_block(df, columns, sample_size))
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def ranked_pairs(corr: pd.DataFrame, threshold: float = 0.3) -> List[Tuple[str, str, float]]:
+    """Column pairs whose absolute correlation exceeds ``threshold``, strongest first."""
+    values = corr.to_numpy()
+    rows, cols = np.triu_indices(len(corr.columns), k=1)
+    strengths = np.abs(values[rows, cols])
+    keep = np.flatnonzero(strengths > threshold)
+    keep = keep[np.argsort(-strengths[keep], kind="stable")]
+    return [(corr.columns[rows[i]], corr.columns[cols[i]], float(values[rows[i], cols[i]]))
+            for i in keep]
+
+
+def correlation_pairs(df: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                      threshold: float = 0.3,
+                      sample_size: Optional[int] = DEFAULT_CORRELATION_SAMPLE) -> List[Tuple[str, str, float]]:
+    """Ranked (column1, column2, correlation) pairs above ``threshold``."""
+    return ranked_pairs(correlation_matrix(df, columns, sample_size), threshold)
+
+
+class CorrelationAccumulator:
+    """Pearson correlation matrix accumulated over chunks of rows.
+
+    Each chunk adds its pairwise-complete counts, sums, sums of squares and
+    cross products to float64 totals, one block of columns against another,
+    so neither the full data nor a rows x columns float64 copy has to be in
+    memory at once. Values are shifted by the first chunk's column means to
+    keep the sums well conditioned. NumPy releases the GIL in its matrix
+    products, so blocks can run on ``max_workers`` threads.
+    """
+
+    def __init__(self, columns: Sequence[str], block_size: int = DEFAULT_BLOCK_SIZE,
+                 max_workers: int = 1):
+        self.columns = list(columns)
+        self.block_size = block_size
+        self.max_workers = max_workers
+        k = len(self.columns)
+        self.shift: Optional[np.ndarray] = None
+        self.counts = np.zeros((k, k))
+        self.sums = np.zeros((k, k))
+        self.squares = np.zeros((k, k))
+        self.products = np.zeros((k, k))
+        self.rows = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add a chunk of rows (a DataFrame containing all the columns)."""
+        block = chunk[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        if self.shift is None:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                self.shift = np.nan_to_num(np.nanmean(block, axis=0)) if len(block) else None
+            if self.shift is None:
+                return
+        block = block - self.shift
+
+        present = ~np.isnan(block)
+        values = np.where(present, block, 0).astype(np.float32)
+        mask = present.astype(np.float32)
+        squared = values * values
+
+        starts = range(0, len(self.columns), self.block_size)
+        tasks = [(i, j) for i in starts for j in starts if j >= i]
+
+        def compute(task):
+            i, j = task
+            a, b = slice(i, i + self.block_size), slice(j, j + self.block_size)
+            return a, b, (mask[:, a].T @ mask[:, b], values[:, a].T @ mask[:, b],
+                          mask[:, a].T @ values[:, b], squared[:, a].T @ mask[:, b],
+                          mask[:, a].T @ squared[:, b], values[:, a].T @ values[:, b])
+
+        if self.max_workers > 1 and len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(compute, tasks))
+        else:
+            results = [compute(task) for task in tasks]
+
+        # Fill both triangles from each block pair
+        for a, b, (counts, sums_ab, sums_ba, squares_ab, squares_ba, products) in results:
+            self.counts[a, b] += counts
+            self.sums[a, b] += sums_ab
+            self.squares[a, b] += squares_ab
+            self.products[a, b] += products
+            if a != b:
+                self.counts[b, a] += counts.T
+                self.sums[b, a] += sums_ba.T
+                self.squares[b, a] += squares_ba.T
+                self.products[b, a] += products.T
+        self.rows += len(block)
+
+    def result(self, min_periods: int = 2) -> pd.DataFrame:
+        """The correlation matrix of all rows added so far."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = self.counts * self.products - self.sums * self.sums.T
+            variance = self.counts * self.squares - self.sums * self.sums
+            corr = np.clip(covariance / np.sqrt(variance * variance.T), -1.0, 1.0)
+        corr[self.counts < min_periods] = np.nan
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def iter_row_chunks(df: pd.DataFrame, chunk_size: int = DEFAULT_ROW_CHUNK) -> Iterable[pd.DataFrame]:
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def compute_correlation(data, columns: Optional[Sequence[str]] = None, method: str = "pearson",
+                        block_size: int = DEFAULT_BLOCK_SIZE, chunk_size: int = DEFAULT_ROW_CHUNK,
+                        max_workers: int = 1) -> pd.DataFrame:
+    """Correlation matrix computed in column blocks over chunks of rows.
+
+    ``data`` is a DataFrame or an iterable of DataFrame chunks (e.g. from a
+    streamed CSV or a spill store). Spearman correlation ranks each column
+    first, which needs the whole column, so it requires a DataFrame; missing
+    values are left out of each column's ranking.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method: {method}")
+
+    if isinstance(data, pd.DataFrame):
+        if columns is None:
+            columns = list(data.select_dtypes(include=['number']).columns)
+        if method == "spearman":
+            data = data[list(columns)].rank(method="average", na_option="keep")
+        chunks = iter_row_chunks(data, chunk_size)
+    else:
+        if method == "spearman":
+            raise ValueError("Spearman correlation needs the full DataFrame, not chunks")
+        if columns is None:
+            raise ValueError("Columns must be given when correlating chunks")
+        chunks = data
+
+    accumulator = CorrelationAccumulator(columns, block_size, max_workers)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.result()
+
+
+def cluster_order(corr: pd.DataFrame) -> List[str]:
+    """Leaf order of an average-linkage hierarchical clustering on 1 - |r|.
+
+    Strongly correlated columns end up next to each other, which makes block
+    structure visible in a heatmap. Each merge step is one vectorized argmin
+    over the cluster distance matrix.
+    """
+    n = len(corr.columns)
+    if n <= 2:
+        return list(corr.columns)
+    distance = 1 - np.abs(np.nan_to_num(corr.to_numpy(dtype=np.float64)))
+    np.fill_diagonal(distance, np.inf)
+    sizes = np.ones(n)
+    members: Dict[int, List[int]] = {i: [i] for i in range(n)}
+
+    for _ in range(n - 1):
+        a, b = np.unravel_index(np.argmin(distance), distance.shape)
+        a, b = min(a, b), max(a, b)
+        # Average linkage: size-weighted mean of the two clusters' distances
+        merged = (sizes[a] * distance[a] + sizes[b] * distance[b]) / (sizes[a] + sizes[b])
+        distance[a, :] = merged
+        distance[:, a] = merged
+        distance[a, a] = np.inf
+        distance[b, :] = np.inf
+        distance[:, b] = np.inf
+        sizes[a] += sizes[b]
+        members[a] = members[a] + members.pop(b)
+
+    (order,) = members.values()
+    return [corr.columns[i] for i in order]
+
+
+def strongest_columns(corr: pd.DataFrame, limit: int) -> List[str]:
+    """The ``limit`` columns with the strongest correlation to any other column."""
+    strengths = np.abs(corr.to_numpy(dtype=np.float64))
+    np.fill_diagonal(strengths, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        best = np.nan_to_num(np.nanmax(strengths, axis=1), nan=-1.0)
+    keep = np.sort(np.argsort(-best, kind="stable")[:limit])
+    return [corr.columns[i] for i in keep]
+
+
+def top_k_per_column(corr: pd.DataFrame, k: int = 3) -> pd.DataFrame:
+    """Each column's ``k`` most strongly correlated partners, as rows of column/partner/correlation."""
+    values = corr.to_numpy(dtype=np.float64)
+    strengths = np.abs(values)
+    np.fill_diagonal(strengths, -1.0)
+    strengths = np.nan_to_num(strengths, nan=-1.0)
+    k = min(k, len(corr.columns) - 1)
+    partners = np.argsort(-strengths, axis=1, kind="stable")[:, :k]
+
+    rows = []
+    for i, col in enumerate(corr.columns):
+        for j in partners[i]:
+            if strengths[i, j] >= 0:
+                rows.append((col, corr.columns[j], values[i, j]))
+    return pd.DataFrame(rows, columns=['column', 'partner', 'correlation'])
@@ -1,31 +1,124 @@
 import pandas as pd
 import os
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Sequence, Tuple, Optional
 import re
+from ingestion import (FileIngestor, IngestionCache, SUPPORTED_EXTENSIONS, DEFAULT_WORKERS,
+                       optimize_dtypes, format_bytes, estimate_memory)
+from sketches import ColumnSketch, KMVSketch
+
+# Rows checked by the random pre-screen before a full uniqueness check
+PROFILE_SAMPLE_SIZE = 10_000
+# First prefix checked for duplicates; each further prefix is 8x larger
+PROFILE_PREFIX_SIZE = 100_000
+# Columns up to this many rows get an exact distinct count; longer ones a KMV estimate
+EXACT_CARDINALITY_ROWS = 1_000_000
+# Merges predicted to produce more rows than this trigger the fan-out strategy
+DEFAULT_MAX_MERGE_ROWS = 50_000_000
+# What merge_data does when a merge would exceed the row limit
+FANOUT_STRATEGIES = ("abort", "dedupe", "aggregate")
+# Integer columns with at least this share of distinct values are keys, not measures to sum
+KEY_CARDINALITY_RATIO = 0.5
+
+
+def estimate_cardinality(series: pd.Series, sample: pd.Series) -> int:
+    """Number of distinct values (missing values count as one) of a non-unique column.
+    
+    A sample in which every value repeats has seen (nearly) all of them, so
+    its distinct count is used as is. Otherwise the count is exact for
+    columns up to EXACT_CARDINALITY_ROWS rows and a KMV estimate beyond.
+    """
+    counts = sample.value_counts(dropna=False)
+    if not (counts == 1).any():
+        return len(counts)
+    if len(series) <= EXACT_CARDINALITY_ROWS:
+        return int(series.nunique(dropna=False))
+    has_nulls = bool(series.isna().any())
+    return int(round(KMVSketch.from_series(series).cardinality())) + has_nulls
+
+
+def profile_column(series: pd.Series, sample_size: int = PROFILE_SAMPLE_SIZE,
+                   prefix_size: int = PROFILE_PREFIX_SIZE) -> Dict:
+    """Compute uniqueness and cardinality of a column, stopping at the first duplicate found.
+    
+    A random sample is checked first, then growing prefixes of the column, so
+    non-unique columns are usually rejected after hashing a small fraction of
+    their rows. Returns a dict with 'unique', 'nulls' and 'cardinality'
+    (exact for unique or small columns, see estimate_cardinality otherwise).
+    """
+    n = len(series)
+    nulls = int(series.isna().sum())
+    profile = {'unique': False, 'nulls': nulls, 'cardinality': None}
+    
+    if n <= sample_size:
+        profile['cardinality'] = int(series.nunique(dropna=False))
+        profile['unique'] = profile['cardinality'] == n
+        return profile
+    
+    sample = series.sample(sample_size, random_state=0)
+    sample_distinct = sample.nunique(dropna=False)
+    
+    # More than one missing value or a duplicate in the sample rules out a key
+    if nulls > 1 or sample_distinct < sample_size:
+        profile['cardinality'] = estimate_cardinality(series, sample)
+        return profile
+    
+    size = prefix_size
+    while size < n:
+        if not series.iloc[:size].is_unique:
+            profile['cardinality'] = estimate_cardinality(series, sample)
+            return profile
+        size *= 8
+    
+    profile['unique'] = series.is_unique
+    profile['cardinality'] = n if profile['unique'] else estimate_cardinality(series, sample)
+    return profile
+
 
 class DataMerger:
     def __init__(self):
         self.dataframes: Dict[str, pd.DataFrame] = {}
         self.relationships: List[Tuple[str, str, str, str]] = []  # (table1, table2, key1, key2)
         self.primary_keys: Dict[str, str] = {}  # table_name -> primary_key
+        self.column_profiles: Dict[str, Dict[str, Dict]] = {}  # table_name -> column -> profile
+        self.column_sketches: Dict[str, Dict[str, ColumnSketch]] = {}  # table_name -> column -> sketch
+        self.key_indexes: Dict[str, Dict[str, pd.Index]] = {}  # table_name -> column -> lookup index
 
-    def load_files(self, folder_path: str) -> None:
-        """Load all CSV and Excel files from a folder."""
-        for file in os.listdir(folder_path):
-            if file.endswith(('.csv', '.xlsx')):
-                file_path = os.path.join(folder_path, file)
-                table_name = os.path.splitext(file)[0].lower()
-                
-                try:
-                    if file.endswith('.csv'):
-                        df = pd.read_csv(file_path)
-                    else:
-                        df = pd.read_excel(file_path)
-                    
-                    self.dataframes[table_name] = df
-                    self._detect_primary_key(table_name, df)
-                except Exception as e:
-                    print(f"Error loading {file}: {str(e)}")
+    def load_files(self, folder_path: str, max_workers: int = DEFAULT_WORKERS,
+                   progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                   cache: Optional[IngestionCache] = None, optimize: bool = True) -> None:
+        """Load all CSV and Excel files from a folder.
+        
+        With optimize, each table's columns are converted to compact dtypes.
+        """
+        files = [os.path.join(folder_path, file) for file in sorted(os.listdir(folder_path))
+                 if file.endswith(SUPPORTED_EXTENSIONS)]
+        
+        ingestor = FileIngestor(max_workers=max_workers, progress_callback=progress_callback, cache=cache)
+        dataframes = ingestor.read_files(files)
+        for file, error in ingestor.errors.items():
+            print(f"Error loading {os.path.basename(file)}: {error}")
+        
+        loaded_files = [file for file in files if file not in ingestor.errors]
+        for file_path, df in zip(loaded_files, dataframes):
+            table_name = os.path.splitext(os.path.basename(file_path))[0].lower()
+            if optimize:
+                df, report = optimize_dtypes(df)
+                print(f"Optimized {table_name}: {format_bytes(report['before'])} -> {format_bytes(report['after'])}")
+            self.dataframes[table_name] = df
+            self.column_profiles.pop(table_name, None)
+            self.column_sketches.pop(table_name, None)
+            self.key_indexes.pop(table_name, None)
+            self._detect_primary_key(table_name, df)
+
+    def get_column_profile(self, table_name: str, column: str) -> Dict:
+        """Return the cached profile of a column, computing it on first use."""
+        profiles = self.column_profiles.setdefault(table_name, {})
+        if column not in profiles:
+            profiles[column] = profile_column(self.dataframes[table_name][column])
+        return profiles[column]
+
+    def _is_unique(self, table_name: str, column: str) -> bool:
+        return self.get_column_profile(table_name, column)['unique']
 
     def _detect_primary_key(self, table_name: str, df: pd.DataFrame) -> None:
         """Detect primary key based on column names and data uniqueness."""
@@ -60,7 +153,7 @@ class DataMerger:
             for col in df.columns:
                 if col.lower() == pattern.lower():
                     # Check if column values are unique
-                    if df[col].is_unique:
+                    if self._is_unique(table_name, col):
                         self.primary_keys[table_name] = col
                         print(f"Found primary key for {table_name}: {col} (exact match)")
                         return
@@ -68,7 +161,7 @@ class DataMerger:
         # Try columns that sound like they could be keys
         for col in df.columns:
             col_lower = col.lower()
-            if ('id' in col_lower or 'key' in col_lower or 'code' in col_lower or 'num' in col_lower) and df[col].is_unique:
+            if ('id' in col_lower or 'key' in col_lower or 'code' in col_lower or 'num' in col_lower) and self._is_unique(table_name, col):
                 self.primary_keys[table_name] = col
                 print(f"Found primary key for {table_name}: {col} (contains key term)")
                 return
@@ -76,7 +169,7 @@ class DataMerger:
         # Last resort: check if any column is unique and could be a primary key
         numeric_cols = df.select_dtypes(include=['number']).columns
         for col in numeric_cols:
-            if df[col].is_unique:
+            if self._is_unique(table_name, col):
                 self.primary_keys[table_name] = col
                 print(f"Found primary key for {table_name}: {col} (numeric and unique)")
                 return
@@ -84,8 +177,12 @@ class DataMerger:
         # If we get here, no primary key was detected
         print(f"No primary key detected for {table_name}")
 
-    def detect_relationships(self) -> None:
-        """Detect relationships between tables based on column names and data values."""
+    def detect_relationships(self, use_values: bool = True) -> None:
+        """Detect relationships between tables based on column names and data values.
+        
+        Name patterns are tried first; with use_values, foreign keys with
+        unconventional names are then found by value overlap.
+        """
         # Clear existing relationships
         self.relationships = []
         
@@ -136,100 +233,359 @@ class DataMerger:
                                 # If no primary key is explicitly detected, look for likely candidates
                                 for col2 in df2.columns:
                                     if col2.lower() in ['id', f'{table2}_id', f'{table2}id']:
-                                        if df2[col2].is_unique:
+                                        if self._is_unique(table2, col2):
                                             self.relationships.append((table1, table2, col1, col2))
                                             # Also register this as primary key for future reference
                                             self.primary_keys[table2] = col2
                                             break
         
+        if use_values:
+            self.detect_value_relationships()
+        
         # Print detected relationships for debugging
         print(f"Detected {len(self.relationships)} relationships:")
         for rel in self.relationships:
             print(f"  {rel[0]}.{rel[2]} -> {rel[1]}.{rel[3]}")
 
-    def merge_data(self) -> pd.DataFrame:
-        """Merge tables based on detected relationships."""
+    def get_column_sketch(self, table_name: str, column: str, build_bloom: bool = False) -> ColumnSketch:
+        """Return the cached sketch of a column, building it on first use."""
+        sketches = self.column_sketches.setdefault(table_name, {})
+        sketch = sketches.get(column)
+        if sketch is None or (build_bloom and sketch.bloom is None):
+            sketch = ColumnSketch(self.dataframes[table_name][column], build_bloom=build_bloom)
+            sketches[column] = sketch
+        return sketch
+
+    def _is_key_type(self, series: pd.Series) -> bool:
+        """Whether a column's dtype can hold join keys (integers, strings, categories)."""
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            return False
+        return (pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+                or isinstance(dtype, pd.CategoricalDtype) or dtype == object)
+
+    def detect_value_relationships(self, min_containment: float = 0.9,
+                                   min_coverage: float = 0.01,
+                                   min_numeric_distinct: int = 10) -> List[Tuple[str, str, str, str]]:
+        """Detect foreign keys by estimating value containment between columns.
+        
+        Every unique key-typed column is a candidate referenced key and gets a
+        Bloom filter of its values; every other key-typed column gets a bottom-k
+        sketch. A column references a key when at least min_containment of its
+        sketched distinct values are in the key's filter. Numeric columns must
+        also have min_numeric_distinct values and cover min_coverage of the key's
+        distinct values, so small integer columns such as quantities do not
+        match every id column.
+        Returns the relationships that were added.
+        """
+        # Referenced keys: unique columns of a key-like dtype
+        keys = []
+        for table, df in self.dataframes.items():
+            for col in df.columns:
+                if self._is_key_type(df[col]) and self._is_unique(table, col):
+                    keys.append((table, col, self.get_column_sketch(table, col, build_bloom=True)))
+        
+        existing = set()
+        for t1, t2, c1, c2 in self.relationships:
+            existing.add((t1, c1, t2, c2))
+            existing.add((t2, c2, t1, c1))
+        
+        added = []
+        for table, df in self.dataframes.items():
+            for col in df.columns:
+                # A table's own primary key is not treated as a foreign key
+                if col == self.primary_keys.get(table) or not self._is_key_type(df[col]):
+                    continue
+                sketch = self.get_column_sketch(table, col)
+                cardinality = sketch.cardinality()
+                if cardinality == 0 or (sketch.numeric and cardinality < min_numeric_distinct):
+                    continue
+                
+                best = None
+                for key_table, key_col, key_sketch in keys:
+                    if key_table == table or key_sketch.numeric != sketch.numeric:
+                        continue
+                    key_cardinality = key_sketch.cardinality()
+                    # A contained column cannot have (many) more distinct values than the key
+                    if cardinality > key_cardinality * 1.1:
+                        continue
+                    if sketch.numeric and cardinality < key_cardinality * min_coverage:
+                        continue
+                    containment = sketch.containment_in(key_sketch)
+                    if containment < min_containment:
+                        continue
+                    # Prefer higher containment, then declared primary keys, then tighter keys
+                    rank = (containment, self.primary_keys.get(key_table) == key_col, -key_cardinality)
+                    if best is None or rank > best[0]:
+                        best = (rank, key_table, key_col)
+                
+                if best and (table, col, best[1], best[2]) not in existing:
+                    _, key_table, key_col = best
+                    self.relationships.append((table, key_table, col, key_col))
+                    existing.add((table, col, key_table, key_col))
+                    existing.add((key_table, key_col, table, col))
+                    added.append((table, key_table, col, key_col))
+                    print(f"Found relationship by value overlap: {table}.{col} -> {key_table}.{key_col} "
+                          f"({best[0][0]:.0%} of values matched)")
+        return added
+
+    def plan_merge(self) -> Dict:
+        """Plan the order in which tables are merged by merge_data.
+        
+        Merging starts from the table with the most relationships, as before.
+        The relationship graph is built once, then tables are added greedily
+        in order of the smallest estimated result, using each join key's
+        profiled cardinality. Many-to-one joins keep the row count and run
+        first. Fan-out joins are left for last.
+        
+        Returns a dict with 'start', 'start_rows', the ordered 'steps' and the
+        'unmerged' tables that no relationship reaches.
+        """
         if not self.dataframes:
             raise ValueError("No data loaded")
             
         if not self.relationships:
             raise ValueError("No relationships detected between tables. Please add relationships manually.")
-            
+        
         # Create a graph of relationships to determine merge order
-        relationship_graph = {}
-        for table_name in self.dataframes.keys():
-            relationship_graph[table_name] = []
-            
-        # Add relationships to the graph
-        for rel in self.relationships:
-            table1, table2, col1, col2 = rel
+        relationship_graph = {table_name: [] for table_name in self.dataframes.keys()}
+        for table1, table2, col1, col2 in self.relationships:
             if table1 in relationship_graph:
                 relationship_graph[table1].append((table2, col1, col2))
             if table2 in relationship_graph:
                 relationship_graph[table2].append((table1, col2, col1))
         
         # Find a table to start with (table with most relationships)
-        start_table = max(relationship_graph.keys(), 
-                         key=lambda table: len(relationship_graph[table]), 
-                         default=next(iter(self.dataframes.keys())) if self.dataframes else None)
+        start_table = max(relationship_graph.keys(), key=lambda table: len(relationship_graph[table]))
         
-        if not start_table:
-            raise ValueError("No tables to merge")
-        
-        # Start with the chosen table
-        result_df = self.dataframes[start_table].copy()
+        estimated_rows = len(self.dataframes[start_table])
         merged_tables = {start_table}
-        remaining_tables = set(self.dataframes.keys()) - merged_tables
-        
-        # Keep track of merge attempts to avoid infinite loops
-        merge_attempts = 0
-        max_attempts = len(self.dataframes) * 2  # Allow more attempts than tables
+        steps = []
         
-        # Continue merging until all tables are merged or no more merges are possible
-        while remaining_tables and merge_attempts < max_attempts:
-            merge_attempts += 1
+        while True:
+            # Candidate joins from any merged table to a table not merged yet
+            best = None
+            for table in merged_tables:
+                for target_table, from_col, to_col in relationship_graph[table]:
+                    if target_table in merged_tables:
+                        continue
+                    right_rows = len(self.dataframes[target_table])
+                    profile = self.get_column_profile(target_table, to_col)
+                    # Average number of right-hand rows per key value
+                    multiplicity = 1.0 if profile['unique'] else right_rows / max(profile['cardinality'] or 1, 1)
+                    step = {
+                        'table': target_table,
+                        'from_table': table,
+                        'left_on': from_col,
+                        'right_on': to_col,
+                        'strategy': 'lookup' if profile['unique'] else 'merge',
+                        'multiplicity': multiplicity,
+                        'estimated_rows': int(estimated_rows * max(multiplicity, 1.0))
+                    }
+                    # Smallest result first; among equals, the smaller table
+                    rank = (step['estimated_rows'], right_rows)
+                    if best is None or rank < best[0]:
+                        best = (rank, step)
             
-            # Try to find a table to merge
-            merge_found = False
+            if best is None:
+                break
+            best = best[1]
+            steps.append(best)
+            merged_tables.add(best['table'])
+            estimated_rows = best['estimated_rows']
+        
+        return {
+            'start': start_table,
+            'start_rows': len(self.dataframes[start_table]),
+            'steps': steps,
+            'unmerged': sorted(set(self.dataframes.keys()) - merged_tables)
+        }
+
+    def explain_merge(self, plan: Optional[Dict] = None) -> str:
+        """Describe a merge plan (by default the current one) in readable form."""
+        if plan is None:
+            plan = self.plan_merge()
+        
+        lines = [f"Start with {plan['start']} ({plan['start_rows']:,} rows)"]
+        for i, step in enumerate(plan['steps'], 1):
+            join = f"{step['from_table']}.{step['left_on']} = {step['table']}.{step['right_on']}"
+            if step['strategy'] == 'lookup':
+                detail = "indexed lookup"
+            else:
+                detail = f"merge, ~{step['multiplicity']:.1f} rows per key"
+            lines.append(f"{i}. {step['table']} on {join} ({detail}) -> ~{step['estimated_rows']:,} rows")
+        if plan['unmerged']:
+            lines.append(f"Not connected: {', '.join(plan['unmerged'])}")
+        return "\n".join(lines)
+
+    def _key_index(self, table_name: str, column: str) -> pd.Index:
+        """Return a cached hash index over a unique key column for lookups."""
+        indexes = self.key_indexes.setdefault(table_name, {})
+        if column not in indexes:
+            indexes[column] = pd.Index(self.dataframes[table_name][column])
+        return indexes[column]
+
+    def _lookup_join(self, left_df: pd.DataFrame, step: Dict,
+                     right_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Left-join a table on a unique key through its cached index.
+        
+        Gives the same columns as pd.merge(how='left') without building a hash
+        table for the right side on every merge. A derived right_df (e.g. a
+        deduplicated table) can be passed instead of the loaded table.
+        """
+        left_on, right_on = step['left_on'], step['right_on']
+        if right_df is None:
+            right_df = self.dataframes[step['table']]
+            key_index = self._key_index(step['table'], right_on)
+        else:
+            key_index = pd.Index(right_df[right_on])
+        
+        positions = key_index.get_indexer(left_df[left_on])
+        # Position -1 (no match) is not in the RangeIndex, so reindex fills it with NaN
+        right_part = right_df.reset_index(drop=True).reindex(positions)
+        right_part.index = left_df.index
+        if left_on == right_on:
+            right_part = right_part.drop(columns=[right_on])
+        
+        # Suffix overlapping columns the way pd.merge does
+        overlap = set(left_df.columns) & set(right_part.columns)
+        if overlap:
+            left_df = left_df.rename(columns={col: f"{col}_x" for col in overlap})
+            right_part = right_part.rename(columns={col: f"{col}_y" for col in overlap})
+        return pd.concat([left_df, right_part], axis=1)
+
+    def predict_merge(self, left_df: pd.DataFrame, step: Dict) -> Dict:
+        """Predict the size of a left merge from the key multiplicities on both sides.
+        
+        Returns the predicted 'rows' and 'bytes' of the result and the largest
+        number of rows sharing a key on the 'left' and 'right' side.
+        """
+        right_df = self.dataframes[step['table']]
+        left_counts = left_df[step['left_on']].value_counts(dropna=False)
+        right_counts = right_df[step['right_on']].value_counts(dropna=False)
+        
+        # Matched keys multiply; unmatched left rows are kept once
+        matched = right_counts.reindex(left_counts.index).fillna(1)
+        rows = int((left_counts * matched).sum())
+        
+        row_bytes = 0
+        for df in (left_df, right_df):
+            if len(df):
+                row_bytes += estimate_memory(df) / len(df)
+        
+        return {
+            'rows': rows,
+            'bytes': int(rows * row_bytes),
+            'left': int(left_counts.max()) if len(left_counts) else 0,
+            'right': int(right_counts.max()) if len(right_counts) else 0
+        }
+
+    def _is_key_column(self, table_name: str, column: str) -> bool:
+        """Whether a column identifies rows rather than measuring something.
+        
+        Primary and relationship keys, columns named like ids and integer
+        columns that are unique or nearly so count as keys.
+        """
+        if self.primary_keys.get(table_name) == column:
+            return True
+        for table1, table2, col1, col2 in self.relationships:
+            if (table1, col1) == (table_name, column) or (table2, col2) == (table_name, column):
+                return True
+        name = str(column).lower()
+        if name == 'id' or name.endswith('_id'):
+            return True
+        series = self.dataframes[table_name][column]
+        if not pd.api.types.is_integer_dtype(series.dtype):
+            return False
+        profile = self.get_column_profile(table_name, column)
+        return profile['unique'] or (profile['cardinality'] or 0) >= KEY_CARDINALITY_RATIO * len(series)
+
+    def _aggregate_table(self, table_name: str, key: str, keep_first: Sequence[str] = ()) -> pd.DataFrame:
+        """Collapse a table to one row per key.
+        
+        Numeric measure columns are summed; key columns (see _is_key_column),
+        the columns in ``keep_first`` and non-numeric columns keep the first value.
+        """
+        df = self.dataframes[table_name]
+        aggregations = {}
+        for col in df.columns:
+            if col == key:
+                continue
+            dtype = df[col].dtype
+            numeric = pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+            measure = numeric and col not in keep_first and not self._is_key_column(table_name, col)
+            aggregations[col] = 'sum' if measure else 'first'
+        
+        grouped = df.groupby(key, sort=False, dropna=False, observed=True)
+        result = grouped.agg(aggregations) if aggregations else pd.DataFrame(index=grouped.size().index)
+        result[f"{table_name}_rows"] = grouped.size()
+        return result.reset_index()
+
+    def merge_data(self, progress_callback: Optional[Callable[[str], None]] = None,
+                   plan: Optional[Dict] = None, max_rows: Optional[int] = DEFAULT_MAX_MERGE_ROWS,
+                   fanout_strategy: str = "abort", keep_first: Sequence[str] = ()) -> pd.DataFrame:
+        """Merge tables based on detected relationships, following plan_merge.
+        
+        progress_callback, if given, is called with a status message before each merge.
+        
+        Before each join on a non-unique key the result size is predicted. If
+        it exceeds max_rows, fanout_strategy decides what happens: "abort"
+        raises ValueError, "dedupe" keeps the first row per key and
+        "aggregate" collapses the table to one row per key before joining,
+        summing its measure columns (not its keys or the ``keep_first`` columns).
+        """
+        if fanout_strategy not in FANOUT_STRATEGIES:
+            raise ValueError(f"Unknown fan-out strategy: {fanout_strategy}")
+        
+        if plan is None:
+            plan = self.plan_merge()
+        print(self.explain_merge(plan))
+        
+        result_df = self.dataframes[plan['start']]
+        for step in plan['steps']:
+            message = f"Merging {step['table']} with {step['from_table']} on {step['left_on']}={step['right_on']}"
+            print(message)
+            if progress_callback:
+                progress_callback(message)
             
-            # Look for direct connections to already merged tables
-            for table in list(merged_tables):  # Use a copy since we're modifying the set
-                for target_table, from_col, to_col in relationship_graph.get(table, []):
-                    if target_table in remaining_tables:
-                        # Merge this table
-                        print(f"Merging {target_table} with {table} on {from_col}={to_col}")
-                        
-                        # Determine which table is already in result_df
-                        if table in merged_tables:
-                            left_on, right_on = from_col, to_col
-                            right_df = self.dataframes[target_table]
-                        else:
-                            left_on, right_on = to_col, from_col
-                            right_df = self.dataframes[table]
-                        
-                        # Perform the merge
-                        result_df = pd.merge(
-                            result_df,
-                            right_df,
-                            left_on=left_on,
-                            right_on=right_on,
-                            how='left'
-                        )
-                        
-                        # Mark the table as merged
-                        merged_tables.add(target_table)
-                        remaining_tables.remove(target_table)
-                        merge_found = True
+            if step['strategy'] == 'lookup':
+                result_df = self._lookup_join(result_df, step)
+                continue
             
-            # If no merges were performed in this iteration, we can't continue
-            if not merge_found:
-                break
+            prediction = self.predict_merge(result_df, step)
+            print(f"Predicted {prediction['rows']:,} rows ({format_bytes(prediction['bytes'])}); "
+                  f"up to {prediction['right']} rows per key in {step['table']}")
+            if max_rows is not None and prediction['rows'] > max_rows:
+                message = (f"Merging {step['table']} on {step['right_on']} would produce ~{prediction['rows']:,} rows "
+                           f"({format_bytes(prediction['bytes'])}), above the limit of {max_rows:,}: "
+                           f"up to {prediction['right']} rows share a key")
+                if fanout_strategy == "abort":
+                    raise ValueError(message)
+                
+                if fanout_strategy == "dedupe":
+                    print(f"{message}. Keeping the first row per key.")
+                    right_df = self.dataframes[step['table']].drop_duplicates(subset=[step['right_on']])
+                else:
+                    print(f"{message}. Aggregating to one row per key.")
+                    right_df = self._aggregate_table(step['table'], step['right_on'], keep_first)
+                result_df = self._lookup_join(result_df, step, right_df)
+            else:
+                result_df = pd.merge(
+                    result_df,
+                    self.dataframes[step['table']],
+                    left_on=step['left_on'],
+                    right_on=step['right_on'],
+                    how='left'
+                )
         
         # Warn about unmerged tables
-        if remaining_tables:
-            unmerged = ", ".join(remaining_tables)
+        if plan['unmerged']:
+            unmerged = ", ".join(plan['unmerged'])
             print(f"Warning: Could not find relationships to merge these tables: {unmerged}")
         
+        # Never hand out the loaded table itself
+        if not plan['steps']:
+            result_df = result_df.copy()
         return result_df
 
     def get_table_info(self) -> Dict:
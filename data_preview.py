@@ -0,0 +1,121 @@
+from tkinter import ttk
+import pandas as pd
+from typing import List, Optional
+
+
+class VirtualPreview:
+    """Windowed Treeview model that only materializes the rows currently in view.
+
+    The Treeview never holds more than ``visible + 2 * overscan`` items. The
+    vertical scrollbar represents the full DataFrame, and scrolling re-fills the
+    existing items from the DataFrame's column arrays, so memory stays
+    proportional to the window and jumping to any row offset is constant time.
+    """
+
+    def __init__(self, tree: ttk.Treeview, vsb: ttk.Scrollbar, overscan: int = 20,
+                 column_width: int = 100):
+        self.tree = tree
+        self.vsb = vsb
+        self.overscan = overscan
+        self.column_width = column_width
+        self.df: Optional[pd.DataFrame] = None
+        self.arrays: List = []
+        self.n_rows = 0
+        self.offset = 0          # first row shown at the top of the view
+        self.window_start = 0    # first row materialized in the Treeview
+        self.window_len = 0      # number of rows materialized in the Treeview
+        self.visible_rows = max(int(tree.cget("height")), 1)
+
+        # The scrollbar drives our row offset instead of the Treeview's own yview
+        self.tree.configure(yscrollcommand=lambda *args: None)
+        self.vsb.config(command=self._on_scrollbar)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_mousewheel)
+        self.tree.bind("<Configure>", self._on_resize, add="+")
+
+    def set_dataframe(self, df: pd.DataFrame) -> None:
+        """Show a new DataFrame, resetting the view to the first row."""
+        self.df = df
+        self.n_rows = len(df)
+        # Hold references to the column arrays; slicing them is O(window)
+        self.arrays = [df.iloc[:, i].array for i in range(df.shape[1])]
+
+        columns = [str(col) for col in df.columns]
+        self.tree.delete(*self.tree.get_children())
+        self.tree["columns"] = columns
+        self.tree["show"] = "headings"
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=self.column_width, anchor="center")
+
+        self.offset = 0
+        self.window_start = 0
+        self.window_len = 0
+        self._materialize(0)
+        self._sync()
+
+    def jump_to(self, row: int) -> None:
+        """Scroll so that ``row`` is the first visible row."""
+        max_offset = max(self.n_rows - self.visible_rows, 0)
+        self.offset = min(max(int(row), 0), max_offset)
+        if (self.offset < self.window_start or
+                self.offset + self.visible_rows > self.window_start + self.window_len):
+            self._materialize(self.offset - self.overscan)
+        self._sync()
+
+    def _materialize(self, start: int) -> None:
+        """Fill the Treeview with the window of rows beginning at ``start``."""
+        size = min(self.visible_rows + 2 * self.overscan, self.n_rows)
+        start = min(max(start, 0), max(self.n_rows - size, 0))
+        rows = zip(*[arr[start:start + size] for arr in self.arrays]) if self.arrays else []
+
+        items = self.tree.get_children()
+        if len(items) > size:
+            self.tree.delete(*items[size:])
+            items = items[:size]
+        for i, values in enumerate(rows):
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert("", "end", values=values)
+
+        self.window_start = start
+        self.window_len = size
+
+    def _sync(self) -> None:
+        """Position the Treeview within its window and update the scrollbar."""
+        if self.window_len:
+            self.tree.yview_moveto((self.offset - self.window_start) / self.window_len)
+        if self.n_rows:
+            first = self.offset / self.n_rows
+            last = min(self.offset + self.visible_rows, self.n_rows) / self.n_rows
+            self.vsb.set(first, last)
+        else:
+            self.vsb.set(0.0, 1.0)
+
+    def _on_scrollbar(self, action, amount=None, unit=None):
+        if action == "moveto":
+            self.jump_to(round(float(amount) * self.n_rows))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.jump_to(self.offset + int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.jump_to(self.offset + delta * 3)
+        return "break"
+
+    def _on_resize(self, event):
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or 20
+        # Leave room for the heading row
+        visible = max(event.height // int(row_height) - 1, 1)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            if self.df is not None:
+                self._materialize(self.offset - self.overscan)
+                self.jump_to(self.offset)
@@ -0,0 +1,67 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from type_detection import (DEFAULT_TYPE_SAMPLE, ColumnTypeProfiler, guess_date_format, parse_dates,
+                            stratified_positions)
+
+# Components added next to a date column as <column>_<component>
+DATE_COMPONENTS = ("year", "month", "week", "day")
+
+
+def infer_date_format(series: pd.Series, sample_size: int = DEFAULT_TYPE_SAMPLE) -> Optional[str]:
+    """Guess the format of a string column from a stratified row sample (or of its categories)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = pd.Series(series.cat.categories)
+        if not pd.api.types.is_string_dtype(categories.dtype):
+            return None
+        return guess_date_format(categories.iloc[stratified_positions(len(categories), sample_size)])
+    sample = series.iloc[stratified_positions(len(series), sample_size)]
+    return guess_date_format(sample)
+
+
+def detect_date_columns(df: pd.DataFrame, columns: List[str]) -> List[str]:
+    """The columns holding date strings, including categoricals whose categories are dates."""
+    profiles = ColumnTypeProfiler(df).profile(columns)
+    return [col for col in columns if profiles[col]['type'] == 'date']
+
+
+def standardize_dates(series: pd.Series, date_format: Optional[str] = None) -> Tuple[pd.Series, Optional[str]]:
+    """Parse a column to datetime64 and return it with the format used.
+
+    The format is inferred from a sample when not given, and every distinct
+    value is parsed once; values that do not match it become NaT. Columns that already hold datetimes are returned
+    as they are.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series, None
+    if date_format is None:
+        date_format = infer_date_format(series)
+        if date_format is None:
+            raise ValueError(f"Could not infer the date format of {series.name}")
+    return parse_dates(series, date_format), date_format
+
+
+def date_components(dates: pd.Series) -> Dict[str, pd.Series]:
+    """Year, month, ISO week and day of a datetime column, as compact integer columns.
+
+    Components are computed on the distinct dates and mapped back to the
+    rows; missing dates make the components nullable.
+    """
+    codes, uniques = pd.factorize(dates)
+    uniques = pd.DatetimeIndex(uniques)
+    values = {
+        "year": (uniques.year, "int16"),
+        "month": (uniques.month, "int8"),
+        "week": (uniques.isocalendar().week.to_numpy(), "int8"),
+        "day": (uniques.day, "int8"),
+    }
+    missing = codes < 0
+    components = {}
+    for name, (component, dtype) in values.items():
+        # The padding value is what missing dates (code -1) pick up
+        column = np.append(np.asarray(component, dtype=dtype), 0).astype(dtype)[codes]
+        if missing.any():
+            column = pd.arrays.IntegerArray(column, missing)
+        components[name] = pd.Series(column, index=dates.index)
+    return components
@@ -0,0 +1,88 @@
+from typing import Tuple
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_POINTS = 5_000
+DOWNSAMPLING_METHODS = ("lttb", "minmax")
+
+
+def _as_numeric(values: np.ndarray) -> np.ndarray:
+    """Float view of x values; datetimes become nanoseconds since the epoch."""
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the points kept by largest-triangle-three-buckets.
+
+    ``x`` must be sorted. The first and last points are always kept; in each
+    of the ``n_out - 2`` buckets between them the point forming the largest
+    triangle with the previously kept point and the next bucket's average is
+    chosen, which preserves the visual shape of the line.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Averages of every bucket (the last "bucket" is the final point alone)
+    starts = np.append(edges[:-1], n - 1)
+    sizes = np.diff(np.append(starts, n))
+    avg_x = np.add.reduceat(x, starts) / sizes
+    avg_y = np.add.reduceat(y, starts) / sizes
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each of ``n_out // 2`` equal buckets."""
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    # Trailing buckets can be entirely padding once n is not a multiple of size
+    filled = ~np.isnan(buckets).all(axis=1)
+    offsets = np.arange(n_buckets)[filled] * size
+    mins = offsets + np.nanargmin(buckets[filled], axis=1)
+    maxs = offsets + np.nanargmax(buckets[filled], axis=1)
+    return np.unique(np.concatenate([mins, maxs]))
+
+
+def downsample(x: pd.Series, y: pd.Series, max_points: int = DEFAULT_MAX_POINTS,
+               method: str = "lttb") -> Tuple[pd.Series, pd.Series]:
+    """Reduce an x/y trace to at most ``max_points`` points for plotting.
+
+    Rows with a missing x or y are dropped and the trace is sorted by x.
+    Traces already within budget are returned as they are (sorted).
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    mask = x.notna().to_numpy() & y.notna().to_numpy()
+    x, y = x[mask], y[mask]
+    order = np.argsort(x.to_numpy(), kind="stable")
+    x, y = x.iloc[order], y.iloc[order]
+    if len(x) <= max_points:
+        return x, y
+
+    y_values = y.to_numpy(dtype=np.float64)
+    if method == "lttb":
+        indices = lttb_indices(_as_numeric(x.to_numpy()), y_values, max_points)
+    else:
+        indices = minmax_indices(y_values, max_points)
+    return x.iloc[indices], y.iloc[indices]
@@ -0,0 +1,165 @@
+import os
+import shutil
+import tempfile
+from typing import Iterable, Iterator, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+# Which row of a group of duplicates stays: the first, the last, or none of them
+DUPLICATE_KEEP = ("first", "last", "none")
+# Hash files the external mode splits the fingerprints into
+DEFAULT_PARTITIONS = 16
+# Missing values hash to the same value whatever the column's dtype
+NA_HASH = np.uint64(2 ** 64 - 1)
+HASH_KEY = "0123456789123456"
+# A second, independent hash guards the external mode against fingerprint collisions
+CHECK_HASH_KEY = "6543219876543210"
+_MULTIPLIER = np.uint64(0x100000001B3)
+_FINGERPRINT_DTYPE = np.dtype([("fingerprint", "u8"), ("check", "u8"), ("row", "i8")])
+
+
+def _hash_values(values, hash_key: str) -> np.ndarray:
+    return pd.util.hash_pandas_object(pd.Series(values), index=False, hash_key=hash_key).to_numpy()
+
+
+def column_hash(series: pd.Series, hash_key: str = HASH_KEY) -> np.ndarray:
+    """64-bit hash of each value that does not depend on how the column is stored.
+
+    Strings hash the same as plain, Arrow-backed or categorical values, and
+    numbers the same whatever their width (they are hashed as float64, so
+    integers beyond 2**53 can collide). Distinct strings are hashed once.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.where(np.isnan(values), NA_HASH, _hash_values(values, hash_key))
+    elif dtype == object or pd.api.types.is_string_dtype(dtype):
+        codes, uniques = pd.factorize(series)
+    else:
+        return np.where(series.isna().to_numpy(), NA_HASH, _hash_values(series, hash_key))
+    # The appended value is what missing values (code -1) pick up
+    return np.append(_hash_values(np.asarray(uniques, dtype=object), hash_key), NA_HASH)[codes]
+
+
+def row_fingerprints(df: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                     hash_key: str = HASH_KEY) -> np.ndarray:
+    """A 64-bit fingerprint of each row's values in ``columns`` (all columns by default)."""
+    columns = list(df.columns) if columns is None else list(columns)
+    fingerprints = np.zeros(len(df), dtype=np.uint64)
+    for col in columns:
+        fingerprints = (fingerprints * _MULTIPLIER) ^ column_hash(df[col], hash_key)
+    return fingerprints
+
+
+def _pandas_keep(keep: str):
+    if keep not in DUPLICATE_KEEP:
+        raise ValueError(f"Unknown duplicate strategy: {keep}")
+    return False if keep == "none" else keep
+
+
+def _same_rows(df: pd.DataFrame, columns: Sequence[str], rows: np.ndarray, others: np.ndarray) -> bool:
+    """Whether the rows at ``rows`` equal those at ``others``, treating missing values as equal."""
+    for col in columns:
+        a = df[col].iloc[rows].reset_index(drop=True)
+        b = df[col].iloc[others].reset_index(drop=True)
+        if not ((a == b).fillna(False) | (a.isna() & b.isna())).all():
+            return False
+    return True
+
+
+def duplicate_mask(df: pd.DataFrame, columns: Optional[Sequence[str]] = None, keep: str = "first",
+                   verify: bool = True) -> np.ndarray:
+    """Mark duplicate rows like DataFrame.duplicated, from one fingerprint per row.
+
+    Rows are compared by fingerprint, so one hash table over 64-bit
+    integers replaces comparing every column. With ``verify`` each flagged
+    row is checked against the first row with its fingerprint; if a
+    collision is found, the exact comparison is used instead.
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    pandas_keep = _pandas_keep(keep)
+    fingerprints = row_fingerprints(df, columns)
+    mask = pd.Series(fingerprints).duplicated(keep=pandas_keep).to_numpy()
+    if not verify or not mask.any():
+        return mask
+
+    codes, _ = pd.factorize(fingerprints)
+    # Codes are numbered in order of first appearance
+    is_first = np.r_[True, codes[1:] > np.maximum.accumulate(codes)[:-1]]
+    first = np.flatnonzero(is_first)
+    flagged = np.flatnonzero(~is_first)
+    if _same_rows(df, columns, flagged, first[codes[flagged]]):
+        return mask
+    return df.duplicated(subset=columns, keep=pandas_keep).to_numpy()
+
+
+class ExternalDeduplicator:
+    """Duplicate detection over chunks of rows with bounded memory.
+
+    ``add`` fingerprints each chunk and appends the fingerprints, a second
+    check hash and the global row numbers to one of ``partitions`` files on
+    disk, chosen by fingerprint, so equal rows always land in the same
+    file. ``dropped_rows`` then loads one partition at a time to find the
+    duplicates, and ``filter`` drops them from a second pass over the same
+    chunks. Only the fingerprints of one partition are in memory at once,
+    never the rows themselves.
+    """
+
+    def __init__(self, columns: Optional[Sequence[str]] = None, keep: str = "first",
+                 partitions: int = DEFAULT_PARTITIONS, directory: Optional[str] = None):
+        self.columns = None if columns is None else list(columns)
+        self.keep = _pandas_keep(keep)
+        self.partitions = partitions
+        self.directory = directory or tempfile.mkdtemp(prefix="insightforge_dedup_")
+        os.makedirs(self.directory, exist_ok=True)
+        self.n_rows = 0
+
+    def _path(self, partition: int) -> str:
+        return os.path.join(self.directory, f"partition-{partition:03d}.bin")
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """Fingerprint a chunk (chunks must be added in row order)."""
+        columns = self.columns if self.columns is not None else list(chunk.columns)
+        records = np.empty(len(chunk), dtype=_FINGERPRINT_DTYPE)
+        records["fingerprint"] = row_fingerprints(chunk, columns)
+        records["check"] = row_fingerprints(chunk, columns, CHECK_HASH_KEY)
+        records["row"] = np.arange(self.n_rows, self.n_rows + len(chunk))
+        self.n_rows += len(chunk)
+
+        partition_of = records["fingerprint"] % np.uint64(self.partitions)
+        order = np.argsort(partition_of, kind="stable")
+        bounds = np.searchsorted(partition_of[order], np.arange(self.partitions + 1))
+        for partition in range(self.partitions):
+            part = records[order[bounds[partition]:bounds[partition + 1]]]
+            if len(part):
+                with open(self._path(partition), "ab") as f:
+                    part.tofile(f)
+
+    def dropped_rows(self) -> np.ndarray:
+        """The sorted row numbers of the duplicates to drop."""
+        dropped: List[np.ndarray] = []
+        for partition in range(self.partitions):
+            if not os.path.exists(self._path(partition)):
+                continue
+            records = np.fromfile(self._path(partition), dtype=_FINGERPRINT_DTYPE)
+            keys = pd.DataFrame({"fingerprint": records["fingerprint"], "check": records["check"]})
+            dropped.append(records["row"][keys.duplicated(keep=self.keep).to_numpy()])
+        return np.sort(np.concatenate(dropped)) if dropped else np.empty(0, dtype=np.int64)
+
+    def filter(self, chunks: Iterable[pd.DataFrame], dropped: Optional[np.ndarray] = None) -> Iterator[pd.DataFrame]:
+        """Yield the chunks (the same ones, in the same order) without the duplicate rows."""
+        dropped = self.dropped_rows() if dropped is None else dropped
+        start = 0
+        for chunk in chunks:
+            rows = dropped[np.searchsorted(dropped, start):np.searchsorted(dropped, start + len(chunk))]
+            keep = np.ones(len(chunk), dtype=bool)
+            keep[rows - start] = False
+            start += len(chunk)
+            yield chunk if keep.all() else chunk[keep]
+
+    def cleanup(self) -> None:
+        """Delete the partition files."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
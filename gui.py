@@ -1,11 +1,26 @@
+import copy
+import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, font
 from PIL import Image, ImageTk  # For background image
 from pivots import create_pivot_table_window
 from visualization import VisualizationConfig
+from data_preview import VirtualPreview
+from ingestion import (FileIngestor, IngestionCache, DEFAULT_WORKERS, DEFAULT_CHUNK_SIZE, HAS_PYARROW,
+                       available_memory, optimize_dtypes, format_bytes)
+from jobs import BackgroundJob
+from cleaning import CleaningPlan, PREVIEW_ROWS
+from categorical_cleaning import categorical_columns, one_hot_estimate
+from pipeline import Pipeline, HAS_YAML
 import pandas as pd
 import numpy as np
 
+# Duplicate removal choices in the cleaning window, by label
+DUPLICATE_KEEP_OPTIONS = {"Keep First": "first", "Keep Last": "last", "Drop All Copies": "none"}
+# Outlier detection choices in the cleaning window, by label
+OUTLIER_METHOD_OPTIONS = {"IQR": "iqr", "Z-Score": "zscore", "MAD": "mad"}
+OUTLIER_ACTION_OPTIONS = {"Flag Outliers": "flag", "Exclude Outlier Rows": "exclude"}
+
 def launch_gui():
     def select_files():
         file_type = file_selection_var.get()
@@ -30,8 +45,6 @@ def launch_gui():
 
     def process_files():
         """Process the selected files."""
-        global merged_df
-        
         try:
             if not selected_files:
                 messagebox.showerror("Error", "No files or folder selected!")
@@ -42,464 +55,578 @@ def launch_gui():
             ignore_special_chars = ignore_special_chars_var.get()
 
             if file_selection_var.get() == "Folder":
-                try:
-                    # Import and use DataMerger
-                    from data_merger import DataMerger
-                    
-                    # Create merger instance
-                    data_merger = DataMerger()
-                    
+                # Import and use DataMerger
+                from data_merger import DataMerger, DEFAULT_MAX_MERGE_ROWS
+                
+                # Create merger instance
+                data_merger = DataMerger()
+                folder = selected_files[0]
+                workers = int(workers_var.get())
+                cache = get_ingestion_cache()
+                optimize = optimize_dtypes_var.get()
+                pipeline.set_inputs([folder], delimiter, remove_spaces, ignore_special_chars, optimize=optimize)
+                
+                def load_folder(job):
                     # Load files from folder
-                    data_merger.load_files(selected_files[0])
+                    data_merger.load_files(folder, max_workers=workers,
+                                           progress_callback=lambda done, total, file:
+                                               job.report_progress(f"Loaded {done}/{total} files"),
+                                           cache=cache, optimize=optimize)
                     
                     # Auto-detect relationships
+                    job.report_progress("Detecting relationships...")
                     data_merger.detect_relationships()
-                    
-                    # Create relationship configuration window
-                    rel_window = tk.Toplevel(root)
-                    rel_window.title("Table Relationships")
-                    rel_window.geometry("1200x800")
-                    rel_window.configure(bg="#f0f0f0")
-                    
-                    # Create a fixed footer frame at the bottom of the window
-                    footer_frame = tk.Frame(rel_window, bg="#2c3e50", height=80)
-                    footer_frame.pack(side="bottom", fill="x")
-                    rel_window.update()
-                    
-                    # Process data function
-                    def process_data():
-                        try:
-                            # Show processing message
-                            processing_label = tk.Label(footer_frame, text="Processing data...", 
-                                                     fg="white", bg="#2c3e50", font=("Arial", 12))
-                            processing_label.pack(pady=5)
-                            rel_window.update()
-                            
-                            # Merge the data based on relationships
-                            global merged_df
-                            merged_df = data_merger.merge_data()
-                            rel_window.destroy()
-                            
-                            # Enable buttons
-                            pivot_button.config(state="normal")
-                            visualization_button.config(state="normal")
-                            save_button.config(state="normal")
-                            
-                            # Open header assignment screen
-                            assign_headers_screen(merged_df)
-                        except Exception as e:
-                            messagebox.showerror("Error", f"Failed to merge data: {str(e)}")
-                    
-                    # Create master frame
-                    master_frame = tk.Frame(rel_window, bg="#f0f0f0")
-                    master_frame.pack(fill="both", expand=True)
-                    
-                    # Content frame
-                    content_frame = tk.Frame(master_frame, bg="#f0f0f0")
-                    content_frame.pack(fill="both", expand=True, padx=10, pady=10)
-                    
-                    # Left and right frames
-                    left_frame = tk.Frame(content_frame, bg="#f0f0f0")
-                    left_frame.pack(side="left", fill="both", expand=True, padx=5)
-                    
-                    right_frame = tk.Frame(content_frame, bg="#f0f0f0")
-                    right_frame.pack(side="right", fill="both", expand=True, padx=5)
-
-                    # Add a table preview button
-                    def preview_table():
-                        try:
-                            selected = tables_listbox.curselection()
-                            if not selected:
-                                messagebox.showinfo("Info", "Please select a table to preview")
-                                return
-                            
-                            table_name = tables_listbox.get(selected[0])
-                            if table_name in data_merger.dataframes:
-                                # Create preview window
-                                preview_window = tk.Toplevel(rel_window)
-                                preview_window.title(f"Preview of {table_name}")
-                                preview_window.geometry("800x600")
+                
+                def show_relationship_window(_):
+                    try:
+                        # Create relationship configuration window
+                        rel_window = tk.Toplevel(root)
+                        rel_window.title("Table Relationships")
+                        rel_window.geometry("1200x800")
+                        rel_window.configure(bg="#f0f0f0")
+                        
+                        # Create a fixed footer frame at the bottom of the window
+                        footer_frame = tk.Frame(rel_window, bg="#2c3e50", height=80)
+                        footer_frame.pack(side="bottom", fill="x")
+                        rel_window.update()
+                        
+                        # Process data function
+                        merge_jobs = []
+                        max_rows_var = tk.StringVar(value=str(DEFAULT_MAX_MERGE_ROWS))
+                        fanout_var = tk.StringVar(value="Abort")
+                        fanout_strategies = {"Abort": "abort", "Keep First Row": "dedupe",
+                                             "Aggregate": "aggregate"}
+                        
+                        def process_data():
+                            try:
+                                max_rows = int(max_rows_var.get()) if max_rows_var.get().strip() else None
+                                fanout_strategy = fanout_strategies[fanout_var.get()]
                                 
-                                # Create text widget with scrollbar for displaying table
-                                preview_frame = tk.Frame(preview_window)
-                                preview_frame.pack(fill="both", expand=True, padx=10, pady=10)
+                                # Record the final keys and relationships for replay
+                                pipeline.set_merge(data_merger.primary_keys, data_merger.relationships,
+                                                   max_rows=max_rows, fanout_strategy=fanout_strategy)
                                 
-                                preview_text = tk.Text(preview_frame, wrap=tk.NONE)
-                                preview_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+                                # Show processing message
+                                processing_label = tk.Label(footer_frame, text="Processing data...", 
+                                                         fg="white", bg="#2c3e50", font=("Arial", 12))
+                                processing_label.pack(pady=5)
+                                process_button.config(state="disabled")
                                 
-                                # Add scrollbars
-                                y_scrollbar = tk.Scrollbar(preview_frame, orient=tk.VERTICAL, command=preview_text.yview)
-                                y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+                                def on_merged(result):
+                                    global merged_df
+                                    merged_df = result
+                                    rel_window.destroy()
                                 
-                                x_scrollbar = tk.Scrollbar(preview_window, orient=tk.HORIZONTAL, command=preview_text.xview)
-                                x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+                                    # Enable buttons
+                                    pivot_button.config(state="normal")
+                                    visualization_button.config(state="normal")
+                                    save_button.config(state="normal")
+                                    save_pipeline_button.config(state="normal")
                                 
-                                preview_text.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+                                    # Open header assignment screen
+                                    assign_headers_screen(merged_df)
                                 
-                                # Display DataFrame
-                                df = data_merger.dataframes[table_name]
-                                preview_text.insert(tk.END, f"Table: {table_name}\n")
-                                preview_text.insert(tk.END, f"Rows: {len(df)}, Columns: {len(df.columns)}\n\n")
-                                preview_text.insert(tk.END, df.head(10).to_string())
-                        except Exception as e:
-                            messagebox.showerror("Error", f"Failed to preview table: {str(e)}")
-
-                    # Tables frame with reduced height
-                    tables_frame = tk.LabelFrame(left_frame, text="Available Tables", font=("Arial", 11, "bold"), 
-                                               bg="#f0f0f0", padx=5, pady=5)
-                    tables_frame.pack(fill="x", pady=5)
-                    
-                    # Tables listbox with reduced height
-                    tables_scroll = tk.Scrollbar(tables_frame)
-                    tables_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-                    tables_listbox = tk.Listbox(tables_frame, height=6, yscrollcommand=tables_scroll.set,
-                                              font=("Arial", 10))
-                    tables_listbox.pack(fill="x", pady=2)
-                    tables_scroll.config(command=tables_listbox.yview)
-                    
-                    # Preview button with smaller size
-                    preview_button = tk.Button(tables_frame, text="Preview Selected Table", 
-                                             command=preview_table, bg="#007BFF", fg="white",
-                                             font=("Arial", 9), padx=10, pady=2)
-                    preview_button.pack(pady=2)
-                    
-                    # Add tables to the listbox
-                    for table_name in data_merger.dataframes.keys():
-                        tables_listbox.insert(tk.END, table_name)
-
-                    # Detected Relationships frame with reduced height
-                    rel_frame = tk.LabelFrame(left_frame, text="Detected Relationships", 
-                                           font=("Arial", 11, "bold"), 
-                                           bg="#f0f0f0", padx=5, pady=5,
-                                           height=150)  # Reduced height
-                    rel_frame.pack(fill="x", pady=5)
-                    rel_frame.pack_propagate(False)
-                    
-                    # Add instructions label with smaller font
-                    instructions_label = tk.Label(rel_frame, 
-                                               text="These relationships will be used for merging. Select and remove any you don't want.",
-                                               fg="#000000", bg="#f0f0f0", 
-                                               font=("Arial", 9))
-                    instructions_label.pack(fill="x", pady=2)
-                    
-                    # Create a canvas for scrolling with reduced height
-                    rel_canvas = tk.Canvas(rel_frame, bg="white", highlightthickness=0)
-                    rel_scrollbar = ttk.Scrollbar(rel_frame, orient="vertical", command=rel_canvas.yview)
-                    
-                    # Create a frame inside the canvas
-                    rel_inner_frame = tk.Frame(rel_canvas, bg="white")
-                    
-                    # Configure the canvas
-                    rel_canvas.configure(yscrollcommand=rel_scrollbar.set)
-                    
-                    # Pack scrollbar and canvas
-                    rel_scrollbar.pack(side="right", fill="y")
-                    rel_canvas.pack(side="left", fill="both", expand=True)
-                    
-                    # Add the inner frame to the canvas
-                    canvas_frame = rel_canvas.create_window((0, 0), window=rel_inner_frame, anchor="nw")
-                    
-                    # Update scroll region when the size changes
-                    def on_rel_frame_configure(e):
-                        rel_canvas.configure(scrollregion=rel_canvas.bbox("all"))
-                        width = rel_canvas.winfo_width()
-                        rel_canvas.itemconfig(canvas_frame, width=width)
-                    
-                    rel_inner_frame.bind("<Configure>", on_rel_frame_configure)
-                    rel_canvas.bind("<Configure>", lambda e: rel_canvas.itemconfig(canvas_frame, width=e.width))
-                    
-                    # Enable mousewheel scrolling
-                    def on_rel_mousewheel(event):
-                        rel_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-                    
-                    rel_canvas.bind_all("<MouseWheel>", on_rel_mousewheel)
-                    
-                    # Create relationship entries with smaller font
-                    def create_delete_command(index):
-                        return lambda: remove_relationship(index)
-                    
-                    for rel in data_merger.relationships:
-                        rel_frame_item = tk.Frame(rel_inner_frame, bg="white", pady=1)
-                        rel_frame_item.pack(fill="x", padx=2)
+                                def on_finish():
+                                    if rel_window.winfo_exists():
+                                        process_button.config(state="normal")
+                                
+                                # Merge the data based on relationships in the background
+                                merge_jobs.append(run_job(
+                                    lambda job: data_merger.merge_data(progress_callback=job.report_progress,
+                                                                       max_rows=max_rows,
+                                                                       fanout_strategy=fanout_strategy),
+                                    on_merged, "Failed to merge data", status=processing_label, on_finish=on_finish))
+                            except Exception as e:
+                                messagebox.showerror("Error", f"Failed to merge data: {str(e)}")
                         
-                        rel_text = f"{rel[0]}.{rel[2]} → {rel[1]}.{rel[3]}"
-                        rel_label = tk.Label(rel_frame_item, 
-                                           text=rel_text,
-                                           font=("Arial", 9),
-                                           bg="white",
-                                           fg="#000000",
-                                           anchor="w",
-                                           padx=2)
-                        rel_label.pack(side="left", fill="x", expand=True)
+                        def explain_plan():
+                            try:
+                                messagebox.showinfo("Merge Plan", data_merger.explain_merge(), parent=rel_window)
+                            except Exception as e:
+                                messagebox.showerror("Error", f"Failed to plan merge: {str(e)}", parent=rel_window)
                         
-                        delete_btn = tk.Button(rel_frame_item,
-                                             text="×",
-                                             font=("Arial", 9, "bold"),
-                                             bg="#ff4444",
-                                             fg="white",
-                                             width=2,
-                                             command=create_delete_command(len(data_merger.relationships)-1))
-                        delete_btn.pack(side="right", padx=2)
-                    
-                    # Primary keys frame with reduced height
-                    pk_frame = tk.LabelFrame(left_frame, text="Primary Keys", font=("Arial", 11, "bold"), 
-                                           bg="#f0f0f0", padx=5, pady=5)
-                    pk_frame.pack(fill="x", pady=5)
-                    
-                    # Primary keys listbox with reduced height
-                    pk_scroll = tk.Scrollbar(pk_frame)
-                    pk_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-                    pk_listbox = tk.Listbox(pk_frame, height=6, yscrollcommand=pk_scroll.set,
-                                          font=("Arial", 10))
-                    pk_listbox.pack(fill="x", pady=2)
-                    pk_scroll.config(command=pk_listbox.yview)
-                    
-                    # Add primary keys to the listbox
-                    for table, pk in data_merger.primary_keys.items():
-                        pk_listbox.insert(tk.END, f"{table}: {pk}")
+                        def cancel_relationships():
+                            # Stop any merge still in flight before closing the window
+                            for job in merge_jobs:
+                                job.cancel()
+                            rel_window.destroy()
 
-                    # Manual configuration frame with improved visibility
-                    config_frame = tk.LabelFrame(right_frame, text="Manual Configuration", font=("Arial", 11, "bold"), 
-                                               bg="#f0f0f0", padx=5, pady=5)
-                    config_frame.pack(fill="x", pady=5)
-                    
-                    # Set Primary Key section
-                    pk_config_frame = tk.LabelFrame(config_frame, text="Set Primary Key", 
-                                                  font=("Arial", 11, "bold"), 
-                                                  bg="#f0f0f0", padx=5, pady=5)
-                    pk_config_frame.pack(fill="x", pady=5, padx=2, anchor="n")
-                    
-                    # Table selection
-                    table_frame = tk.Frame(pk_config_frame, bg="#f0f0f0")
-                    table_frame.pack(fill="x", pady=2)
-                    
-                    tk.Label(table_frame, text="Table:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
-                    table_var = tk.StringVar()
-                    table_combo = ttk.Combobox(table_frame, textvariable=table_var, 
-                                             values=list(data_merger.dataframes.keys()), width=25)
-                    table_combo.pack(side="left", padx=2, fill="x", expand=True)
-                    
-                    # Column selection
-                    column_frame = tk.Frame(pk_config_frame, bg="#f0f0f0")
-                    column_frame.pack(fill="x", pady=2)
-                    
-                    tk.Label(column_frame, text="Primary Key:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
-                    column_var = tk.StringVar()
-                    column_combo = ttk.Combobox(column_frame, textvariable=column_var, width=25)
-                    column_combo.pack(side="left", padx=2, fill="x", expand=True)
-                    
-                    # Update column options when table changes
-                    def update_columns(*args):
-                        table = table_var.get()
-                        if table in data_merger.dataframes:
-                            column_combo['values'] = list(data_merger.dataframes[table].columns)
-                    
-                    table_var.trace_add("write", update_columns)
-                    
-                    # Set primary key button
-                    def set_primary_key():
-                        table = table_var.get()
-                        column = column_var.get()
-                        if table and column:
-                            data_merger.set_primary_key(table, column)
-                            # Update listbox
-                            pk_listbox.delete(0, tk.END)
-                            for t, pk in data_merger.primary_keys.items():
-                                pk_listbox.insert(tk.END, f"{t}: {pk}")
-                    
-                    set_pk_button = tk.Button(pk_config_frame, text="Set Primary Key", command=set_primary_key, 
-                                            bg="#4CAF50", fg="white", font=("Arial", 9), padx=10, pady=2)
-                    set_pk_button.pack(pady=2)
-                    
-                    # Add Relationship section
-                    rel_config_frame = tk.LabelFrame(config_frame, text="Add Relationship", 
-                                                   font=("Arial", 11, "bold"), 
-                                                   bg="#f0f0f0", padx=5, pady=5)
-                    rel_config_frame.pack(fill="x", pady=5, padx=2, anchor="n")
-                    
-                    # From table and column
-                    from_frame = tk.Frame(rel_config_frame, bg="#f0f0f0")
-                    from_frame.pack(fill="x", pady=2)
-                    
-                    tk.Label(from_frame, text="From Table:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
-                    table1_var = tk.StringVar()
-                    table1_combo = ttk.Combobox(from_frame, textvariable=table1_var, 
-                                              values=list(data_merger.dataframes.keys()), width=25)
-                    table1_combo.pack(side="left", padx=2, fill="x", expand=True)
-                    
-                    from_col_frame = tk.Frame(rel_config_frame, bg="#f0f0f0")
-                    from_col_frame.pack(fill="x", pady=2)
-                    
-                    tk.Label(from_col_frame, text="From Column:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
-                    col1_var = tk.StringVar()
-                    col1_combo = ttk.Combobox(from_col_frame, textvariable=col1_var, width=25)
-                    col1_combo.pack(side="left", padx=2, fill="x", expand=True)
-                    
-                    # To table and column
-                    to_frame = tk.Frame(rel_config_frame, bg="#f0f0f0")
-                    to_frame.pack(fill="x", pady=2)
-                    
-                    tk.Label(to_frame, text="To Table:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
-                    table2_var = tk.StringVar()
-                    table2_combo = ttk.Combobox(to_frame, textvariable=table2_var, 
-                                              values=list(data_merger.dataframes.keys()), width=25)
-                    table2_combo.pack(side="left", padx=2, fill="x", expand=True)
-                    
-                    to_col_frame = tk.Frame(rel_config_frame, bg="#f0f0f0")
-                    to_col_frame.pack(fill="x", pady=2)
-                    
-                    tk.Label(to_col_frame, text="To Column:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
-                    col2_var = tk.StringVar()
-                    col2_combo = ttk.Combobox(to_col_frame, textvariable=col2_var, width=25)
-                    col2_combo.pack(side="left", padx=2, fill="x", expand=True)
-                    
-                    # Update column options when tables change
-                    def update_col1(*args):
-                        table = table1_var.get()
-                        if table in data_merger.dataframes:
-                            col1_combo['values'] = list(data_merger.dataframes[table].columns)
-                    
-                    def update_col2(*args):
-                        table = table2_var.get()
-                        if table in data_merger.dataframes:
-                            col2_combo['values'] = list(data_merger.dataframes[table].columns)
-                    
-                    table1_var.trace_add("write", update_col1)
-                    table2_var.trace_add("write", update_col2)
-                    
-                    # Add relationship button
-                    def add_relationship():
-                        t1 = table1_var.get()
-                        c1 = col1_var.get()
-                        t2 = table2_var.get()
-                        c2 = col2_var.get()
-                        if t1 and c1 and t2 and c2:
-                            data_merger.add_relationship(t1, t2, c1, c2)
-                            # Clear and rebuild the relationship display
-                            for widget in rel_inner_frame.winfo_children():
-                                widget.destroy()
-                            # Recreate relationship entries
-                            for i, rel in enumerate(data_merger.relationships):
-                                rel_frame_item = tk.Frame(rel_inner_frame, bg="white", pady=1)
-                                rel_frame_item.pack(fill="x", padx=2)
-                                
-                                rel_text = f"{rel[0]}.{rel[2]} → {rel[1]}.{rel[3]}"
-                                rel_label = tk.Label(rel_frame_item, 
-                                                   text=rel_text,
-                                                   font=("Arial", 9),
-                                                   bg="white",
-                                                   fg="#000000",
-                                                   anchor="w",
-                                                   padx=2)
-                                rel_label.pack(side="left", fill="x", expand=True)
-                                
-                                delete_btn = tk.Button(rel_frame_item,
-                                                     text="×",
-                                                     font=("Arial", 9, "bold"),
-                                                     bg="#ff4444",
-                                                     fg="white",
-                                                     width=2,
-                                                     command=create_delete_command(i))
-                                delete_btn.pack(side="right", padx=2)
-                    
-                    add_rel_button = tk.Button(rel_config_frame, text="Add Relationship", command=add_relationship, 
-                                             bg="#4CAF50", fg="white", font=("Arial", 9), padx=10, pady=2)
-                    add_rel_button.pack(pady=2)
-
-                    # Add remove_relationship function
-                    def remove_relationship(index):
-                        if index < len(data_merger.relationships):
-                            data_merger.relationships.pop(index)
-                            # Clear and rebuild the relationship display
-                            for widget in rel_inner_frame.winfo_children():
-                                widget.destroy()
-                            # Recreate relationship entries
-                            for i, rel in enumerate(data_merger.relationships):
-                                rel_frame_item = tk.Frame(rel_inner_frame, bg="white", pady=1)
-                                rel_frame_item.pack(fill="x", padx=2)
-                                
-                                rel_text = f"{rel[0]}.{rel[2]} → {rel[1]}.{rel[3]}"
-                                rel_label = tk.Label(rel_frame_item, 
-                                                   text=rel_text,
-                                                   font=("Arial", 9),
-                                                   bg="white",
-                                                   fg="#000000",
-                                                   anchor="w",
-                                                   padx=2)
-                                rel_label.pack(side="left", fill="x", expand=True)
+                        # Create master frame
+                        master_frame = tk.Frame(rel_window, bg="#f0f0f0")
+                        master_frame.pack(fill="both", expand=True)
+                        
+                        # Content frame
+                        content_frame = tk.Frame(master_frame, bg="#f0f0f0")
+                        content_frame.pack(fill="both", expand=True, padx=10, pady=10)
+                        
+                        # Left and right frames
+                        left_frame = tk.Frame(content_frame, bg="#f0f0f0")
+                        left_frame.pack(side="left", fill="both", expand=True, padx=5)
+                        
+                        right_frame = tk.Frame(content_frame, bg="#f0f0f0")
+                        right_frame.pack(side="right", fill="both", expand=True, padx=5)
+
+                        # Add a table preview button
+                        def preview_table():
+                            try:
+                                selected = tables_listbox.curselection()
+                                if not selected:
+                                    messagebox.showinfo("Info", "Please select a table to preview")
+                                    return
                                 
-                                delete_btn = tk.Button(rel_frame_item,
-                                                     text="×",
-                                                     font=("Arial", 9, "bold"),
-                                                     bg="#ff4444",
-                                                     fg="white",
-                                                     width=2,
-                                                     command=create_delete_command(i))
-                                delete_btn.pack(side="right", padx=2)
-
-                    # Help text and buttons in footer
-                    help_label = tk.Label(footer_frame, 
-                                       text="Only tables connected by relationships will be merged. Remove unwanted relationships above.",
-                                       fg="white", bg="#2c3e50", font=("Arial", 12, "italic"))
-                    help_label.pack(side="left", fill="x", expand=True, padx=20)
-                    
-                    # Create a frame for the buttons on the right
-                    button_container = tk.Frame(footer_frame, bg="#2c3e50")
-                    button_container.pack(side="right", padx=20)
-                    
-                    # Add cancel button
-                    cancel_button = tk.Button(button_container, text="CANCEL", command=rel_window.destroy,
-                                           bg="#e74c3c", fg="white", font=("Arial", 12, "bold"), 
-                                           padx=20, pady=8)
-                    cancel_button.pack(side="right", padx=(10, 0))
-                    
-                    # Add process button
-                    process_button = tk.Button(button_container, text="PROCESS DATA", command=process_data,
-                                            bg="#27ae60", fg="white", font=("Arial", 12, "bold"), 
-                                            padx=20, pady=8)
-                    process_button.pack(side="right")
+                                table_name = tables_listbox.get(selected[0])
+                                if table_name in data_merger.dataframes:
+                                    # Create preview window
+                                    preview_window = tk.Toplevel(rel_window)
+                                    preview_window.title(f"Preview of {table_name}")
+                                    preview_window.geometry("800x600")
+                                    
+                                    # Create text widget with scrollbar for displaying table
+                                    preview_frame = tk.Frame(preview_window)
+                                    preview_frame.pack(fill="both", expand=True, padx=10, pady=10)
+                                    
+                                    preview_text = tk.Text(preview_frame, wrap=tk.NONE)
+                                    preview_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+                                    
+                                    # Add scrollbars
+                                    y_scrollbar = tk.Scrollbar(preview_frame, orient=tk.VERTICAL, command=preview_text.yview)
+                                    y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+                                    
+                                    x_scrollbar = tk.Scrollbar(preview_window, orient=tk.HORIZONTAL, command=preview_text.xview)
+                                    x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+                                    
+                                    preview_text.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+                                    
+                                    # Display DataFrame
+                                    df = data_merger.dataframes[table_name]
+                                    preview_text.insert(tk.END, f"Table: {table_name}\n")
+                                    preview_text.insert(tk.END, f"Rows: {len(df)}, Columns: {len(df.columns)}\n\n")
+                                    preview_text.insert(tk.END, df.head(10).to_string())
+                            except Exception as e:
+                                messagebox.showerror("Error", f"Failed to preview table: {str(e)}")
+
+                        # Tables frame with reduced height
+                        tables_frame = tk.LabelFrame(left_frame, text="Available Tables", font=("Arial", 11, "bold"), 
+                                                   bg="#f0f0f0", padx=5, pady=5)
+                        tables_frame.pack(fill="x", pady=5)
+                        
+                        # Tables listbox with reduced height
+                        tables_scroll = tk.Scrollbar(tables_frame)
+                        tables_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+                        tables_listbox = tk.Listbox(tables_frame, height=6, yscrollcommand=tables_scroll.set,
+                                                  font=("Arial", 10))
+                        tables_listbox.pack(fill="x", pady=2)
+                        tables_scroll.config(command=tables_listbox.yview)
+                        
+                        # Preview button with smaller size
+                        preview_button = tk.Button(tables_frame, text="Preview Selected Table", 
+                                                 command=preview_table, bg="#007BFF", fg="white",
+                                                 font=("Arial", 9), padx=10, pady=2)
+                        preview_button.pack(pady=2)
+                        
+                        # Add tables to the listbox
+                        for table_name in data_merger.dataframes.keys():
+                            tables_listbox.insert(tk.END, table_name)
+
+                        # Detected Relationships frame with reduced height
+                        rel_frame = tk.LabelFrame(left_frame, text="Detected Relationships", 
+                                               font=("Arial", 11, "bold"), 
+                                               bg="#f0f0f0", padx=5, pady=5,
+                                               height=150)  # Reduced height
+                        rel_frame.pack(fill="x", pady=5)
+                        rel_frame.pack_propagate(False)
+                        
+                        # Add instructions label with smaller font
+                        instructions_label = tk.Label(rel_frame, 
+                                                   text="These relationships will be used for merging. Select and remove any you don't want.",
+                                                   fg="#000000", bg="#f0f0f0", 
+                                                   font=("Arial", 9))
+                        instructions_label.pack(fill="x", pady=2)
+                        
+                        # Create a canvas for scrolling with reduced height
+                        rel_canvas = tk.Canvas(rel_frame, bg="white", highlightthickness=0)
+                        rel_scrollbar = ttk.Scrollbar(rel_frame, orient="vertical", command=rel_canvas.yview)
+                        
+                        # Create a frame inside the canvas
+                        rel_inner_frame = tk.Frame(rel_canvas, bg="white")
+                        
+                        # Configure the canvas
+                        rel_canvas.configure(yscrollcommand=rel_scrollbar.set)
+                        
+                        # Pack scrollbar and canvas
+                        rel_scrollbar.pack(side="right", fill="y")
+                        rel_canvas.pack(side="left", fill="both", expand=True)
+                        
+                        # Add the inner frame to the canvas
+                        canvas_frame = rel_canvas.create_window((0, 0), window=rel_inner_frame, anchor="nw")
+                        
+                        # Update scroll region when the size changes
+                        def on_rel_frame_configure(e):
+                            rel_canvas.configure(scrollregion=rel_canvas.bbox("all"))
+                            width = rel_canvas.winfo_width()
+                            rel_canvas.itemconfig(canvas_frame, width=width)
+                        
+                        rel_inner_frame.bind("<Configure>", on_rel_frame_configure)
+                        rel_canvas.bind("<Configure>", lambda e: rel_canvas.itemconfig(canvas_frame, width=e.width))
+                        
+                        # Enable mousewheel scrolling
+                        def on_rel_mousewheel(event):
+                            rel_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+                        
+                        rel_canvas.bind_all("<MouseWheel>", on_rel_mousewheel)
+                        
+                        # Create relationship entries with smaller font
+                        def create_delete_command(index):
+                            return lambda: remove_relationship(index)
+                        
+                        for rel in data_merger.relationships:
+                            rel_frame_item = tk.Frame(rel_inner_frame, bg="white", pady=1)
+                            rel_frame_item.pack(fill="x", padx=2)
+                            
+                            rel_text = f"{rel[0]}.{rel[2]} → {rel[1]}.{rel[3]}"
+                            rel_label = tk.Label(rel_frame_item, 
+                                               text=rel_text,
+                                               font=("Arial", 9),
+                                               bg="white",
+                                               fg="#000000",
+                                               anchor="w",
+                                               padx=2)
+                            rel_label.pack(side="left", fill="x", expand=True)
+                            
+                            delete_btn = tk.Button(rel_frame_item,
+                                                 text="×",
+                                                 font=("Arial", 9, "bold"),
+                                                 bg="#ff4444",
+                                                 fg="white",
+                                                 width=2,
+                                                 command=create_delete_command(len(data_merger.relationships)-1))
+                            delete_btn.pack(side="right", padx=2)
+                        
+                        # Primary keys frame with reduced height
+                        pk_frame = tk.LabelFrame(left_frame, text="Primary Keys", font=("Arial", 11, "bold"), 
+                                               bg="#f0f0f0", padx=5, pady=5)
+                        pk_frame.pack(fill="x", pady=5)
+                        
+                        # Primary keys listbox with reduced height
+                        pk_scroll = tk.Scrollbar(pk_frame)
+                        pk_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+                        pk_listbox = tk.Listbox(pk_frame, height=6, yscrollcommand=pk_scroll.set,
+                                              font=("Arial", 10))
+                        pk_listbox.pack(fill="x", pady=2)
+                        pk_scroll.config(command=pk_listbox.yview)
+                        
+                        # Add primary keys to the listbox
+                        for table, pk in data_merger.primary_keys.items():
+                            pk_listbox.insert(tk.END, f"{table}: {pk}")
 
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to setup relationship window: {str(e)}")
+                        # Manual configuration frame with improved visibility
+                        config_frame = tk.LabelFrame(right_frame, text="Manual Configuration", font=("Arial", 11, "bold"), 
+                                                   bg="#f0f0f0", padx=5, pady=5)
+                        config_frame.pack(fill="x", pady=5)
+                        
+                        # Set Primary Key section
+                        pk_config_frame = tk.LabelFrame(config_frame, text="Set Primary Key", 
+                                                      font=("Arial", 11, "bold"), 
+                                                      bg="#f0f0f0", padx=5, pady=5)
+                        pk_config_frame.pack(fill="x", pady=5, padx=2, anchor="n")
+                        
+                        # Table selection
+                        table_frame = tk.Frame(pk_config_frame, bg="#f0f0f0")
+                        table_frame.pack(fill="x", pady=2)
+                        
+                        tk.Label(table_frame, text="Table:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
+                        table_var = tk.StringVar()
+                        table_combo = ttk.Combobox(table_frame, textvariable=table_var, 
+                                                 values=list(data_merger.dataframes.keys()), width=25)
+                        table_combo.pack(side="left", padx=2, fill="x", expand=True)
+                        
+                        # Column selection
+                        column_frame = tk.Frame(pk_config_frame, bg="#f0f0f0")
+                        column_frame.pack(fill="x", pady=2)
+                        
+                        tk.Label(column_frame, text="Primary Key:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
+                        column_var = tk.StringVar()
+                        column_combo = ttk.Combobox(column_frame, textvariable=column_var, width=25)
+                        column_combo.pack(side="left", padx=2, fill="x", expand=True)
+                        
+                        # Update column options when table changes
+                        def update_columns(*args):
+                            table = table_var.get()
+                            if table in data_merger.dataframes:
+                                column_combo['values'] = list(data_merger.dataframes[table].columns)
+                        
+                        table_var.trace_add("write", update_columns)
+                        
+                        # Set primary key button
+                        def set_primary_key():
+                            table = table_var.get()
+                            column = column_var.get()
+                            if table and column:
+                                data_merger.set_primary_key(table, column)
+                                # Update listbox
+                                pk_listbox.delete(0, tk.END)
+                                for t, pk in data_merger.primary_keys.items():
+                                    pk_listbox.insert(tk.END, f"{t}: {pk}")
+                        
+                        set_pk_button = tk.Button(pk_config_frame, text="Set Primary Key", command=set_primary_key, 
+                                                bg="#4CAF50", fg="white", font=("Arial", 9), padx=10, pady=2)
+                        set_pk_button.pack(pady=2)
+                        
+                        # Add Relationship section
+                        rel_config_frame = tk.LabelFrame(config_frame, text="Add Relationship", 
+                                                       font=("Arial", 11, "bold"), 
+                                                       bg="#f0f0f0", padx=5, pady=5)
+                        rel_config_frame.pack(fill="x", pady=5, padx=2, anchor="n")
+                        
+                        # From table and column
+                        from_frame = tk.Frame(rel_config_frame, bg="#f0f0f0")
+                        from_frame.pack(fill="x", pady=2)
+                        
+                        tk.Label(from_frame, text="From Table:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
+                        table1_var = tk.StringVar()
+                        table1_combo = ttk.Combobox(from_frame, textvariable=table1_var, 
+                                                  values=list(data_merger.dataframes.keys()), width=25)
+                        table1_combo.pack(side="left", padx=2, fill="x", expand=True)
+                        
+                        from_col_frame = tk.Frame(rel_config_frame, bg="#f0f0f0")
+                        from_col_frame.pack(fill="x", pady=2)
+                        
+                        tk.Label(from_col_frame, text="From Column:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
+                        col1_var = tk.StringVar()
+                        col1_combo = ttk.Combobox(from_col_frame, textvariable=col1_var, width=25)
+                        col1_combo.pack(side="left", padx=2, fill="x", expand=True)
+                        
+                        # To table and column
+                        to_frame = tk.Frame(rel_config_frame, bg="#f0f0f0")
+                        to_frame.pack(fill="x", pady=2)
+                        
+                        tk.Label(to_frame, text="To Table:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
+                        table2_var = tk.StringVar()
+                        table2_combo = ttk.Combobox(to_frame, textvariable=table2_var, 
+                                                  values=list(data_merger.dataframes.keys()), width=25)
+                        table2_combo.pack(side="left", padx=2, fill="x", expand=True)
+                        
+                        to_col_frame = tk.Frame(rel_config_frame, bg="#f0f0f0")
+                        to_col_frame.pack(fill="x", pady=2)
+                        
+                        tk.Label(to_col_frame, text="To Column:", bg="#f0f0f0", width=12, anchor="w").pack(side="left", padx=2)
+                        col2_var = tk.StringVar()
+                        col2_combo = ttk.Combobox(to_col_frame, textvariable=col2_var, width=25)
+                        col2_combo.pack(side="left", padx=2, fill="x", expand=True)
+                        
+                        # Update column options when tables change
+                        def update_col1(*args):
+                            table = table1_var.get()
+                            if table in data_merger.dataframes:
+                                col1_combo['values'] = list(data_merger.dataframes[table].columns)
+                        
+                        def update_col2(*args):
+                            table = table2_var.get()
+                            if table in data_merger.dataframes:
+                                col2_combo['values'] = list(data_merger.dataframes[table].columns)
+                        
+                        table1_var.trace_add("write", update_col1)
+                        table2_var.trace_add("write", update_col2)
+                        
+                        # Add relationship button
+                        def add_relationship():
+                            t1 = table1_var.get()
+                            c1 = col1_var.get()
+                            t2 = table2_var.get()
+                            c2 = col2_var.get()
+                            if t1 and c1 and t2 and c2:
+                                data_merger.add_relationship(t1, t2, c1, c2)
+                                # Clear and rebuild the relationship display
+                                for widget in rel_inner_frame.winfo_children():
+                                    widget.destroy()
+                                # Recreate relationship entries
+                                for i, rel in enumerate(data_merger.relationships):
+                                    rel_frame_item = tk.Frame(rel_inner_frame, bg="white", pady=1)
+                                    rel_frame_item.pack(fill="x", padx=2)
+                                    
+                                    rel_text = f"{rel[0]}.{rel[2]} → {rel[1]}.{rel[3]}"
+                                    rel_label = tk.Label(rel_frame_item, 
+                                                       text=rel_text,
+                                                       font=("Arial", 9),
+                                                       bg="white",
+                                                       fg="#000000",
+                                                       anchor="w",
+                                                       padx=2)
+                                    rel_label.pack(side="left", fill="x", expand=True)
+                                    
+                                    delete_btn = tk.Button(rel_frame_item,
+                                                         text="×",
+                                                         font=("Arial", 9, "bold"),
+                                                         bg="#ff4444",
+                                                         fg="white",
+                                                         width=2,
+                                                         command=create_delete_command(i))
+                                    delete_btn.pack(side="right", padx=2)
+                        
+                        add_rel_button = tk.Button(rel_config_frame, text="Add Relationship", command=add_relationship, 
+                                                 bg="#4CAF50", fg="white", font=("Arial", 9), padx=10, pady=2)
+                        add_rel_button.pack(pady=2)
+
+                        # Add remove_relationship function
+                        def remove_relationship(index):
+                            if index < len(data_merger.relationships):
+                                data_merger.relationships.pop(index)
+                                # Clear and rebuild the relationship display
+                                for widget in rel_inner_frame.winfo_children():
+                                    widget.destroy()
+                                # Recreate relationship entries
+                                for i, rel in enumerate(data_merger.relationships):
+                                    rel_frame_item = tk.Frame(rel_inner_frame, bg="white", pady=1)
+                                    rel_frame_item.pack(fill="x", padx=2)
+                                    
+                                    rel_text = f"{rel[0]}.{rel[2]} → {rel[1]}.{rel[3]}"
+                                    rel_label = tk.Label(rel_frame_item, 
+                                                       text=rel_text,
+                                                       font=("Arial", 9),
+                                                       bg="white",
+                                                       fg="#000000",
+                                                       anchor="w",
+                                                       padx=2)
+                                    rel_label.pack(side="left", fill="x", expand=True)
+                                    
+                                    delete_btn = tk.Button(rel_frame_item,
+                                                         text="×",
+                                                         font=("Arial", 9, "bold"),
+                                                         bg="#ff4444",
+                                                         fg="white",
+                                                         width=2,
+                                                         command=create_delete_command(i))
+                                    delete_btn.pack(side="right", padx=2)
+
+                        # Help text and buttons in footer
+                        help_label = tk.Label(footer_frame, 
+                                           text="Only tables connected by relationships will be merged. Remove unwanted relationships above.",
+                                           fg="white", bg="#2c3e50", font=("Arial", 12, "italic"))
+                        help_label.pack(side="left", fill="x", expand=True, padx=20)
+                        
+                        # Create a frame for the buttons on the right
+                        button_container = tk.Frame(footer_frame, bg="#2c3e50")
+                        button_container.pack(side="right", padx=20)
+                        
+                        # Add cancel button
+                        cancel_button = tk.Button(button_container, text="CANCEL", command=cancel_relationships,
+                                               bg="#e74c3c", fg="white", font=("Arial", 12, "bold"), 
+                                               padx=20, pady=8)
+                        cancel_button.pack(side="right", padx=(10, 0))
+                        
+                        # Add process button
+                        process_button = tk.Button(button_container, text="PROCESS DATA", command=process_data,
+                                                bg="#27ae60", fg="white", font=("Arial", 12, "bold"), 
+                                                padx=20, pady=8)
+                        process_button.pack(side="right")
+                        
+                        # Add explain button
+                        explain_button = tk.Button(button_container, text="EXPLAIN PLAN", command=explain_plan,
+                                                bg="#2980b9", fg="white", font=("Arial", 12, "bold"), 
+                                                padx=20, pady=8)
+                        explain_button.pack(side="right", padx=(0, 10))
+                        
+                        # Row limit for merges that multiply rows
+                        limit_frame = tk.Frame(button_container, bg="#2c3e50")
+                        limit_frame.pack(side="right", padx=(0, 10))
+                        tk.Label(limit_frame, text="Row Limit:", fg="white", bg="#2c3e50").grid(row=0, column=0, sticky="w")
+                        tk.Entry(limit_frame, textvariable=max_rows_var, width=12).grid(row=0, column=1, padx=5)
+                        tk.Label(limit_frame, text="If Exceeded:", fg="white", bg="#2c3e50").grid(row=1, column=0, sticky="w")
+                        ttk.Combobox(limit_frame, textvariable=fanout_var, values=list(fanout_strategies),
+                                     state="readonly", width=14).grid(row=1, column=1, padx=5)
+
+                    except Exception as e:
+                        messagebox.showerror("Error", f"Failed to setup relationship window: {str(e)}")
+                
+                # Loading and relationship detection run off the Tk thread
+                run_job(load_folder, show_relationship_window, "Failed to load folder")
             else:
                 try:
-                    # Handle single or multiple files
-                    dataframes = []
-                    for file in selected_files:
-                        if file.endswith(".csv"):
-                            df = pd.read_csv(file, delimiter=delimiter)
-                        elif file.endswith(".xlsx"):
-                            df = pd.read_excel(file)
-                        else:
-                            continue
-
-                        # Apply cleaning options
-                        if remove_spaces:
-                            df.columns = df.columns.str.strip()
-                        if ignore_special_chars:
-                            df.columns = df.columns.str.replace(r'[^\w\s]', '', regex=True)
-
-                        dataframes.append(df)
-
-                    if not dataframes:
-                        messagebox.showerror("Error", "No valid files found!")
-                        return
-
-                    # Merge all DataFrames
-                    merged_df = pd.concat(dataframes, ignore_index=True)
-
-                    # Enable the Pivot Table Button
-                    pivot_button.config(state="normal")
-                    visualization_button.config(state="normal")
-                    save_button.config(state="normal")
-
-                    # Open header assignment screen
-                    assign_headers_screen(merged_df)
+                    # Handle single or multiple files, reading them concurrently off the Tk thread
+                    files = list(selected_files)
+                    workers = int(workers_var.get())
+                    streaming = streaming_var.get()
+                    chunk_size = int(chunk_size_var.get())
+                    cache = get_ingestion_cache()
+                    optimize = optimize_dtypes_var.get()
+                    if streaming:
+                        # Streaming bounds the memory used while parsing and cleaning, but the
+                        # window still holds the loaded data, so it has to fit in memory
+                        size = sum(os.path.getsize(file) for file in files)
+                        available = available_memory()
+                        if available is not None and size > available:
+                            messagebox.showerror("Error", f"The selected files ({format_bytes(size)}) are larger than "
+                                                          f"the available memory ({format_bytes(available)}). "
+                                                          "Streaming mode still loads the data for the window.")
+                            return
+                    pipeline.set_inputs(files, delimiter, remove_spaces, ignore_special_chars,
+                                        optimize=optimize, streaming=streaming, chunk_size=chunk_size)
+
+                    def load_files(job):
+                        if streaming:
+                            # The same pass as a replay: chunks are parsed, run through the header
+                            # renames and row-local steps recorded so far, spilled to Parquet and
+                            # read back compacted (the data types are optimized there too)
+                            return pipeline.load_data(job.report_progress, workers=workers), {}, None
+
+                        ingestor = FileIngestor(max_workers=workers,
+                                                progress_callback=lambda completed, total, file:
+                                                    job.report_progress(f"Loaded {completed}/{total} files"),
+                                                cache=cache)
+                        dataframes = ingestor.read_files(files, delimiter, remove_spaces, ignore_special_chars)
+                        if not dataframes:
+                            return None, ingestor.errors, None
+
+                        # Merge all DataFrames
+                        job.report_progress("Combining files...")
+                        combined, errors = pd.concat(dataframes, ignore_index=True), ingestor.errors
+
+                        report = None
+                        if optimize:
+                            job.report_progress("Optimizing data types...")
+                            combined, report = optimize_dtypes(combined)
+                        return combined, errors, report
+
+                    def on_loaded(result):
+                        global merged_df
+                        combined, errors, report = result
+
+                        if report:
+                            status_label.config(text=f"Memory: {format_bytes(report['before'])} → "
+                                                     f"{format_bytes(report['after'])} after type optimization")
+
+                        if errors:
+                            failed = "\n".join(f"{file}: {error}" for file, error in errors.items())
+                            messagebox.showwarning("Warning", f"Some files could not be read:\n{failed}")
+
+                        if combined is None:
+                            messagebox.showerror("Error", "No valid files found!")
+                            return
+                        merged_df = combined
+
+                        # Enable the Pivot Table Button
+                        pivot_button.config(state="normal")
+                        visualization_button.config(state="normal")
+                        save_button.config(state="normal")
+                        save_pipeline_button.config(state="normal")
+
+                        # Open header assignment screen
+                        assign_headers_screen(merged_df)
+
+                    run_job(load_files, on_loaded, "Failed to process files")
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to process files: {str(e)}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to initialize file processing: {str(e)}")
 
+    def get_ingestion_cache():
+        """Return the shared parsed-file cache, or None if caching is off or unavailable."""
+        if not use_cache_var.get() or not HAS_PYARROW:
+            return None
+        if not ingestion_caches:
+            ingestion_caches.append(IngestionCache())
+        return ingestion_caches[0]
+
     def save_cleaned_data():
         """Save the cleaned DataFrame to a file."""
         if 'merged_df' not in globals():
@@ -520,11 +647,68 @@ def launch_gui():
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save cleaned data: {e}")
 
+    def save_pipeline():
+        """Save the steps taken so far as a pipeline spec that can be replayed."""
+        file_types = [("JSON Files", "*.json")]
+        if HAS_YAML:
+            file_types.append(("YAML Files", "*.yaml *.yml"))
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=file_types,
+                                                 title="Save Pipeline As")
+        if not file_path:
+            return
+
+        try:
+            pipeline.save(file_path)
+            messagebox.showinfo("Success", f"Pipeline saved successfully to {file_path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save pipeline: {e}")
+
+    def run_pipeline():
+        """Replay a saved pipeline spec: load, merge, clean and write its reports."""
+        file_path = filedialog.askopenfilename(title="Select a Pipeline",
+                                               filetypes=[("Pipeline Files", "*.json *.yaml *.yml")])
+        if not file_path:
+            return
+
+        try:
+            loaded = Pipeline.load(file_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load pipeline: {e}")
+            return
+        workers = int(workers_var.get())
+        cache = get_ingestion_cache()
+
+        def on_replayed(result):
+            global merged_df
+            df, written, errors = result
+            merged_df = df
+            # Further steps extend the replayed pipeline
+            pipeline.spec = loaded.spec
+            update_preview(merged_df)
+
+            pivot_button.config(state="normal")
+            visualization_button.config(state="normal")
+            save_button.config(state="normal")
+            save_pipeline_button.config(state="normal")
+
+            message = f"Pipeline finished: {len(df):,} rows, {len(df.columns)} columns"
+            if written:
+                message += "\n\nReports written:\n" + "\n".join(written)
+            if errors:
+                failed = "\n".join(f"{name}: {error}" for name, error in errors.items())
+                messagebox.showwarning("Warning", f"{message}\n\nSome reports failed:\n{failed}")
+            else:
+                messagebox.showinfo("Success", message)
+
+        run_job(lambda job: loaded.run(progress_callback=job.report_progress, workers=workers, cache=cache),
+                on_replayed, "Failed to run pipeline")
+
             
     def assign_headers_screen(df):
         def save_headers():
             # Get the new headers from user input
             new_headers = [header_var[i].get() for i in range(len(df.columns))]
+            pipeline.set_headers(dict(zip(df.columns, new_headers)))
             df.columns = new_headers  # Assign new headers to the DataFrame
 
             # Display the updated DataFrame (first 10 rows) in the Treeview
@@ -591,6 +775,7 @@ def launch_gui():
             default_value_var = tk.StringVar(value="Unknown")
             enable_duplicates_var = tk.BooleanVar(value=False)
             duplicate_strategy_var = tk.StringVar(value="All Columns")
+            duplicate_keep_var = tk.StringVar(value="Keep First")
             text_cleaning_enabled = tk.BooleanVar(value=False)
             remove_whitespace_var = tk.BooleanVar(value=False)
             remove_extra_spaces_var = tk.BooleanVar(value=False)
@@ -600,26 +785,152 @@ def launch_gui():
             standardize_underscores_var = tk.BooleanVar(value=False)
             standardize_special_chars_var = tk.BooleanVar(value=False)
 
+            # Steps are only recorded here; they run on the full data once, on Proceed.
+            # The plan is rebuilt from the options shown each time, so it never holds stale or repeated steps.
+            plan = CleaningPlan()
+
+            def split_columns(text):
+                return [col.strip() for col in text.split(",") if col.strip()]
+
+            def record_steps():
+                """Replace the plan's steps with the steps selected in the window."""
+                plan.clear()
+                missing = {"strategy": missing_value_strategy_var.get(), "default_value": default_value_var.get()}
+                # A default filled into a column's gaps would hide it from date and numeric
+                # detection, so filling waits for the type steps; dropping goes first
+                fill = missing["strategy"] == "Replace with Default"
+                if not fill:
+                    plan.add("missing_values", **missing)
+                if enable_duplicates_var.get():
+                    columns = None
+                    if duplicate_strategy_var.get() == "Specific Columns":
+                        columns = split_columns(selected_columns_var.get())
+                        if not columns:
+                            raise ValueError("Enter the columns to compare for duplicates")
+                    plan.add("duplicates", columns=columns, keep=DUPLICATE_KEEP_OPTIONS[duplicate_keep_var.get()])
+                if text_cleaning_enabled.get():
+                    plan.add("text_cleaning", strip=remove_whitespace_var.get(),
+                             collapse_spaces=remove_extra_spaces_var.get(), case=text_case_var.get(),
+                             remove_special=remove_special_chars_var.get())
+                if date_cleaning_enabled.get():
+                    date_format = date_format_var.get()
+                    plan.add("date_cleaning", columns=split_columns(date_columns_var.get()) or None,
+                             date_format=None if date_format == "No Change" else date_format,
+                             extract_components=extract_date_components_var.get())
+                if numeric_cleaning_enabled.get():
+                    decimals = None
+                    if round_numbers_var.get():
+                        try:
+                            decimals = int(round_decimal_var.get())
+                        except ValueError:
+                            raise ValueError("Decimal places must be a whole number")
+                    plan.add("numeric_cleaning", columns=split_columns(numeric_columns_var.get()) or None,
+                             remove_currency=remove_currency_var.get(),
+                             convert_percentage=convert_percentage_var.get(),
+                             handle_scientific=handle_scientific_var.get(), decimals=decimals)
+                if categorical_cleaning_enabled.get():
+                    plan.add("categorical_cleaning", columns=split_columns(categorical_columns_var.get()) or None,
+                             standardize=standardize_categories_var.get(),
+                             fill_mode=replace_missing_categories_var.get(), one_hot=one_hot_encode_var.get())
+                if fill:
+                    plan.add("missing_values", **missing)
+                if outlier_detection_enabled.get():
+                    threshold = None
+                    if outlier_threshold_var.get().strip():
+                        try:
+                            threshold = float(outlier_threshold_var.get())
+                        except ValueError:
+                            raise ValueError("The outlier threshold must be a number")
+                    plan.add("outliers", columns=split_columns(outlier_columns_var.get()) or None,
+                             method=OUTLIER_METHOD_OPTIONS[outlier_method_var.get()], threshold=threshold,
+                             group_by=outlier_group_var.get().strip() or None,
+                             action=OUTLIER_ACTION_OPTIONS[outlier_action_var.get()])
+
+            def show_plan():
+                steps = "; ".join(plan.describe()) or "none"
+                status_label.config(text=f"Recorded steps: {steps}")
+
             def apply_cleaning():
                 try:
-                    missing_strategy = missing_value_strategy_var.get()
-                    default_value = default_value_var.get()
-                    if missing_strategy == "Replace with Default":
-                        df.fillna(default_value, inplace=True)
-                    elif missing_strategy == "Drop Rows":
-                        df.dropna(axis=0, inplace=True)
-                    elif missing_strategy == "Drop Columns":
-                        df.dropna(axis=1, inplace=True)
-                    update_preview(df)
-                    messagebox.showinfo("Success", "Data cleaning completed successfully!")
+                    record_steps()
+                    # Preview the plan on the first rows only; the full data is untouched
+                    update_preview(plan.preview(df))
+                    show_plan()
+                    messagebox.showinfo("Preview", f"Showing the cleaning steps applied to the first "
+                                                   f"{PREVIEW_ROWS:,} rows. Click Proceed to apply them "
+                                                   f"to all data.")
                 except Exception as e:
                     messagebox.showerror("Error", f"An error occurred during cleaning: {str(e)}")
 
+            def clear_steps():
+                plan.clear()
+                update_preview(df)
+                show_plan()
+
+            def confirm_one_hot():
+                """Show the size of any one-hot encoding before it runs on the full data."""
+                lines = []
+                for step in plan.steps:
+                    if step["step"] == "categorical_cleaning" and step.get("one_hot"):
+                        for col in categorical_columns(df, step.get("columns")):
+                            estimate = one_hot_estimate(df[col])
+                            lines.append(f"{col}: {estimate['columns']:,} columns, about "
+                                         f"{format_bytes(estimate['sparse_bytes'])} as sparse columns "
+                                         f"({format_bytes(estimate['dense_bytes'])} if dense)")
+                if not lines:
+                    return True
+                return messagebox.askyesno("One-Hot Encoding", "One-hot encoding will add:\n\n" +
+                                           "\n".join(lines) + "\n\nContinue?")
+
             def proceed():
                 try:
-                    # Apply cleaning and close the window
-                    apply_cleaning()
-                    cleaning_window.destroy()
+                    # Run the options as they are now, even if they changed since the last preview
+                    record_steps()
+                    if not confirm_one_hot():
+                        return
+
+                    def on_cleaned(result):
+                        global merged_df
+                        merged_df, details = result
+                        for step in plan.steps:
+                            pipeline.add_cleaning_step(**step)
+                        update_preview(merged_df)
+                        messagebox.showinfo("Success", "Data cleaning completed successfully!" +
+                                            (f"\n\n{details}" if details else ""))
+                        if cleaning_window.winfo_exists():
+                            cleaning_window.destroy()
+
+                    def on_finish():
+                        if cleaning_window.winfo_exists():
+                            apply_button.config(state="normal")
+                            clear_button.config(state="normal")
+                            proceed_button.config(state="normal")
+
+                    def clean(job):
+                        if not pipeline.spec["inputs"].get("streaming"):
+                            cleaned = plan.execute(df, progress_callback=job.report_progress)
+                            return cleaned, "\n".join(plan.report)
+                        # Re-stream the files as a replay would, so the row-local steps clean
+                        # each chunk before it is spilled and duplicates and outliers are
+                        # found on the spilled chunks
+                        replay = Pipeline(copy.deepcopy(pipeline.spec))
+                        for step in plan.steps:
+                            replay.add_cleaning_step(**step)
+                        messages = []
+
+                        def report(message):
+                            messages.append(message)
+                            job.report_progress(message)
+                        cleaned = replay.load_data(report, workers=int(workers_var.get()))
+                        # Keep the outcomes, not the progress notes
+                        return cleaned, "\n".join(message for message in messages
+                                                  if not message.endswith("...") and not message.startswith("Streamed"))
+
+                    apply_button.config(state="disabled")
+                    clear_button.config(state="disabled")
+                    proceed_button.config(state="disabled")
+                    run_job(clean, on_cleaned, "An error occurred during cleaning", status=status_label,
+                            on_finish=on_finish)
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to proceed: {str(e)}")
 
@@ -708,6 +1019,18 @@ def launch_gui():
             )
             strategy_combo.grid(row=1, column=1, pady=5, padx=10, sticky="w")
 
+            tk.Label(duplicate_frame, text="Columns:", bg="#f0f0f0", font=("Arial", 10)).grid(row=2, column=0, pady=5, sticky="w")
+            tk.Entry(duplicate_frame, textvariable=selected_columns_var, width=30, font=("Arial", 10)).grid(row=2, column=1, pady=5, padx=10, sticky="w")
+
+            tk.Label(duplicate_frame, text="Keep:", bg="#f0f0f0", font=("Arial", 10)).grid(row=3, column=0, pady=5, sticky="w")
+            ttk.Combobox(
+                duplicate_frame,
+                textvariable=duplicate_keep_var,
+                values=list(DUPLICATE_KEEP_OPTIONS),
+                width=20,
+                state="readonly"
+            ).grid(row=3, column=1, pady=5, padx=10, sticky="w")
+
             # Step 3: Text Cleaning
             step3_frame = tk.LabelFrame(left_frame, text="Step 3: Text Cleaning", 
                                        font=("Arial", 12, "bold"), bg="#f0f0f0", padx=15, pady=15)
@@ -884,6 +1207,57 @@ def launch_gui():
                 )
                 dtype_combo.pack(side="left", padx=5)
 
+            # Step 10: Outlier Detection
+            step10_frame = tk.LabelFrame(left_frame, text="Step 10: Outlier Detection", 
+                                        font=("Arial", 12, "bold"), bg="#f0f0f0", padx=15, pady=15)
+            step10_frame.pack(fill="x", pady=10)
+
+            outlier_frame = tk.Frame(step10_frame, bg="#f0f0f0")
+            outlier_frame.pack(fill="x", pady=5)
+
+            outlier_detection_enabled = tk.BooleanVar(value=False)
+            tk.Checkbutton(outlier_frame, text="Enable Outlier Detection", 
+                          variable=outlier_detection_enabled, bg="#f0f0f0", font=("Arial", 10)).grid(row=0, column=0, pady=5, sticky="w")
+
+            outlier_columns_var = tk.StringVar(value="")
+            tk.Label(outlier_frame, text="Numeric Columns:", bg="#f0f0f0", font=("Arial", 10)).grid(row=1, column=0, pady=2, sticky="w")
+            tk.Entry(outlier_frame, textvariable=outlier_columns_var, width=30, font=("Arial", 10)).grid(row=1, column=1, pady=2, padx=5, sticky="w")
+
+            outlier_method_var = tk.StringVar(value="IQR")
+            tk.Label(outlier_frame, text="Method:", bg="#f0f0f0", font=("Arial", 10)).grid(row=2, column=0, pady=2, sticky="w")
+            ttk.Combobox(
+                outlier_frame,
+                textvariable=outlier_method_var,
+                values=list(OUTLIER_METHOD_OPTIONS),
+                width=20,
+                state="readonly"
+            ).grid(row=2, column=1, pady=2, padx=5, sticky="w")
+
+            # Empty means the method's default (1.5 IQRs, 3 standard deviations, 3.5 MADs)
+            outlier_threshold_var = tk.StringVar(value="")
+            tk.Label(outlier_frame, text="Threshold:", bg="#f0f0f0", font=("Arial", 10)).grid(row=3, column=0, pady=2, sticky="w")
+            tk.Entry(outlier_frame, textvariable=outlier_threshold_var, width=8, font=("Arial", 10)).grid(row=3, column=1, pady=2, padx=5, sticky="w")
+
+            outlier_group_var = tk.StringVar(value="")
+            tk.Label(outlier_frame, text="Per Group Of:", bg="#f0f0f0", font=("Arial", 10)).grid(row=4, column=0, pady=2, sticky="w")
+            ttk.Combobox(
+                outlier_frame,
+                textvariable=outlier_group_var,
+                values=[""] + list(df.columns),
+                width=20,
+                state="readonly"
+            ).grid(row=4, column=1, pady=2, padx=5, sticky="w")
+
+            outlier_action_var = tk.StringVar(value="Flag Outliers")
+            tk.Label(outlier_frame, text="Action:", bg="#f0f0f0", font=("Arial", 10)).grid(row=5, column=0, pady=2, sticky="w")
+            ttk.Combobox(
+                outlier_frame,
+                textvariable=outlier_action_var,
+                values=list(OUTLIER_ACTION_OPTIONS),
+                width=20,
+                state="readonly"
+            ).grid(row=5, column=1, pady=2, padx=5, sticky="w")
+
             # Step 9: Remove Columns
             step9_frame = tk.LabelFrame(right_frame, text="Step 9: Remove Columns", 
                                        font=("Arial", 12, "bold"), bg="#f0f0f0", padx=15, pady=15)
@@ -924,6 +1298,10 @@ def launch_gui():
                                    bg="#4CAF50", fg="white", font=("Arial", 11), padx=15, pady=5)
             apply_button.pack(side="left", padx=10)
             
+            clear_button = tk.Button(button_frame, text="Clear Steps", command=clear_steps,
+                                   bg="#f44336", fg="white", font=("Arial", 11), padx=15, pady=5)
+            clear_button.pack(side="left", padx=10)
+            
             proceed_button = tk.Button(button_frame, text="Proceed", command=proceed,
                                      bg="#007BFF", fg="white", font=("Arial", 11), padx=15, pady=5)
             proceed_button.pack(side="left", padx=10)
@@ -937,24 +1315,51 @@ def launch_gui():
         except Exception as e:
             messagebox.showerror("Error", f"Failed to initialize cleaning window: {str(e)}")
 
+    def run_job(func, on_success, error_message, status=None, on_finish=None):
+        """Run func(job) on a worker thread, reporting progress in a status label."""
+        status = status or status_label
+
+        def set_status(text):
+            if status.winfo_exists():
+                status.config(text=text)
+
+        def finish():
+            running_jobs.discard(job)
+            if not running_jobs:
+                cancel_job_button.config(state="disabled")
+            if on_finish:
+                on_finish()
+
+        def on_done(result):
+            finish()
+            set_status("Ready")
+            on_success(result)
+
+        def on_error(e):
+            finish()
+            set_status("Ready")
+            messagebox.showerror("Error", f"{error_message}: {str(e)}")
+
+        def on_cancel():
+            finish()
+            set_status("Cancelled")
+
+        job = BackgroundJob(root, func, on_success=on_done, on_error=on_error,
+                            on_progress=lambda text, fraction: set_status(text), on_cancel=on_cancel)
+        running_jobs.add(job)
+        cancel_job_button.config(state="normal")
+        set_status("Working...")
+        return job.start()
+
+    def cancel_jobs():
+        """Cancel every job that is still running."""
+        for job in list(running_jobs):
+            job.cancel()
+
     def update_preview(df):
         """Update the Treeview with the DataFrame."""
-        # Clear the Treeview
-        for item in tree.get_children():
-            tree.delete(item)
-
-        # Update columns
-        tree["columns"] = list(df.columns)
-        tree["show"] = "headings"
-
-        # Add column headers
-        for col in df.columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=100, anchor="center")
-
-        # Add rows
-        for _, row in df.iterrows():
-            tree.insert("", "end", values=list(row))
+        # Only the rows in view are materialized; scrolling pulls new rows on demand
+        preview.set_dataframe(df)
 
     # Set up the main window
     root = tk.Tk()
@@ -986,6 +1391,13 @@ def launch_gui():
     remove_spaces_var = tk.BooleanVar(value=False)
     ignore_special_chars_var = tk.BooleanVar(value=False)
     file_selection_var = tk.StringVar(value="Single File")
+    workers_var = tk.IntVar(value=DEFAULT_WORKERS)
+    streaming_var = tk.BooleanVar(value=False)
+    chunk_size_var = tk.IntVar(value=DEFAULT_CHUNK_SIZE)
+    use_cache_var = tk.BooleanVar(value=HAS_PYARROW)
+    optimize_dtypes_var = tk.BooleanVar(value=True)
+    ingestion_caches = []
+    pipeline = Pipeline()
 
     # File selection frame
     file_frame = tk.LabelFrame(main_frame, text="File Selection", font=("Arial", 12, "bold"), bg="#f0f0f0", padx=10, pady=10)
@@ -1025,6 +1437,16 @@ def launch_gui():
                   bg="#f0f0f0").grid(row=0, column=2, padx=20, pady=5, sticky="w")
     tk.Checkbutton(options_frame, text="Ignore Special Characters", variable=ignore_special_chars_var, 
                   bg="#f0f0f0").grid(row=0, column=3, padx=20, pady=5, sticky="w")
+    tk.Label(options_frame, text="Workers:", bg="#f0f0f0").grid(row=0, column=4, padx=5, pady=5, sticky="w")
+    tk.Spinbox(options_frame, from_=1, to=64, textvariable=workers_var, width=4).grid(row=0, column=5, padx=5, pady=5, sticky="w")
+    tk.Checkbutton(options_frame, text="Streaming Mode (large CSVs)", variable=streaming_var, 
+                  bg="#f0f0f0").grid(row=1, column=2, padx=20, pady=5, sticky="w")
+    tk.Label(options_frame, text="Chunk Rows:", bg="#f0f0f0").grid(row=1, column=3, padx=5, pady=5, sticky="e")
+    tk.Entry(options_frame, textvariable=chunk_size_var, width=10).grid(row=1, column=4, columnspan=2, padx=5, pady=5, sticky="w")
+    tk.Checkbutton(options_frame, text="Cache Parsed Files", variable=use_cache_var, 
+                  bg="#f0f0f0").grid(row=1, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+    tk.Checkbutton(options_frame, text="Compact Data Types", variable=optimize_dtypes_var, 
+                  bg="#f0f0f0").grid(row=2, column=0, columnspan=2, padx=5, pady=5, sticky="w")
 
     # Action buttons frame
     button_frame = tk.Frame(main_frame, bg="#f0f0f0")
@@ -1042,7 +1464,7 @@ def launch_gui():
     
     # Add Visualization Button
     visualization_button = tk.Button(button_frame, text="Create Visualization", 
-                                   command=lambda: VisualizationConfig(root, merged_df).show_config_window(),
+                                   command=lambda: VisualizationConfig(root, merged_df, pipeline).show_config_window(),
                                    state="disabled", bg="#9C27B0", fg="white", font=("Arial", 11), padx=15, pady=5)
     visualization_button.pack(side="left", padx=5)
     
@@ -1051,6 +1473,15 @@ def launch_gui():
                           state="disabled", bg="#007BFF", fg="white", font=("Arial", 11), padx=15, pady=5)
     save_button.pack(side="left", padx=5)
     
+    # Pipeline buttons: save the steps taken so far, or replay a saved run
+    save_pipeline_button = tk.Button(button_frame, text="Save Pipeline", command=save_pipeline,
+                                     state="disabled", bg="#607D8B", fg="white", font=("Arial", 11), padx=15, pady=5)
+    save_pipeline_button.pack(side="left", padx=5)
+    
+    run_pipeline_button = tk.Button(button_frame, text="Run Pipeline", command=run_pipeline,
+                                    bg="#607D8B", fg="white", font=("Arial", 11), padx=15, pady=5)
+    run_pipeline_button.pack(side="left", padx=5)
+    
     # Data preview frame
     preview_frame = tk.LabelFrame(main_frame, text="Data Preview", font=("Arial", 12, "bold"), bg="#f0f0f0", padx=10, pady=10)
     preview_frame.pack(fill="both", expand=True, pady=10)
@@ -1071,14 +1502,18 @@ def launch_gui():
     tree = ttk.Treeview(tree_frame, height=10, yscrollcommand=vsb.set, xscrollcommand=hsb.set)
     tree.pack(fill="both", expand=True)
     
-    # Configure scrollbars
-    vsb.config(command=tree.yview)
+    # Configure scrollbars; the vertical one is driven by the virtual preview
     hsb.config(command=tree.xview)
+    preview = VirtualPreview(tree, vsb)
     
     # Status bar
     status_frame = tk.Frame(root, bg="#007BFF", height=25)
     status_frame.pack(fill="x", side="bottom")
+    cancel_job_button = tk.Button(status_frame, text="Cancel", command=cancel_jobs, state="disabled",
+                                  bg="#f44336", fg="white", font=("Arial", 9), padx=5, pady=0)
+    cancel_job_button.pack(side="right", padx=5)
     status_label = tk.Label(status_frame, text="Ready", fg="white", bg="#007BFF", anchor="w")
     status_label.pack(fill="x", padx=10)
+    running_jobs = set()
    
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,487 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (needed by pandas for Parquet I/O)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+DEFAULT_CHUNK_SIZE = 500_000
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".insightforge", "cache")
+DEFAULT_CACHE_BYTES = 2 * 1024 ** 3
+DEFAULT_SAMPLE_SIZE = 10_000
+
+
+def clean_headers(df: pd.DataFrame, remove_spaces: bool = False,
+                  ignore_special_chars: bool = False) -> pd.DataFrame:
+    """Apply the header cleaning options to a DataFrame's columns."""
+    if remove_spaces:
+        df.columns = df.columns.str.strip()
+    if ignore_special_chars:
+        df.columns = df.columns.str.replace(r'[^\w\s]', '', regex=True)
+    return df
+
+
+def read_file(file: str, delimiter: str = ",", remove_spaces: bool = False,
+              ignore_special_chars: bool = False) -> Optional[pd.DataFrame]:
+    """Read a single CSV/XLSX file and clean its headers.
+
+    Returns None for unsupported file types. Defined at module level so it can
+    be shipped to worker processes.
+    """
+    if file.endswith(".csv"):
+        df = pd.read_csv(file, delimiter=delimiter)
+    elif file.endswith(".xlsx"):
+        df = pd.read_excel(file)
+    else:
+        return None
+    return clean_headers(df, remove_spaces, ignore_special_chars)
+
+
+def format_bytes(n_bytes: float) -> str:
+    """Format a byte count for display, e.g. 1536 -> '1.5 KB'."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n_bytes) < 1024:
+            return f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.1f} TB"
+
+
+def available_memory() -> Optional[int]:
+    """Bytes of physical memory currently available, or None if they cannot be determined."""
+    if HAS_PSUTIL:
+        return int(psutil.virtual_memory().available)
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def estimate_memory(df: pd.DataFrame, sample_size: int = DEFAULT_SAMPLE_SIZE) -> int:
+    """Estimate a DataFrame's memory footprint in bytes.
+
+    Fixed-width columns are measured exactly; object columns are measured on
+    an evenly spaced sample and scaled up, since a deep measurement has to
+    visit every Python object.
+    """
+    total = int(df.index.memory_usage())
+    step = max(len(df) // sample_size, 1)
+    for i in range(df.shape[1]):
+        col = df.iloc[:, i]
+        if col.dtype == object:
+            sample = col.iloc[::step]
+            if len(sample):
+                total += int(sample.memory_usage(deep=True, index=False) * len(col) / len(sample))
+        else:
+            total += int(col.memory_usage(deep=True, index=False))
+    return total
+
+
+def optimize_dtypes(df: pd.DataFrame, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                    category_ratio: float = 0.5) -> Tuple[pd.DataFrame, Dict]:
+    """Convert columns to compact dtypes.
+
+    - integers are downcast to the smallest integer type that holds their range
+    - floats become float32 when every value survives the round trip exactly
+    - string columns whose sampled distinct ratio is below ``category_ratio``
+      become categoricals; other string columns become pyarrow strings
+
+    Decisions about string columns are made on an evenly spaced sample of
+    ``sample_size`` rows. Returns the converted DataFrame and a report with
+    the estimated memory footprint before and after and each changed column.
+    """
+    report = {'before': estimate_memory(df, sample_size), 'after': 0, 'columns': {}}
+    step = max(len(df) // sample_size, 1)
+    # Shallow copy so unchanged columns are shared rather than duplicated
+    df = df.copy(deep=False)
+
+    for i, col in enumerate(df.columns):
+        series = df.iloc[:, i]
+        dtype = series.dtype
+        new_series = None
+
+        if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+            continue
+        elif pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+            new_series = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(dtype) and dtype == np.float64:
+            as_float32 = series.astype(np.float32)
+            if ((as_float32.astype(np.float64) == series) | series.isna()).all():
+                new_series = as_float32
+        elif dtype == object or pd.api.types.is_string_dtype(dtype):
+            sample = series.iloc[::step].dropna()
+            if len(sample) == 0 or pd.api.types.infer_dtype(sample, skipna=True) != "string":
+                continue
+            if sample.nunique() / len(sample) < category_ratio:
+                new_series = series.astype("category")
+            elif dtype == object and HAS_PYARROW:
+                new_series = series.astype("string[pyarrow]")
+
+        if new_series is not None and new_series.dtype != dtype:
+            df.isetitem(i, new_series)
+            report['columns'][col] = (str(dtype), str(new_series.dtype))
+
+    report['after'] = estimate_memory(df, sample_size)
+    return df, report
+
+
+def mixed_types_as_text(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` with the object columns that mix types written as text, as Arrow files need one type per column.
+
+    Such columns arise e.g. when the text default is filled into the missing
+    values of a number column. ``df`` itself is not modified.
+    """
+    mixed = [i for i, dtype in enumerate(df.dtypes) if dtype == object
+             and pd.api.types.infer_dtype(df.iloc[:, i], skipna=True) in ("mixed", "mixed-integer")]
+    if not mixed:
+        return df
+    df = df.copy(deep=False)
+    for i in mixed:
+        df.isetitem(i, df.iloc[:, i].map(str, na_action="ignore"))
+    return df
+
+
+def process_context():
+    """Start method for worker processes.
+
+    Forking a process that already runs threads (the Tk job worker, the CSV
+    thread pool) can deadlock the child on a lock held by another thread, so
+    prefer forkserver where available and spawn elsewhere.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class IngestionCache:
+    """On-disk Feather cache of parsed input files.
+
+    Entries are keyed on the file's absolute path, size and modification time
+    plus the options that affect parsing, so editing a file or changing the
+    delimiter or header cleaning naturally misses the cache. When the total
+    size exceeds ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_BYTES):
+        if not HAS_PYARROW:
+            raise ImportError("The ingestion cache requires pyarrow (pip install pyarrow)")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.index: Dict[str, Dict] = self._read_index()
+
+    def key_for(self, file: str, delimiter: str = ",", remove_spaces: bool = False,
+                ignore_special_chars: bool = False) -> str:
+        """Build the cache key for a file and the options it will be parsed with."""
+        path = os.path.abspath(file)
+        stat = os.stat(path)
+        fingerprint = repr((path, stat.st_size, stat.st_mtime_ns, delimiter,
+                            bool(remove_spaces), bool(ignore_special_chars)))
+        return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return key in self.index and os.path.exists(self._path(key))
+
+    def load(self, key: str) -> Optional[pd.DataFrame]:
+        """Return the cached DataFrame, or None if the entry is missing or unreadable."""
+        try:
+            df = pd.read_feather(self._path(key))
+        except Exception:
+            with self._lock:
+                self._remove(key)
+                self._write_index()
+            return None
+        with self._lock:
+            if key in self.index:
+                self.index[key]["last_used"] = time.time()
+                self._write_index()
+        return df
+
+    def store(self, key: str, df: pd.DataFrame) -> None:
+        """Add a parsed DataFrame to the cache, evicting old entries if needed."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            df.reset_index(drop=True).to_feather(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # e.g. mixed-type object columns that Arrow cannot represent
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            print(f"Could not cache parsed file: {str(e)}")
+            return
+        with self._lock:
+            self.index[key] = {"bytes": os.path.getsize(path), "last_used": time.time()}
+            self._evict()
+            self._write_index()
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry["bytes"] for entry in self.index.values())
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            for key in list(self.index):
+                self._remove(key)
+            self._write_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.feather")
+
+    def _remove(self, key: str) -> None:
+        self.index.pop(key, None)
+        if os.path.exists(self._path(key)):
+            os.remove(self._path(key))
+
+    def _evict(self) -> None:
+        total = sum(entry["bytes"] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self.index[key]["bytes"]
+            self._remove(key)
+
+    def _read_index(self) -> Dict[str, Dict]:
+        try:
+            with open(os.path.join(self.directory, self.INDEX_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self) -> None:
+        # Write atomically so a concurrent reader never sees a partial index
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        tmp_path = f"{index_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, index_path)
+
+
+class FileIngestor:
+    """Read many input files concurrently.
+
+    CSV files are parsed on a thread pool (pandas releases the GIL in its C
+    parser) and XLSX files on a process pool, since openpyxl is pure Python and
+    CPU-bound. Results are returned in input order; failures are collected per
+    file instead of aborting the whole batch. With a ``cache``, unchanged files
+    are loaded from their cached Feather copy instead of being re-parsed.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS,
+                 progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                 cache: Optional[IngestionCache] = None):
+        self.max_workers = max(int(max_workers), 1)
+        self.progress_callback = progress_callback
+        self.cache = cache
+        self.errors: Dict[str, str] = {}
+        self.completed = 0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def progress(self) -> Tuple[int, int]:
+        """(completed, total) for the current batch; safe to poll from the GUI."""
+        with self._lock:
+            return self.completed, self.total
+
+    def read_files(self, files: List[str], delimiter: str = ",", remove_spaces: bool = False,
+                   ignore_special_chars: bool = False) -> List[pd.DataFrame]:
+        """Read all supported files, returning DataFrames in the order given."""
+        files = [f for f in files if f.endswith(SUPPORTED_EXTENSIONS)]
+        self.errors = {}
+        with self._lock:
+            self.completed = 0
+            self.total = len(files)
+
+        results: List[Optional[pd.DataFrame]] = [None] * len(files)
+        args = (delimiter, remove_spaces, ignore_special_chars)
+        keys = [self._cache_key(file, args) for file in files]
+        hits = {i for i, key in enumerate(keys) if key and self.cache.contains(key)}
+
+        def load_cached(i: int) -> Optional[pd.DataFrame]:
+            df = self.cache.load(keys[i])
+            # Fall back to parsing if the cached copy turned out to be unreadable
+            return df if df is not None else read_file(files[i], *args)
+
+        if self.max_workers == 1 or len(files) <= 1:
+            for i, file in enumerate(files):
+                try:
+                    if i in hits:
+                        results[i] = load_cached(i)
+                    else:
+                        results[i] = read_file(file, *args)
+                        self._store(keys[i], results[i])
+                except Exception as e:
+                    self.errors[file] = str(e)
+                self._advance(file)
+            return [df for df in results if df is not None]
+
+        csv_indices = [i for i, f in enumerate(files) if f.endswith(".csv") and i not in hits]
+        xlsx_indices = [i for i, f in enumerate(files) if f.endswith(".xlsx") and i not in hits]
+
+        thread_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        process_pool = ProcessPoolExecutor(max_workers=min(self.max_workers, len(xlsx_indices)),
+                                           mp_context=process_context()) \
+            if len(xlsx_indices) > 1 else None
+        try:
+            futures = {}
+            for i in hits:
+                futures[thread_pool.submit(load_cached, i)] = i
+            for i in csv_indices:
+                futures[thread_pool.submit(read_file, files[i], *args)] = i
+            for i in xlsx_indices:
+                pool = process_pool or thread_pool
+                futures[pool.submit(read_file, files[i], *args)] = i
+
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                    if i not in hits:
+                        self._store(keys[i], results[i])
+                except Exception as e:
+                    self.errors[files[i]] = str(e)
+                self._advance(files[i])
+        finally:
+            # Drop queued reads if we are unwinding early (e.g. a cancelled job)
+            thread_pool.shutdown(wait=True, cancel_futures=True)
+            if process_pool is not None:
+                process_pool.shutdown(wait=True, cancel_futures=True)
+
+        return [df for df in results if df is not None]
+
+    def _cache_key(self, file: str, args: Tuple) -> Optional[str]:
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.key_for(file, *args)
+        except OSError:
+            # Missing/unreadable files are reported when they are parsed
+            return None
+
+    def _store(self, key: Optional[str], df: Optional[pd.DataFrame]) -> None:
+        if key and df is not None:
+            self.cache.store(key, df)
+
+    def _advance(self, file: str) -> None:
+        with self._lock:
+            self.completed += 1
+            completed, total = self.completed, self.total
+        if self.progress_callback:
+            self.progress_callback(completed, total, file)
+
+
+class SpillStore:
+    """On-disk columnar store that a DataFrame is appended to chunk by chunk.
+
+    Each chunk is written as its own Parquet part, so only one chunk needs to
+    be in memory at a time. Parts are read back individually, which lets
+    chunks with slightly different dtypes (e.g. an int column that only has
+    nulls in some chunks) be combined without a shared schema.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        if not HAS_PYARROW:
+            raise ImportError("Streaming mode requires pyarrow (pip install pyarrow)")
+        self.directory = directory or tempfile.mkdtemp(prefix="insightforge_spill_")
+        os.makedirs(self.directory, exist_ok=True)
+        self.parts: List[str] = []
+        self.n_rows = 0
+        self.columns: List[str] = []
+
+    def append(self, df: pd.DataFrame) -> None:
+        """Write one chunk to disk."""
+        if df.empty:
+            return
+        path = os.path.join(self.directory, f"part-{len(self.parts):05d}.parquet")
+        mixed_types_as_text(df).to_parquet(path, index=False)
+        self.parts.append(path)
+        self.n_rows += len(df)
+        for col in df.columns:
+            if col not in self.columns:
+                self.columns.append(col)
+
+    def iter_chunks(self, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """Yield the stored chunks in order, optionally reading only some columns."""
+        for path in self.parts:
+            if columns is None:
+                yield pd.read_parquet(path)
+            else:
+                yield self._read_columns(path, columns)
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load the whole store into a single DataFrame."""
+        chunks = list(self.iter_chunks(columns))
+        if not chunks:
+            return pd.DataFrame(columns=columns or self.columns)
+        return pd.concat(chunks, ignore_index=True)
+
+    def to_csv(self, file_path: str) -> None:
+        """Write the store to a CSV file one chunk at a time."""
+        for i, chunk in enumerate(self.iter_chunks(self.columns)):
+            chunk.to_csv(file_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+
+    def cleanup(self) -> None:
+        """Delete the spilled parts from disk."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.parts = []
+        self.n_rows = 0
+
+    @staticmethod
+    def _read_columns(path: str, columns: List[str]) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+        # Chunks from different files may lack some columns
+        present = [col for col in columns if col in pq.read_schema(path).names]
+        return pd.read_parquet(path, columns=present).reindex(columns=columns)
+
+
+def stream_csv_files(files: List[str], delimiter: str = ",", remove_spaces: bool = False,
+                     ignore_special_chars: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                     store: Optional[SpillStore] = None,
+                     progress_callback: Optional[Callable[[int, str], None]] = None) -> SpillStore:
+    """Read CSV files in chunks of ``chunk_size`` rows and spill them to disk.
+
+    Header cleaning and the optional ``transform`` (e.g. the cleaning pipeline)
+    are applied to every chunk before it is written, so peak memory is bounded
+    by the chunk size rather than the file size. ``progress_callback`` is called
+    with the number of rows processed so far and the current file.
+    """
+    store = store or SpillStore()
+    rows = 0
+    for file in files:
+        if not file.endswith(".csv"):
+            raise ValueError(f"Streaming mode only supports CSV files: {file}")
+        for chunk in pd.read_csv(file, delimiter=delimiter, chunksize=chunk_size):
+            chunk = clean_headers(chunk, remove_spaces, ignore_special_chars)
+            if transform:
+                chunk = transform(chunk)
+            store.append(chunk)
+            rows += len(chunk)
+            if progress_callback:
+                progress_callback(rows, file)
+    return store
@@ -0,0 +1,97 @@
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's worker function once the job has been cancelled."""
+
+
+class BackgroundJob:
+    """Run a long operation on a worker thread and report back to the Tk event loop.
+
+    ``func`` is called with the job itself so it can call ``report_progress`` and
+    ``check_cancelled``. Tk is not thread-safe, so the worker never touches
+    widgets: progress and the final outcome are queued and delivered to the
+    callbacks from ``root.after`` on the main thread.
+    """
+
+    def __init__(self, root, func: Callable[["BackgroundJob"], Any],
+                 on_success: Optional[Callable[[Any], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None,
+                 on_progress: Optional[Callable[[str, Optional[float]], None]] = None,
+                 on_cancel: Optional[Callable[[], None]] = None,
+                 poll_interval: int = 100):
+        self.root = root
+        self.func = func
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.poll_interval = poll_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._finished = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._finished
+
+    def start(self) -> "BackgroundJob":
+        """Start the worker thread and begin polling for its results."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_interval, self._poll)
+        return self
+
+    def cancel(self) -> None:
+        """Request cancellation; the worker stops at its next progress report."""
+        self._cancel_event.set()
+
+    def check_cancelled(self) -> None:
+        """Raise JobCancelled if cancellation was requested. Call from the worker."""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def report_progress(self, message: str, fraction: Optional[float] = None) -> None:
+        """Queue a progress update for the GUI. Call from the worker."""
+        self.check_cancelled()
+        self._queue.put(("progress", (message, fraction)))
+
+    def _run(self) -> None:
+        try:
+            result = self.func(self)
+            self._queue.put(("done", result))
+        except JobCancelled:
+            self._queue.put(("cancelled", None))
+        except Exception as e:
+            self._queue.put(("error", e))
+
+    def _poll(self) -> None:
+        try:
+            while True:
+                kind, payload = self._queue.get_nowait()
+                if kind == "progress":
+                    if self.on_progress and not self.cancelled:
+                        self.on_progress(*payload)
+                    continue
+
+                self._finished = True
+                # A job cancelled after its work completed still counts as cancelled
+                if kind == "cancelled" or self.cancelled:
+                    if self.on_cancel:
+                        self.on_cancel()
+                elif kind == "error":
+                    if self.on_error:
+                        self.on_error(payload)
+                elif self.on_success:
+                    self.on_success(payload)
+                return
+        except queue.Empty:
+            pass
+        self.root.after(self.poll_interval, self._poll)
@@ -0,0 +1,160 @@
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from type_detection import DEFAULT_TYPE_SAMPLE, stratified_positions, is_low_cardinality
+
+try:
+    import pyarrow  # noqa: F401  (backs pandas' Arrow string and float dtypes)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+CURRENCY_SYMBOLS = ("$", "€", "£", "¥", "₹", "₽", "₩", "¢")
+# What a cleaned value must look like to be converted
+NUMBER_PATTERN = r"[+-]?(?:\d+\.?\d*|\.\d+)"
+# Numbers whose commas are thousands separators ("1,234,567.89"); other commas make a value unparsable
+THOUSANDS_PATTERN = r"[+-]?\d{1,3}(?:,\d{3})+(?:\.\d*)?"
+EXPONENT_PATTERN = r"(?:[eE][+-]?\d+)?"
+# "1.5 x 10^3" and similar spellings of 1.5e3
+TIMES_TEN_PATTERN = r"\s*[x×*]\s*10\s*\^\s*"
+# Share of sampled non-null values that must convert for a text column to count as numbers
+NUMERIC_PARSE_THRESHOLD = 0.95
+# Plain string columns with fewer distinct values than this share of rows are converted on their distinct values
+REPEATED_VALUE_RATIO = 0.5
+# Unparsable values quoted in the cleaning report
+UNPARSABLE_EXAMPLES = 5
+
+
+def _mask(result: pd.Series) -> np.ndarray:
+    """A boolean .str result as a NumPy mask, with missing values as False."""
+    return result.fillna(False).to_numpy(dtype=bool)
+
+
+def to_numbers(values: pd.Series, remove_currency: bool = False, convert_percentage: bool = False,
+               handle_scientific: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert a Series of strings to float64 in one pass of string kernels.
+
+    Thousands separators and surrounding whitespace are always removed and
+    accounting negatives like "(12.50)" are understood; commas anywhere
+    else ("1,5", "1,2,3") make a value unparsable. Currency symbols,
+    trailing percent signs (divided by 100) and exponents ("1.5e3",
+    "1.5 x 10^3") are only accepted when their option is set. Each removal
+    only runs when some value needs it, and with pyarrow installed the
+    final cast runs in Arrow's compute kernels instead of per value.
+
+    Returns the numbers (NaN where missing or unparsable) and a mask of the
+    non-empty values that could not be converted.
+    """
+    present = values.notna().to_numpy()
+    if values.dtype == object:
+        values = values.astype(pd.StringDtype("pyarrow") if HAS_PYARROW else pd.StringDtype())
+    elif not pd.api.types.is_string_dtype(values.dtype):
+        values = values.astype(str)
+
+    for text in (CURRENCY_SYMBOLS if remove_currency else ()):
+        if _mask(values.str.contains(text, regex=False)).any():
+            values = values.str.replace(text, "", regex=False)
+    values = values.str.strip()
+
+    negative = _mask(values.str.startswith("(") & values.str.endswith(")"))
+    if negative.any():
+        values = values.str.strip("()").str.strip()
+    percent = np.zeros(len(values), dtype=bool)
+    if convert_percentage:
+        percent = _mask(values.str.endswith("%"))
+        if percent.any():
+            values = values.str.rstrip("%").str.rstrip()
+    if handle_scientific and _mask(values.str.contains("10^", regex=False)).any():
+        values = values.str.replace(TIMES_TEN_PATTERN, "e", regex=True)
+
+    exponent = EXPONENT_PATTERN if handle_scientific else ""
+    if _mask(values.str.contains(",", regex=False)).any():
+        thousands = _mask(values.str.fullmatch(THOUSANDS_PATTERN + exponent))
+        values = values.mask(thousands, values.str.replace(",", "", regex=False))
+    pattern = NUMBER_PATTERN + exponent
+    valid = _mask(values.str.fullmatch(pattern))
+    # Empty strings count as missing rather than unparsable
+    unparsable = present & ~valid & _mask(values.str.len() > 0)
+    values = values.where(valid)
+    if HAS_PYARROW and isinstance(values.dtype, pd.StringDtype) and values.dtype.storage == "pyarrow":
+        numbers = values.astype("float64[pyarrow]").to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+    numbers = np.where(negative, -numbers, numbers)
+    if percent.any():
+        numbers = np.where(percent, numbers / 100, numbers)
+    return numbers, unparsable
+
+
+def compact_numbers(numbers: np.ndarray, decimals: Optional[int] = None) -> np.ndarray:
+    """Round ``numbers`` and store them in the smallest dtype that keeps them.
+
+    Whole numbers without missing values become the smallest integer type;
+    other values become float32 when that keeps them (to ``decimals``
+    places when rounding), and stay float64 otherwise.
+    """
+    if decimals is not None:
+        numbers = np.round(numbers, decimals)
+    missing = np.isnan(numbers)
+    finite = numbers[~missing]
+    if not missing.any() and np.isfinite(finite).all() and (np.abs(finite) < 2 ** 53).all() \
+            and (finite == np.trunc(finite)).all():
+        return pd.to_numeric(pd.Series(numbers.astype(np.int64)), downcast="integer").to_numpy()
+
+    as_float32 = numbers.astype(np.float32)
+    restored = as_float32.astype(np.float64)
+    if decimals is not None:
+        restored = np.round(restored, decimals)
+    with np.errstate(invalid="ignore"):
+        if ((restored == numbers) | missing).all():
+            return as_float32
+    return numbers
+
+
+def convert_numeric(series: pd.Series, decimals: Optional[int] = None,
+                    **options) -> Tuple[pd.Series, int, List[str]]:
+    """Convert a text column to compact numbers.
+
+    Categoricals are converted on their categories and plain string columns
+    that repeat their values (judged from a sample) on their distinct
+    values, which are then mapped back to the rows; other columns are
+    converted value by value. Numeric columns are only rounded and
+    compacted. Returns the converted column, the number of values that
+    could not be converted, and a few of them as examples.
+    """
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        numbers = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return pd.Series(compact_numbers(numbers, decimals), index=series.index, name=series.name), 0, []
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), pd.Series(series.cat.categories)
+    else:
+        sample = series.iloc[stratified_positions(len(series), DEFAULT_TYPE_SAMPLE)]
+        if is_low_cardinality(sample, len(series), REPEATED_VALUE_RATIO):
+            codes, uniques = pd.factorize(series)
+            uniques = pd.Series(uniques, dtype=series.dtype)
+        else:
+            codes, uniques = None, series
+
+    numbers, unparsable = to_numbers(uniques, **options)
+    examples = [str(value) for value in uniques[unparsable].iloc[:UNPARSABLE_EXAMPLES]]
+    if codes is None:
+        n_unparsable = int(unparsable.sum())
+    else:
+        # Each distinct value counts once per row it appears in
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        n_unparsable = int(counts[unparsable].sum())
+        numbers = np.append(numbers, np.nan)[codes]
+    return pd.Series(compact_numbers(numbers, decimals), index=series.index, name=series.name), \
+        n_unparsable, examples
+
+
+def parse_rate(series: pd.Series, sample_size: int = DEFAULT_TYPE_SAMPLE, **options) -> float:
+    """Share of a sample of a column's non-null values that convert to numbers."""
+    sample = series.iloc[stratified_positions(len(series), sample_size)].dropna()
+    if len(sample) == 0:
+        return 0.0
+    numbers, _ = to_numbers(sample, **options)
+    return float((~np.isnan(numbers)).mean())
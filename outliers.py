@@ -0,0 +1,339 @@
+import warnings
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from categorical_cleaning import is_indicator_column
+from date_cleaning import DATE_COMPONENTS
+
+# Default threshold of each method: IQR multiples beyond the quartiles, standard
+# deviations from the mean, and scaled median absolute deviations from the median
+OUTLIER_METHODS = {"iqr": 1.5, "zscore": 3.0, "mad": 3.5}
+OUTLIER_ACTIONS = ("flag", "exclude")
+# Makes the median absolute deviation comparable to a standard deviation for normal data
+MAD_SCALE = 1.4826
+# Items kept per level of a QuantileSketch
+DEFAULT_SKETCH_CAPACITY = 4096
+
+
+def numeric_columns(df: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                    exclude: Sequence[str] = ()) -> List[str]:
+    """The numeric (non-boolean) columns among ``columns`` (or all columns)."""
+    columns = list(df.columns) if columns is None else list(columns)
+    return [col for col in columns if col not in exclude
+            and pd.api.types.is_numeric_dtype(df[col].dtype) and not pd.api.types.is_bool_dtype(df[col].dtype)]
+
+
+def is_key_column(series: pd.Series) -> bool:
+    """Whether a column looks like an identifier: integers, each value used once."""
+    return pd.api.types.is_integer_dtype(series.dtype) and series.is_unique
+
+
+def is_date_component(df: pd.DataFrame, col: str) -> bool:
+    """Whether a column is a <date column>_<component> column added by date cleaning."""
+    base, _, component = str(col).rpartition("_")
+    return component in DATE_COMPONENTS and base in df.columns
+
+
+def is_flag_column(series: pd.Series) -> bool:
+    """Whether a column holds flags rather than measurements.
+
+    One-hot indicators and other sparse columns, and columns with at most
+    two distinct values (0/1 flags), have no spread worth judging: the IQR
+    of a rare flag is 0, so every one of its ones would be an outlier.
+    """
+    if is_indicator_column(series) or isinstance(series.dtype, pd.SparseDtype):
+        return True
+    low, high = series.min(), series.max()
+    return bool(((series == low) | (series == high) | series.isna()).all())
+
+
+def default_outlier_columns(df: pd.DataFrame, exclude: Sequence[str] = ()) -> List[str]:
+    """The numeric columns worth checking for outliers when none are named.
+
+    Identifiers (unique integers), year/month/week/day components of date
+    columns and flags (see is_flag_column) are numbers but not
+    measurements, so they are left out.
+    """
+    return [col for col in numeric_columns(df, exclude=exclude)
+            if not is_date_component(df, col) and not is_flag_column(df[col]) and not is_key_column(df[col])]
+
+
+def _check_method(method: str, threshold: Optional[float]) -> float:
+    if method not in OUTLIER_METHODS:
+        raise ValueError(f"Unknown outlier method: {method}")
+    return OUTLIER_METHODS[method] if threshold is None else threshold
+
+
+def _bounds(center_low: np.ndarray, center_high: np.ndarray, scale: np.ndarray, threshold: float,
+            method: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Lower and upper bounds from per-column centers and scales.
+
+    A zero (or unknown) spread means the z-score and MAD methods cannot
+    judge a column, so nothing in it is an outlier; IQR bounds keep
+    Tukey's definition.
+    """
+    if method != "iqr":
+        scale = np.where(scale > 0, scale, np.inf)
+    with np.errstate(invalid="ignore"):
+        lower = np.where(np.isnan(center_low), -np.inf, center_low - threshold * scale)
+        upper = np.where(np.isnan(center_high), np.inf, center_high + threshold * scale)
+    return np.nan_to_num(lower, nan=-np.inf), np.nan_to_num(upper, nan=np.inf)
+
+
+def column_bounds(block: np.ndarray, method: str = "iqr",
+                  threshold: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Outlier bounds of every column of a rows x columns float array, NaN meaning missing."""
+    threshold = _check_method(method, threshold)
+    with warnings.catch_warnings():
+        # All-missing columns have no statistics; they get infinite bounds
+        warnings.simplefilter("ignore", RuntimeWarning)
+        if method == "iqr":
+            q1, q3 = np.nanquantile(block, [0.25, 0.75], axis=0)
+            return _bounds(q1, q3, q3 - q1, threshold, method)
+        if method == "zscore":
+            mean = np.nanmean(block, axis=0)
+            return _bounds(mean, mean, np.nanstd(block, axis=0, ddof=1), threshold, method)
+        median = np.nanmedian(block, axis=0)
+        mad = np.nanmedian(np.abs(block - median), axis=0) * MAD_SCALE
+        return _bounds(median, median, mad, threshold, method)
+
+
+def grouped_bounds(frame: pd.DataFrame, codes: np.ndarray, method: str = "iqr",
+                   threshold: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Outlier bounds per group: (groups x columns) arrays for group codes 0..max(codes).
+
+    Each statistic is one grouped aggregation over all the columns.
+    """
+    threshold = _check_method(method, threshold)
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+    grouped = frame.groupby(codes)
+    index = np.arange(n_groups)
+    if method == "iqr":
+        q1 = grouped.quantile(0.25).reindex(index).to_numpy(dtype=np.float64)
+        q3 = grouped.quantile(0.75).reindex(index).to_numpy(dtype=np.float64)
+        return _bounds(q1, q3, q3 - q1, threshold, method)
+    if method == "zscore":
+        mean = grouped.mean().reindex(index).to_numpy(dtype=np.float64)
+        std = grouped.std().reindex(index).to_numpy(dtype=np.float64)
+        return _bounds(mean, mean, std, threshold, method)
+    median = grouped.median().reindex(index).to_numpy(dtype=np.float64)
+    padded = np.vstack([median, np.full((1, median.shape[1]), np.nan)])
+    deviations = pd.DataFrame(np.abs(frame.to_numpy(dtype=np.float64, na_value=np.nan) - padded[codes]),
+                              index=frame.index)
+    mad = deviations.groupby(codes).median().reindex(index).to_numpy(dtype=np.float64) * MAD_SCALE
+    return _bounds(median, median, mad, threshold, method)
+
+
+def flag_outliers(block: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                  codes: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rows x columns mask of values outside their bounds.
+
+    ``lower`` and ``upper`` are per column, or per group and column with
+    ``codes`` giving each row's group (-1 for rows without a group, which
+    are never flagged). Missing values are never flagged.
+    """
+    if codes is not None:
+        lower = np.vstack([lower, np.full((1, block.shape[1]), -np.inf)])[codes]
+        upper = np.vstack([upper, np.full((1, block.shape[1]), np.inf)])[codes]
+    with np.errstate(invalid="ignore"):
+        return (block < lower) | (block > upper)
+
+
+def outlier_mask(df: pd.DataFrame, columns: Sequence[str], method: str = "iqr",
+                 threshold: Optional[float] = None, group_by: Optional[str] = None) -> np.ndarray:
+    """Rows x columns mask of the outliers in ``columns``, optionally judged within each ``group_by`` group."""
+    block = df[list(columns)].to_numpy(dtype=np.float64, na_value=np.nan)
+    if group_by is None:
+        lower, upper = column_bounds(block, method, threshold)
+        return flag_outliers(block, lower, upper)
+    codes, _ = pd.factorize(df[group_by])
+    frame = pd.DataFrame(block, index=df.index)
+    lower, upper = grouped_bounds(frame[codes >= 0], codes[codes >= 0], method, threshold)
+    return flag_outliers(block, lower, upper, codes)
+
+
+class QuantileSketch:
+    """Approximate quantiles of a stream of numbers in bounded memory.
+
+    A stack of compactors (as in the KLL and MRL sketches): new values go to
+    level 0, and a level holding more than ``capacity`` items is sorted and
+    every other item, from a random offset, moves up a level where it
+    stands for twice as many values. Each level is one NumPy sort, memory
+    grows with the log of the stream length, and sketches of separate
+    chunks can be merged.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_SKETCH_CAPACITY, seed: int = 0):
+        self.capacity = capacity
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, values) -> None:
+        """Add values (missing values are skipped)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compact()
+
+    def quantile(self, q) -> np.ndarray:
+        """Approximate quantiles ``q`` (values in [0, 1]); NaN for an empty sketch."""
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return np.full(len(q), np.nan)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        ranks = np.cumsum(weights[order])
+        positions = np.searchsorted(ranks, q * ranks[-1], side="left")
+        return items[order][np.minimum(positions, len(items) - 1)]
+
+    def _compact(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.capacity:
+                items = np.sort(items)
+                # An odd item out stays at this level
+                n_pairs = len(items) // 2 * 2
+                self.levels[level] = items[n_pairs:]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                promoted = items[:n_pairs][self.rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+
+class _GroupStatistics:
+    """Streaming statistics of a set of columns within one group."""
+
+    def __init__(self, n_columns: int, capacity: int):
+        self.sketches = [QuantileSketch(capacity, seed=i) for i in range(n_columns)]
+        self.deviations = [QuantileSketch(capacity, seed=n_columns + i) for i in range(n_columns)]
+        self.shift: Optional[np.ndarray] = None
+        self.count = np.zeros(n_columns)
+        self.sums = np.zeros(n_columns)
+        self.squares = np.zeros(n_columns)
+
+    def update_moments(self, block: np.ndarray) -> None:
+        if self.shift is None:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                self.shift = np.nan_to_num(np.nanmean(block, axis=0))
+        shifted = block - self.shift
+        self.count += np.sum(~np.isnan(shifted), axis=0)
+        self.sums += np.nansum(shifted, axis=0)
+        self.squares += np.nansum(shifted * shifted, axis=0)
+
+    def moments(self) -> Tuple[np.ndarray, np.ndarray]:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self.sums / self.count
+            variance = (self.squares - self.count * mean * mean) / (self.count - 1)
+        shift = np.zeros(len(self.count)) if self.shift is None else self.shift
+        return mean + shift, np.sqrt(np.maximum(variance, 0))
+
+    def quantiles(self, q, deviations: bool = False) -> np.ndarray:
+        sketches = self.deviations if deviations else self.sketches
+        return np.array([sketch.quantile(q) for sketch in sketches]).T
+
+
+class StreamingOutlierBounds:
+    """Outlier bounds computed from chunks of rows, for data that is never in memory at once.
+
+    Feed every chunk to ``update``; the MAD method then needs a second pass
+    of ``update_deviations`` over the same chunks (``needs_second_pass``).
+    Quantiles come from QuantileSketch, so IQR and MAD bounds are
+    approximate; z-score bounds come from exact running moments.
+    ``flag`` then marks the outliers of any chunk.
+    """
+
+    def __init__(self, columns: Sequence[str], method: str = "iqr", threshold: Optional[float] = None,
+                 group_by: Optional[str] = None, capacity: int = DEFAULT_SKETCH_CAPACITY):
+        self.columns = list(columns)
+        self.threshold = _check_method(method, threshold)
+        self.method = method
+        self.group_by = group_by
+        self.capacity = capacity
+        self.groups: Dict[Hashable, _GroupStatistics] = {}
+        self._bounds: Optional[Tuple[pd.Index, np.ndarray, np.ndarray]] = None
+
+    @property
+    def needs_second_pass(self) -> bool:
+        return self.method == "mad"
+
+    def _parts(self, chunk: pd.DataFrame):
+        """(group key, rows x columns block) pairs of a chunk."""
+        if self.group_by is None:
+            yield None, chunk[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+            return
+        for key, part in chunk.groupby(self.group_by, sort=False, observed=True):
+            yield key, part[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def _group(self, key: Hashable) -> _GroupStatistics:
+        if key not in self.groups:
+            self.groups[key] = _GroupStatistics(len(self.columns), self.capacity)
+        return self.groups[key]
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        self._bounds = None
+        for key, block in self._parts(chunk):
+            statistics = self._group(key)
+            if self.method == "zscore":
+                statistics.update_moments(block)
+            else:
+                for i, sketch in enumerate(statistics.sketches):
+                    sketch.update(block[:, i])
+
+    def update_deviations(self, chunk: pd.DataFrame) -> None:
+        """Second pass for the MAD method: sketch each value's distance from its median."""
+        self._bounds = None
+        medians = {key: statistics.quantiles(0.5)[0] for key, statistics in self.groups.items()}
+        for key, block in self._parts(chunk):
+            deviations = np.abs(block - medians[key])
+            for i, sketch in enumerate(self._group(key).deviations):
+                sketch.update(deviations[:, i])
+
+    def bounds(self) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+        """The group keys and their (groups x columns) lower and upper bounds."""
+        if self._bounds is None:
+            keys = list(self.groups)
+            lower, upper = [], []
+            for key in keys:
+                statistics = self.groups[key]
+                if self.method == "iqr":
+                    q1, q3 = statistics.quantiles([0.25, 0.75])
+                    bounds = _bounds(q1, q3, q3 - q1, self.threshold, self.method)
+                elif self.method == "zscore":
+                    mean, std = statistics.moments()
+                    bounds = _bounds(mean, mean, std, self.threshold, self.method)
+                else:
+                    median = statistics.quantiles(0.5)[0]
+                    mad = statistics.quantiles(0.5, deviations=True)[0] * MAD_SCALE
+                    bounds = _bounds(median, median, mad, self.threshold, self.method)
+                lower.append(bounds[0])
+                upper.append(bounds[1])
+            shape = (0, len(self.columns))
+            self._bounds = (pd.Index(keys),
+                            np.array(lower).reshape(shape if not keys else (len(keys), -1)),
+                            np.array(upper).reshape(shape if not keys else (len(keys), -1)))
+        return self._bounds
+
+    def flag(self, chunk: pd.DataFrame) -> np.ndarray:
+        """Rows x columns mask of the outliers in a chunk."""
+        keys, lower, upper = self.bounds()
+        block = chunk[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        if self.group_by is None:
+            codes = np.zeros(len(chunk), dtype=np.int64) if len(keys) else np.full(len(chunk), -1)
+        else:
+            codes = keys.get_indexer(chunk[self.group_by])
+        return flag_outliers(block, lower, upper, codes)
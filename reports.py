@@ -0,0 +1,60 @@
+import gzip
+import os
+import plotly
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+
+REPORT_DIR = "visualizations"
+PLOTLYJS_FILE = "plotly.min.js"
+# Records which plotly.js version the shared bundle was written from
+PLOTLYJS_VERSION_FILE = "plotly.min.js.version"
+
+
+def ensure_plotlyjs(directory: str = REPORT_DIR) -> str:
+    """Write the shared plotly.js bundle into ``directory`` unless it is already current.
+
+    Returns the bundle's path. Reports written with ``write_report`` load
+    this one file instead of each inlining their own multi-megabyte copy.
+    """
+    os.makedirs(directory, exist_ok=True)
+    bundle_path = os.path.join(directory, PLOTLYJS_FILE)
+    version_path = os.path.join(directory, PLOTLYJS_VERSION_FILE)
+
+    current = None
+    if os.path.exists(bundle_path) and os.path.exists(version_path):
+        with open(version_path, encoding="utf-8") as f:
+            current = f.read().strip()
+    if current != plotly.__version__:
+        # Write to a temporary file first so a concurrent report never sees half a bundle
+        tmp_path = f"{bundle_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+        os.replace(tmp_path, bundle_path)
+        with open(version_path, "w", encoding="utf-8") as f:
+            f.write(plotly.__version__)
+    return bundle_path
+
+
+def write_report(fig: go.Figure, name: str, directory: str = REPORT_DIR,
+                 shared_plotlyjs: bool = True, compress: bool = False) -> str:
+    """Write a figure as an HTML report named ``name`` and return the file path.
+
+    With ``shared_plotlyjs`` the page references ``plotly.min.js`` next to it
+    instead of inlining the library. Numeric trace data is written as
+    base64-encoded typed arrays by plotly's JSON encoder. With ``compress``
+    the report is written gzip-compressed as ``<name>.html.gz``.
+    """
+    os.makedirs(directory, exist_ok=True)
+    if shared_plotlyjs:
+        ensure_plotlyjs(directory)
+    html = fig.to_html(include_plotlyjs="directory" if shared_plotlyjs else True, full_html=True)
+
+    output_file = os.path.join(directory, f"{name}.html")
+    if compress:
+        output_file += ".gz"
+        with gzip.open(output_file, "wt", encoding="utf-8", compresslevel=6) as f:
+            f.write(html)
+    else:
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(html)
+    return output_file
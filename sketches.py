@@ -0,0 +1,117 @@
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+DEFAULT_SKETCH_SIZE = 256
+BLOOM_BITS_PER_VALUE = 10
+BLOOM_HASHES = 7
+
+
+def hash_distinct_values(series: pd.Series) -> np.ndarray:
+    """Return the sorted 64-bit hashes of a column's distinct non-null values.
+
+    Values are normalized before hashing so that the same key hashes equally
+    across tables: integral floats (integer columns that picked up NaNs) are
+    hashed as int64 and everything non-numeric is hashed as its string form.
+    """
+    values = pd.unique(series.dropna().to_numpy())
+    if len(values) == 0:
+        return np.empty(0, dtype=np.uint64)
+
+    if values.dtype.kind in "iub":
+        values = values.astype(np.int64)
+    elif values.dtype.kind == "f":
+        if not np.all(np.mod(values, 1) == 0):
+            return np.unique(pd.util.hash_array(values))
+        values = values.astype(np.int64)
+    else:
+        values = values.astype(str).astype(object)
+    return np.unique(pd.util.hash_array(values))
+
+
+class KMVSketch:
+    """Bottom-k (k minimum values) sketch of a column's distinct values.
+
+    The k smallest hashes are a uniform sample of the distinct values, so they
+    support cardinality estimates and can be probed against another column's
+    Bloom filter to estimate how much of this column is contained in it.
+    """
+
+    def __init__(self, hashes: np.ndarray, k: int = DEFAULT_SKETCH_SIZE):
+        self.k = k
+        self.n_distinct_hashed = len(hashes)
+        self.minimums = hashes[:k]
+
+    @classmethod
+    def from_series(cls, series: pd.Series, k: int = DEFAULT_SKETCH_SIZE) -> "KMVSketch":
+        return cls(hash_distinct_values(series), k)
+
+    def cardinality(self) -> float:
+        """Estimated number of distinct values."""
+        if len(self.minimums) < self.k:
+            return float(len(self.minimums))
+        kth = float(self.minimums[-1]) / 2.0 ** 64
+        return (self.k - 1) / kth if kth > 0 else float(self.n_distinct_hashed)
+
+    def containment_in(self, bloom: "BloomFilter") -> float:
+        """Estimated fraction of this column's distinct values present in ``bloom``."""
+        if len(self.minimums) == 0:
+            return 0.0
+        return float(bloom.contains(self.minimums).mean())
+
+
+class BloomFilter:
+    """Bit-packed Bloom filter over 64-bit value hashes.
+
+    Probe positions come from double hashing the two halves of each hash, so
+    building and probing are single vectorized NumPy passes.
+    """
+
+    def __init__(self, hashes: np.ndarray, bits_per_value: int = BLOOM_BITS_PER_VALUE,
+                 n_hashes: int = BLOOM_HASHES):
+        self.n_values = len(hashes)
+        self.n_bits = max(len(hashes) * bits_per_value, 64)
+        self.n_hashes = n_hashes
+        bits = np.zeros(self.n_bits, dtype=bool)
+        bits[self._positions(hashes).ravel()] = True
+        self.bits = np.packbits(bits)
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "BloomFilter":
+        return cls(hash_distinct_values(series))
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rounds = np.arange(self.n_hashes, dtype=np.uint64)[:, None]
+        return ((h1 + rounds * h2) % np.uint64(self.n_bits)).astype(np.int64)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Boolean array telling which hashes may be in the set (no false negatives)."""
+        positions = self._positions(hashes)
+        found = (self.bits[positions >> 3] >> (7 - (positions & 7)).astype(np.uint8)) & 1
+        return found.all(axis=0)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+
+class ColumnSketch:
+    """KMV sketch of a column plus, for key candidates, a Bloom filter of all its values."""
+
+    def __init__(self, series: pd.Series, build_bloom: bool = False,
+                 k: int = DEFAULT_SKETCH_SIZE):
+        hashes = hash_distinct_values(series)
+        self.numeric = pd.api.types.is_numeric_dtype(series.dtype)
+        self.kmv = KMVSketch(hashes, k)
+        self.bloom: Optional[BloomFilter] = BloomFilter(hashes) if build_bloom else None
+
+    def cardinality(self) -> float:
+        return self.kmv.cardinality()
+
+    def containment_in(self, other: "ColumnSketch") -> float:
+        """Estimated fraction of this column's distinct values found in ``other``."""
+        if other.bloom is None:
+            raise ValueError("The referenced column's sketch has no Bloom filter")
+        return self.kmv.containment_in(other.bloom)
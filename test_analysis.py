@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from analysis import ReportGenerator
+
+
+def test_category_aggregates_match_pandas():
+    rng = np.random.default_rng(0)
+    n = 100_000
+    df = pd.DataFrame({"region": rng.choice(["north", "south", "east"], n),
+                       # Large values with a small spread cancel in raw sums of squares
+                       "amount": 1e9 + rng.normal(size=n)})
+    df.loc[rng.choice(n, 1_000, replace=False), "amount"] = np.nan
+    cube = ReportGenerator(df).get_category_aggregates("region", "amount")
+    expected = df.groupby("region")["amount"].agg(["size", "count", "min", "max", "mean", "std"])
+    np.testing.assert_array_equal(cube["rows"], expected["size"])
+    np.testing.assert_array_equal(cube["count"], expected["count"])
+    np.testing.assert_array_equal(cube[["min", "max"]], expected[["min", "max"]])
+    np.testing.assert_allclose(cube["mean"], expected["mean"], rtol=1e-12)
+    np.testing.assert_allclose(cube["std"], expected["std"], rtol=1e-6)
+
+
+def test_category_aggregates_follow_a_new_frame():
+    df = pd.DataFrame({"region": ["north", "south"] * 50, "amount": np.arange(100.0)})
+    generator = ReportGenerator(df)
+    assert generator.get_category_aggregates("region", "amount")["count"].sum() == 100
+    # A new frame of the same shape, possibly at the same address, must not hit the cache
+    generator.df = df.assign(amount=df["amount"] * 2)
+    assert generator.get_category_aggregates("region", "amount")["sum"].sum() == 2 * np.arange(100.0).sum()
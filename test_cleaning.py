@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from cleaning import CleaningPlan, fuse_steps
+
+
+def test_default_fill_after_type_steps_keeps_types():
+    n = 1_000
+    df = pd.DataFrame({
+        "date": ["2024-01-15", "2024-02-20", None, None] * (n // 4),
+        "amount": ["1,200", "35", None, "7"] * (n // 4),
+        "region": ["north", None, "south", "east"] * (n // 4),
+    })
+    plan = CleaningPlan()
+    plan.add("date_cleaning")
+    plan.add("numeric_cleaning")
+    plan.add("missing_values", strategy="Replace with Default", default_value="Unknown")
+    result = plan.execute(df)
+    # Half of the dates and a quarter of the amounts are missing, yet both are detected
+    assert pd.api.types.is_datetime64_any_dtype(result["date"])
+    assert pd.api.types.is_numeric_dtype(result["amount"])
+    assert result["date"].isna().sum() == n // 2
+    assert result["amount"].isna().sum() == n // 4
+    assert (result["region"] == "Unknown").sum() == n // 4
+    assert any("date, amount left missing" in message for message in plan.report)
+
+
+def test_numeric_default_fills_numbers():
+    df = pd.DataFrame({"amount": [1.5, np.nan, 3.0]})
+    plan = CleaningPlan()
+    plan.add("missing_values", strategy="Replace with Default", default_value="0")
+    assert plan.execute(df)["amount"].tolist() == [1.5, 0.0, 3.0]
+
+
+def test_steps_without_columns_are_reported():
+    plan = CleaningPlan()
+    plan.add("date_cleaning")
+    plan.add("numeric_cleaning")
+    plan.add("missing_values", strategy="Drop Rows")
+    plan.execute(pd.DataFrame({"qty": [1, 2, 3]}))
+    assert plan.report == ["Date cleaning: no date columns", "Numeric cleaning: no numeric text columns",
+                           "Missing values: no columns with missing values"]
+
+
+def test_fuse_keeps_a_fill_after_a_different_fill():
+    fill = {"step": "missing_values", "strategy": "Replace with Default", "default_value": "Unknown"}
+    drop = {"step": "missing_values", "strategy": "Drop Rows"}
+    assert fuse_steps([fill, fill]) == [fill]
+    assert fuse_steps([fill, drop]) == [fill, drop]
+    assert fuse_steps([drop, fill]) == [drop]
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation import compute_correlation, correlation_matrix, correlation_pairs, iter_row_chunks
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    a = rng.normal(size=n)
+    df = pd.DataFrame({
+        "a": a,
+        "b": 2 * a + rng.normal(scale=0.5, size=n),
+        "c": rng.normal(size=n),
+        "d": 1e6 + a * 1e-3 + rng.normal(scale=1e-3, size=n),
+        "e": rng.integers(0, 100, n).astype(float),
+    })
+    df.loc[df.sample(frac=0.1, random_state=1).index, "b"] = np.nan
+    df.loc[df.sample(frac=0.2, random_state=2).index, "c"] = np.nan
+    return df
+
+
+def test_correlation_matrix_matches_pandas(frame):
+    expected = frame.corr()
+    result = correlation_matrix(frame)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-5)
+
+
+def test_correlation_pairs_ranked_by_strength(frame):
+    pairs = correlation_pairs(frame, threshold=0.3)
+    expected = frame.corr()
+    assert [(a, b) for a, b, _ in pairs][0] == ("a", "b")
+    strengths = [abs(r) for _, _, r in pairs]
+    assert strengths == sorted(strengths, reverse=True)
+    for a, b, r in pairs:
+        assert r == pytest.approx(expected.loc[a, b], abs=1e-5)
+
+
+@pytest.mark.parametrize("block_size, max_workers", [(2, 1), (3, 2), (256, 1)])
+def test_blocked_correlation_matches_pandas(frame, block_size, max_workers):
+    result = compute_correlation(frame, block_size=block_size, chunk_size=1_000, max_workers=max_workers)
+    np.testing.assert_allclose(result.to_numpy(), frame.corr().to_numpy(), atol=1e-5)
+
+
+def test_chunked_correlation_matches_frame(frame):
+    result = compute_correlation(iter_row_chunks(frame, 700), columns=list(frame.columns))
+    np.testing.assert_allclose(result.to_numpy(), frame.corr().to_numpy(), atol=1e-5)
+
+
+def test_spearman_matches_pandas(frame):
+    complete = frame.dropna()
+    result = compute_correlation(complete, method="spearman", chunk_size=1_000)
+    np.testing.assert_allclose(result.to_numpy(), complete.corr(method="spearman").to_numpy(), atol=1e-5)
+
+
+def test_spearman_ranks_each_column_once(frame):
+    # With missing values each column is ranked on its own values, not per pair as in pandas
+    result = compute_correlation(frame, method="spearman", chunk_size=1_000)
+    np.testing.assert_allclose(result.to_numpy(), frame.rank().corr().to_numpy(), atol=1e-5)
+
+
+def test_spearman_needs_frame(frame):
+    with pytest.raises(ValueError):
+        compute_correlation(iter_row_chunks(frame), columns=["a", "b"], method="spearman")
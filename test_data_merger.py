@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_merger import DataMerger, profile_column
+
+
+@pytest.fixture
+def merger():
+    rng = np.random.default_rng(0)
+    merger = DataMerger()
+    # Merging starts from the first of equally connected tables
+    merger.dataframes["orders"] = pd.DataFrame({
+        "order_id": np.arange(20_000),
+        # Some orders reference customers that do not exist
+        "customer_id": rng.integers(0, 1_100, 20_000),
+        "qty": rng.integers(1, 5, 20_000),
+        "amount": rng.random(20_000).round(2),
+    })
+    merger.dataframes["customers"] = pd.DataFrame({
+        "customer_id": rng.permutation(1_000),
+        "region": rng.choice(["north", "south"], 1_000),
+    })
+    merger.add_relationship("orders", "customers", "customer_id", "customer_id")
+    return merger
+
+
+def start_from_customers(merger):
+    """Merge orders into customers, so each customer row fans out to its orders."""
+    merger.dataframes = {"customers": merger.dataframes["customers"], "orders": merger.dataframes["orders"]}
+    merger.primary_keys = {"customers": "customer_id"}
+
+
+def test_lookup_join_matches_pandas_merge(merger):
+    orders, customers = merger.dataframes["orders"], merger.dataframes["customers"]
+    plan = merger.plan_merge()
+    assert [step["strategy"] for step in plan["steps"]] == ["lookup"]
+    result = merger.merge_data(plan=plan)
+    expected = pd.merge(orders, customers, on="customer_id", how="left")
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_lookup_join_suffixes_overlapping_columns(merger):
+    merger.dataframes["customers"]["amount"] = 1.0
+    step = {"table": "customers", "from_table": "orders", "left_on": "customer_id", "right_on": "customer_id"}
+    result = merger._lookup_join(merger.dataframes["orders"], step)
+    expected = pd.merge(merger.dataframes["orders"], merger.dataframes["customers"], on="customer_id", how="left")
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_predict_merge_is_exact(merger):
+    customers, orders = merger.dataframes["customers"], merger.dataframes["orders"]
+    step = {"table": "orders", "left_on": "customer_id", "right_on": "customer_id"}
+    prediction = merger.predict_merge(customers, step)
+    assert prediction["rows"] == len(pd.merge(customers, orders, on="customer_id", how="left"))
+
+
+def test_aggregate_fanout_sums_measures_only(merger):
+    start_from_customers(merger)
+    result = merger.merge_data(max_rows=1_000, fanout_strategy="aggregate", keep_first=["qty"])
+    orders = merger.dataframes["orders"]
+    first = orders.groupby("customer_id").first()
+    totals = orders.groupby("customer_id")["amount"].sum()
+    result = result.set_index("customer_id")
+    matched = result.index.intersection(first.index)
+    np.testing.assert_allclose(result.loc[matched, "amount"], totals.loc[matched])
+    pd.testing.assert_series_equal(result.loc[matched, "order_id"], first.loc[matched, "order_id"],
+                                   check_dtype=False)
+    pd.testing.assert_series_equal(result.loc[matched, "qty"], first.loc[matched, "qty"], check_dtype=False)
+
+
+def test_fanout_abort(merger):
+    start_from_customers(merger)
+    with pytest.raises(ValueError):
+        merger.merge_data(max_rows=1_000)
+
+
+@pytest.mark.parametrize("series", [
+    pd.Series(np.arange(50_000)),
+    pd.Series(np.arange(50_000) % 5),
+    pd.Series(np.random.default_rng(1).integers(0, 20_000, 50_000)),
+    pd.Series(np.r_[np.arange(49_999), [7]]),
+])
+def test_profile_column_matches_pandas(series):
+    profile = profile_column(series)
+    assert profile["unique"] == series.is_unique
+    assert profile["cardinality"] == series.nunique(dropna=False)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsampling import downsample, lttb_indices, minmax_indices
+
+
+def test_lttb_keeps_endpoints_and_budget():
+    rng = np.random.default_rng(0)
+    x = np.arange(10_000, dtype=float)
+    y = rng.normal(size=len(x)).cumsum()
+    indices = lttb_indices(x, y, 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert (np.diff(indices) > 0).all()
+
+
+def test_lttb_keeps_spike():
+    x = np.arange(10_000, dtype=float)
+    y = np.zeros(len(x))
+    y[4321] = 100.0
+    assert 4321 in lttb_indices(x, y, 100)
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    rng = np.random.default_rng(1)
+    y = rng.normal(size=10_001)
+    indices = minmax_indices(y, 200)
+    assert y.argmin() in indices and y.argmax() in indices
+    assert len(indices) <= 200
+
+
+def test_small_traces_are_kept():
+    x = np.arange(10, dtype=float)
+    np.testing.assert_array_equal(lttb_indices(x, x, 100), np.arange(10))
+    np.testing.assert_array_equal(minmax_indices(x, 100), np.arange(10))
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_returns_sorted_subset(method):
+    rng = np.random.default_rng(2)
+    n = 20_000
+    x = pd.Series(pd.date_range("2020-01-01", periods=n, freq="min")).sample(frac=1, random_state=0)
+    y = pd.Series(rng.normal(size=n), index=x.index)
+    y.iloc[::100] = np.nan
+    dx, dy = downsample(x, y, max_points=1_000, method=method)
+    assert len(dx) <= 1_000
+    assert dx.is_monotonic_increasing
+    assert dy.notna().all()
+    pd.testing.assert_series_equal(dy, y.loc[dy.index])
+
+
+def test_downsample_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        downsample(pd.Series([1.0]), pd.Series([1.0]), method="every_other")
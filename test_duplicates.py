@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from duplicates import ExternalDeduplicator, column_hash, duplicate_mask
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    df = pd.DataFrame({
+        "id": rng.integers(0, 3_000, n),
+        "region": rng.choice(["north", "south", None], n),
+        "amount": rng.integers(0, 5, n).astype(float),
+    })
+    df.loc[::17, "amount"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("keep", ["first", "last", "none"])
+@pytest.mark.parametrize("columns", [None, ["id", "region"]])
+def test_duplicate_mask_matches_pandas(frame, keep, columns):
+    expected = frame.duplicated(subset=columns, keep=False if keep == "none" else keep).to_numpy()
+    np.testing.assert_array_equal(duplicate_mask(frame, columns, keep), expected)
+
+
+def test_hash_ignores_storage_type():
+    values = ["a", "b", None, "a"]
+    plain = column_hash(pd.Series(values, dtype=object))
+    np.testing.assert_array_equal(column_hash(pd.Series(values, dtype="category")), plain)
+    np.testing.assert_array_equal(column_hash(pd.Series([1, 2], dtype="int8")),
+                                  column_hash(pd.Series([1.0, 2.0])))
+
+
+def test_duplicate_mask_rejects_unknown_keep(frame):
+    with pytest.raises(ValueError):
+        duplicate_mask(frame, keep="middle")
+
+
+@pytest.mark.parametrize("keep", ["first", "last", "none"])
+def test_external_deduplicator_matches_pandas(frame, keep, tmp_path):
+    chunks = [frame.iloc[start:start + 3_000] for start in range(0, len(frame), 3_000)]
+    deduplicator = ExternalDeduplicator(["id", "region"], keep, partitions=4, directory=str(tmp_path / "dedup"))
+    try:
+        for chunk in chunks:
+            deduplicator.add(chunk)
+        result = pd.concat(deduplicator.filter(chunks))
+    finally:
+        deduplicator.cleanup()
+    expected = frame.drop_duplicates(subset=["id", "region"], keep=False if keep == "none" else keep)
+    pd.testing.assert_frame_equal(result, expected)
+    assert not (tmp_path / "dedup").exists()
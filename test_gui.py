@@ -0,0 +1,82 @@
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_preview import VirtualPreview
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display available")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+@pytest.fixture
+def preview(root):
+    tree = ttk.Treeview(root, height=10)
+    vsb = ttk.Scrollbar(root, orient="vertical")
+    return VirtualPreview(tree, vsb, overscan=5)
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({"id": np.arange(100_000), "name": [f"row {i}" for i in range(100_000)]})
+
+
+def shown_rows(preview):
+    # Tk hands numeric cell values back as numbers, so compare their text
+    return [tuple(str(value) for value in preview.tree.item(item, "values"))
+            for item in preview.tree.get_children()]
+
+
+def test_only_the_window_is_materialized(preview, frame):
+    preview.set_dataframe(frame)
+    rows = shown_rows(preview)
+    assert len(rows) == preview.visible_rows + 2 * preview.overscan
+    assert rows[0] == ("0", "row 0")
+    assert [str(col) for col in preview.tree["columns"]] == ["id", "name"]
+
+
+def test_jump_refills_the_same_items(preview, frame):
+    preview.set_dataframe(frame)
+    items = preview.tree.get_children()
+    preview.jump_to(50_000)
+    assert preview.tree.get_children() == items
+    assert preview.offset == 50_000
+    rows = shown_rows(preview)
+    assert rows[50_000 - preview.window_start] == ("50000", "row 50000")
+
+
+def test_jump_is_clamped_to_the_last_page(preview, frame):
+    preview.set_dataframe(frame)
+    preview.jump_to(len(frame) + 10)
+    assert preview.offset == len(frame) - preview.visible_rows
+    assert shown_rows(preview)[-1] == ("99999", "row 99999")
+    preview.jump_to(-5)
+    assert preview.offset == 0
+
+
+def test_scrollbar_moves_the_offset(preview, frame):
+    preview.set_dataframe(frame)
+    preview._on_scrollbar("moveto", "0.25")
+    assert preview.offset == 25_000
+    preview._on_scrollbar("scroll", "1", "pages")
+    assert preview.offset == 25_000 + preview.visible_rows
+    first, last = preview.vsb.get()
+    assert first == pytest.approx(preview.offset / len(frame))
+
+
+def test_small_and_empty_frames(preview):
+    preview.set_dataframe(pd.DataFrame({"a": [1, 2, 3]}))
+    assert len(shown_rows(preview)) == 3
+    preview.set_dataframe(pd.DataFrame({"a": []}))
+    assert shown_rows(preview) == []
+    assert tuple(preview.vsb.get()) == (0.0, 1.0)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from numeric_cleaning import compact_numbers, convert_numeric, parse_rate, to_numbers
+
+
+def test_to_numbers_formats():
+    values = pd.Series(["1,234", "$1,234,567.89", "(2,000)", "12%", "-1,000.5", "1.5 x 10^3", "2e3", None, ""],
+                       dtype=object)
+    numbers, unparsable = to_numbers(values, remove_currency=True, convert_percentage=True,
+                                     handle_scientific=True)
+    np.testing.assert_allclose(numbers, [1234, 1234567.89, -2000, 0.12, -1000.5, 1500, 2000, np.nan, np.nan])
+    assert not unparsable.any()
+
+
+@pytest.mark.parametrize("text", ["1,5", "1,2,3", "12,34", "$5", "12%", "1e3", "abc"])
+def test_to_numbers_reports_unparsable(text):
+    numbers, unparsable = to_numbers(pd.Series([text, "7"], dtype=object))
+    assert np.isnan(numbers[0]) and numbers[1] == 7
+    assert unparsable.tolist() == [True, False]
+
+
+def test_to_numbers_matches_pandas_on_plain_numbers():
+    rng = np.random.default_rng(0)
+    values = pd.Series(rng.normal(scale=1e4, size=1_000).round(3)).astype(str)
+    numbers, unparsable = to_numbers(values)
+    np.testing.assert_array_equal(numbers, pd.to_numeric(values).to_numpy())
+    assert not unparsable.any()
+
+
+@pytest.mark.parametrize("dtype", [object, "category"])
+def test_convert_numeric_repeated_values(dtype):
+    series = pd.Series(["1,000", "2", "x", None] * 500, dtype=dtype)
+    converted, n_unparsable, examples = convert_numeric(series)
+    expected = pd.to_numeric(series.astype(object).str.replace(",", ""), errors="coerce")
+    np.testing.assert_array_equal(converted.to_numpy(dtype=float), expected.to_numpy(dtype=float))
+    assert n_unparsable == 500 and examples == ["x"]
+
+
+def test_convert_numeric_compacts_whole_numbers():
+    converted, _, _ = convert_numeric(pd.Series([str(i) for i in range(1_000)]))
+    assert converted.dtype == np.int16
+    assert converted.tolist() == list(range(1_000))
+
+
+def test_compact_numbers_keeps_precision():
+    assert compact_numbers(np.array([0.5, 1.25, np.nan])).dtype == np.float32
+    assert compact_numbers(np.array([0.1, 1e-12])).dtype == np.float64
+    rounded = compact_numbers(np.array([1.234, 2.345]), decimals=1)
+    # float32 is enough once the values only need one decimal place
+    assert rounded.dtype == np.float32
+    np.testing.assert_array_equal(np.round(rounded.astype(np.float64), 1), [1.2, 2.3])
+
+
+def test_parse_rate():
+    assert parse_rate(pd.Series(["1", "2", "x", "4"])) == 0.75
+    assert parse_rate(pd.Series([None, None], dtype=object)) == 0.0
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from categorical_cleaning import is_indicator_column
+from cleaning import CleaningPlan
+from outliers import (QuantileSketch, StreamingOutlierBounds, default_outlier_columns, numeric_columns,
+                      outlier_mask)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 50_000
+    df = pd.DataFrame({
+        "group": rng.choice(["a", "b", "c"], n),
+        "x": rng.normal(size=n),
+        "y": rng.standard_t(3, size=n).astype(np.float32),
+        "z": rng.integers(0, 100, n),
+    })
+    df.loc[::50, "x"] = np.nan
+    return df
+
+
+def reference_mask(df, columns, method, group_by=None):
+    """Outliers computed column by column with pandas."""
+    flags = []
+    for col in columns:
+        values = df[col].astype(float)
+        grouped = values.groupby(df[group_by]) if group_by else None
+
+        def stat(name, series=values, groups=grouped):
+            return groups.transform(name) if group_by else getattr(series, name)()
+
+        if method == "iqr":
+            if group_by:
+                q1, q3 = grouped.transform(lambda v: v.quantile(0.25)), grouped.transform(lambda v: v.quantile(0.75))
+            else:
+                q1, q3 = values.quantile(0.25), values.quantile(0.75)
+            lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        elif method == "zscore":
+            lower, upper = stat("mean") - 3 * stat("std"), stat("mean") + 3 * stat("std")
+        else:
+            median = stat("median")
+            deviations = (values - median).abs()
+            mad = stat("median", deviations, deviations.groupby(df[group_by]) if group_by else None) * 1.4826
+            lower, upper = median - 3.5 * mad, median + 3.5 * mad
+        flags.append(((values < lower) | (values > upper)).to_numpy())
+    return np.column_stack(flags)
+
+
+@pytest.mark.parametrize("method", ["iqr", "zscore", "mad"])
+@pytest.mark.parametrize("group_by", [None, "group"])
+def test_outlier_mask_matches_pandas(frame, method, group_by):
+    columns = ["x", "y", "z"]
+    np.testing.assert_array_equal(outlier_mask(frame, columns, method, group_by=group_by),
+                                  reference_mask(frame, columns, method, group_by))
+
+
+def test_rows_without_group_are_never_flagged():
+    df = pd.DataFrame({"group": ["a"] * 99 + [None], "x": np.r_[np.arange(99.0), 1e9]})
+    assert not outlier_mask(df, ["x"], group_by="group").any()
+
+
+def test_default_columns_skip_ids_and_date_components():
+    df = pd.DataFrame({"order_id": np.arange(10), "date": pd.date_range("2020-01-01", periods=10),
+                       "date_year": np.full(10, 2020, dtype=np.int16), "amount": np.arange(10.0),
+                       "flag": [True] * 10, "qty": np.arange(10) % 3, "returned": np.arange(10) % 2})
+    assert numeric_columns(df) == ["order_id", "date_year", "amount", "qty", "returned"]
+    assert default_outlier_columns(df) == ["amount", "qty"]
+
+
+def test_default_outliers_skip_one_hot_indicators():
+    rng = np.random.default_rng(0)
+    n = 6_551
+    df = pd.DataFrame({"region": rng.choice(["north", "south", "east", "west"], n, p=[0.6, 0.3, 0.09, 0.01]),
+                       "amount": rng.normal(100, 10, n)})
+    df.loc[0, "amount"] = 1_000.0
+    plan = CleaningPlan()
+    plan.add("categorical_cleaning", columns=["region"], one_hot=True)
+    plan.add("outliers", action="exclude")
+    result = plan.execute(df)
+    indicators = [col for col in result.columns if col.startswith("region_")]
+    assert len(indicators) == 4
+    assert all(is_indicator_column(result[col]) for col in indicators)
+    assert default_outlier_columns(result) == ["amount"]
+    pd.testing.assert_index_equal(result.index, df.index[~outlier_mask(df, ["amount"])])
+
+
+def test_quantile_sketch_close_to_numpy():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=2_000_000)
+    sketch = QuantileSketch()
+    for start in range(0, len(values), 250_000):
+        sketch.update(values[start:start + 250_000])
+    qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+    # Compare ranks: the sketch's quantiles sit within half a percent of the requested ranks
+    ranks = np.searchsorted(np.sort(values), sketch.quantile(qs)) / len(values)
+    np.testing.assert_allclose(ranks, qs, atol=0.005)
+    assert sketch.count == len(values)
+    assert sum(len(level) for level in sketch.levels) < 20 * sketch.capacity
+
+
+def test_quantile_sketch_merge():
+    rng = np.random.default_rng(2)
+    values = rng.random(400_000)
+    left, right = QuantileSketch(seed=1), QuantileSketch(seed=2)
+    left.update(values[:200_000])
+    right.update(values[200_000:])
+    left.merge(right)
+    assert left.count == len(values)
+    np.testing.assert_allclose(left.quantile([0.1, 0.5, 0.9]), [0.1, 0.5, 0.9], atol=0.01)
+    assert np.isnan(QuantileSketch().quantile(0.5)).all()
+
+
+@pytest.mark.parametrize("method", ["iqr", "zscore", "mad"])
+@pytest.mark.parametrize("group_by", [None, "group"])
+def test_streaming_bounds_close_to_exact(frame, method, group_by):
+    columns = ["x", "y", "z"]
+    chunks = [frame.iloc[start:start + 7_000] for start in range(0, len(frame), 7_000)]
+    bounds = StreamingOutlierBounds(columns, method, group_by=group_by)
+    for chunk in chunks:
+        bounds.update(chunk)
+    if bounds.needs_second_pass:
+        for chunk in chunks:
+            bounds.update_deviations(chunk)
+    flags = np.vstack([bounds.flag(chunk) for chunk in chunks])
+    exact = outlier_mask(frame, columns, method, group_by=group_by)
+    if method == "zscore":
+        np.testing.assert_array_equal(flags, exact)
+    else:
+        # Approximate quantiles only move the bounds slightly
+        assert (flags != exact).mean() < 0.002
@@ -0,0 +1,103 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from categorical_cleaning import one_hot_frame
+from cleaning import CleaningPlan
+from ingestion import SpillStore
+from pipeline import HAS_YAML, Pipeline, validate_spec, write_reports
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 5_000
+    df = pd.DataFrame({
+        "Region ": rng.choice([" north", "South ", None], n),
+        "amount": rng.choice(["1,000", "250", "$3", "x"], n),
+        "qty": rng.integers(0, 10, n),
+    })
+    df = pd.concat([df, df.iloc[:200]], ignore_index=True)
+    path = tmp_path / "sales.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def make_pipeline(path, **inputs):
+    pipeline = Pipeline()
+    pipeline.set_inputs([str(path)], remove_spaces=True, **inputs)
+    pipeline.set_headers({"Region": "region"})
+    pipeline.add_cleaning_step("duplicates", keep="first")
+    pipeline.add_cleaning_step("text_cleaning", strip=True, case="Lowercase")
+    pipeline.add_cleaning_step("numeric_cleaning", columns=["amount"], remove_currency=True)
+    pipeline.add_cleaning_step("missing_values", strategy="Drop Rows")
+    pipeline.add_analysis("category", category_col="region", value_col="qty")
+    return pipeline
+
+
+@pytest.mark.parametrize("extension", [".json", ".yaml"])
+def test_spec_round_trip(csv_file, tmp_path, extension):
+    if extension == ".yaml" and not HAS_YAML:
+        pytest.skip("PyYAML is not installed")
+    pipeline = make_pipeline(csv_file)
+    path = str(tmp_path / f"spec{extension}")
+    pipeline.save(path)
+    assert Pipeline.load(path).to_dict() == pipeline.to_dict()
+
+
+def test_validate_spec_rejects_unknown_step(csv_file):
+    spec = make_pipeline(csv_file).to_dict()
+    spec["cleaning"].append({"step": "levitate"})
+    with pytest.raises(ValueError):
+        validate_spec(spec)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_replay_matches_cleaning_plan(csv_file, tmp_path, streaming):
+    pipeline = make_pipeline(csv_file, optimize=False, streaming=streaming, chunk_size=1_000)
+    path = str(tmp_path / "spec.json")
+    pipeline.save(path)
+    replayed = Pipeline.load(path).load_data(workers=1)
+
+    df = pd.read_csv(csv_file)
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns={"Region": "region"})
+    expected = CleaningPlan(pipeline.spec["cleaning"]).execute(df)
+    assert list(replayed.columns) == list(expected.columns)
+    assert 0 < len(replayed) == len(expected) < 5_200
+    for col in expected.columns:
+        np.testing.assert_array_equal(replayed[col].astype(str).to_numpy(), expected[col].astype(str).to_numpy())
+
+
+def test_spill_store_writes_mixed_type_columns(tmp_path):
+    store = SpillStore(str(tmp_path / "spill"))
+    # e.g. numbers with a text default filled into their gaps
+    store.append(pd.DataFrame({"price": pd.Series([1.5, "Unknown", None] * 1_000, dtype=object)}))
+    try:
+        values = store.to_frame()["price"]
+    finally:
+        store.cleanup()
+    assert values.isna().sum() == 1_000
+    assert values.dropna().tolist() == ["1.5", "Unknown"] * 1_000
+
+
+def test_parallel_reports_match_serial(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"region": rng.choice(["north", "south"], 2_000), "qty": rng.integers(0, 10, 2_000)},
+                      index=rng.permutation(2_000))
+    # Sparse indicators reach the workers beside the memory-mapped file
+    df = pd.concat([df, one_hot_frame(df["region"])], axis=1)
+    analyses = [{"type": "category", "category_col": "region", "value_col": "qty"},
+                {"type": "distribution", "column": "region_north"}]
+    outputs = {}
+    for workers in (1, 2):
+        settings = {"output_dir": str(tmp_path / str(workers)), "max_points": 5_000, "downsample_method": "lttb",
+                    "compress": False}
+        written, errors = write_reports(df, analyses, settings, workers=workers)
+        assert not errors
+        # Plot divs get random ids
+        outputs[workers] = sorted(re.sub(r"[0-9a-f]{8}(-[0-9a-f]{4}){3}-[0-9a-f]{12}", "",
+                                         open(path, encoding="utf-8").read()) for path in written)
+    assert outputs[1] == outputs[2]
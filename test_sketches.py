@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from sketches import BloomFilter, ColumnSketch, KMVSketch, hash_distinct_values
+
+
+def test_hashes_ignore_storage_type():
+    ints = pd.Series([1, 2, 3, 2])
+    floats = pd.Series([1.0, 2.0, None, 3.0])
+    np.testing.assert_array_equal(hash_distinct_values(ints), hash_distinct_values(floats))
+
+
+def test_kmv_exact_below_k():
+    series = pd.Series(np.arange(100).repeat(3))
+    assert KMVSketch.from_series(series).cardinality() == 100
+
+
+def test_kmv_estimate_close_to_nunique():
+    rng = np.random.default_rng(0)
+    series = pd.Series(rng.integers(0, 200_000, 1_000_000))
+    estimate = KMVSketch.from_series(series, k=1024).cardinality()
+    assert abs(estimate / series.nunique() - 1) < 0.1
+
+
+def test_bloom_has_no_false_negatives():
+    hashes = hash_distinct_values(pd.Series(np.arange(10_000)))
+    bloom = BloomFilter(hashes)
+    assert bloom.contains(hashes).all()
+    others = hash_distinct_values(pd.Series(np.arange(10_000, 20_000)))
+    # 10 bits per value and 7 hashes give about a 1% false positive rate
+    assert bloom.contains(others).mean() < 0.03
+
+
+def test_containment():
+    keys = pd.Series(np.arange(50_000))
+    references = pd.Series(np.r_[np.arange(0, 50_000, 2), np.arange(100_000, 125_000)])
+    key_sketch = ColumnSketch(keys, build_bloom=True)
+    containment = ColumnSketch(references).containment_in(key_sketch)
+    assert abs(containment - 0.5) < 0.1
+    assert ColumnSketch(keys.iloc[:1000]).containment_in(key_sketch) == 1.0
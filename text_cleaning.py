@@ -0,0 +1,123 @@
+import re
+import numpy as np
+import pandas as pd
+
+from type_detection import DEFAULT_TYPE_SAMPLE, stratified_positions, is_low_cardinality
+
+try:
+    import pyarrow  # noqa: F401  (backs pandas' Arrow string dtype)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+TEXT_CASES = ("No Change", "Lowercase", "Uppercase", "Title Case")
+# Plain string columns with fewer distinct values than this share of rows are cleaned on their distinct values
+REPEATED_VALUE_RATIO = 0.5
+
+# Anything but letters, digits and whitespace, and whitespace that is not a
+# single space. Arrow-backed strings run regexes in RE2, which spells letters
+# as \p{L}; the object fallback uses precompiled re patterns.
+SPECIAL_CHARS_RE2 = r"[^\p{L}\p{N}\s]"
+SPECIAL_CHARS = re.compile(r"[^\w\s]|_")
+EXTRA_SPACES_RE2 = r"\s+"
+EXTRA_SPACES = re.compile(r"\s+")
+UNUSUAL_SPACES_RE2 = r"\s\s|[^\S ]"
+UNUSUAL_SPACES = re.compile(r"\s\s|[^\S ]")
+# Above this share of matching values the replacement runs on the whole column
+SUBSET_REPLACE_RATIO = 0.5
+
+
+def is_text_column(series: pd.Series) -> bool:
+    """Whether a column holds strings (plain, Arrow-backed or as categories)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return pd.api.types.infer_dtype(series.cat.categories, skipna=True) == "string"
+    if isinstance(series.dtype, pd.StringDtype):
+        return True
+    if series.dtype == object:
+        # Mixed columns would lose their non-string values to the .str methods
+        return pd.api.types.infer_dtype(series, skipna=True) == "string"
+    return False
+
+
+def _is_arrow(series: pd.Series) -> bool:
+    return isinstance(series.dtype, pd.StringDtype) and series.dtype.storage == "pyarrow"
+
+
+def _replace(values: pd.Series, patterns: tuple, detect: tuple, repl: str) -> pd.Series:
+    """Regex replacement, run only on the values that ``detect`` matches.
+
+    ``patterns`` and ``detect`` are (RE2 string, compiled re) pairs; pandas
+    only hands plain pattern strings to Arrow's regex kernel. Matching is
+    much cheaper than replacing, and most values usually need no change.
+    """
+    arrow = _is_arrow(values)
+    pattern, detect = (patterns[0], detect[0]) if arrow else (patterns[1], detect[1])
+    matches = values.str.contains(detect, regex=True).fillna(False).to_numpy(dtype=bool)
+    if not matches.any():
+        return values
+    if matches.mean() > SUBSET_REPLACE_RATIO:
+        return values.str.replace(pattern, repl, regex=True)
+    positions = np.flatnonzero(matches)
+    values = values.copy()
+    values.iloc[positions] = values.iloc[positions].str.replace(pattern, repl, regex=True).to_numpy()
+    return values
+
+
+def clean_strings(values: pd.Series, strip: bool = False, collapse_spaces: bool = False,
+                  case: str = "No Change", remove_special: bool = False) -> pd.Series:
+    """Clean a Series of strings with whole-column string kernels.
+
+    Object columns are converted to Arrow-backed strings first when pyarrow
+    is installed, so every operation runs in Arrow's compute kernels
+    instead of a Python loop over the values.
+    """
+    if values.dtype == object and HAS_PYARROW:
+        values = values.astype(pd.StringDtype("pyarrow"))
+    if remove_special:
+        special = (SPECIAL_CHARS_RE2, SPECIAL_CHARS)
+        values = _replace(values, special, special, "")
+    if collapse_spaces:
+        values = _replace(values, (EXTRA_SPACES_RE2, EXTRA_SPACES), (UNUSUAL_SPACES_RE2, UNUSUAL_SPACES), " ")
+    if strip:
+        values = values.str.strip()
+    if case == "Lowercase":
+        values = values.str.lower()
+    elif case == "Uppercase":
+        values = values.str.upper()
+    elif case == "Title Case":
+        values = values.str.title()
+    elif case != "No Change":
+        raise ValueError(f"Unknown text case: {case}")
+    return values
+
+
+def clean_categorical(series: pd.Series, **options) -> pd.Series:
+    """Clean a categorical column by cleaning only its categories.
+
+    Categories that become equal after cleaning (" a" and "a") are merged
+    by remapping the codes, so the work does not depend on the row count.
+    """
+    cleaned = clean_strings(pd.Series(series.cat.categories), **options)
+    new_codes, categories = pd.factorize(cleaned)
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, new_codes[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=pd.Index(categories)),
+                     index=series.index, name=series.name)
+
+
+def clean_text(series: pd.Series, **options) -> pd.Series:
+    """A cleaned copy of a text column.
+
+    Categoricals are cleaned on their categories. Plain string columns that
+    repeat their values (judged from a sample) are factorized and cleaned
+    on their distinct values, which are then mapped back to the rows.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return clean_categorical(series, **options)
+    sample = series.iloc[stratified_positions(len(series), DEFAULT_TYPE_SAMPLE)]
+    if not is_low_cardinality(sample, len(series), REPEATED_VALUE_RATIO):
+        return clean_strings(series, **options)
+
+    codes, uniques = pd.factorize(series)
+    cleaned = clean_strings(pd.Series(uniques, dtype=series.dtype), **options)
+    return pd.Series(cleaned.array.take(codes, allow_fill=True), index=series.index, name=series.name)
@@ -0,0 +1,234 @@
+import warnings
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+DEFAULT_TYPE_SAMPLE = 10_000
+# Share of sampled non-null values that must parse for a column to count as dates
+DATE_PARSE_THRESHOLD = 0.95
+# Columns with fewer distinct values than this share of rows are categorical
+CATEGORICAL_RATIO = 0.1
+
+COMMON_DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%Y %H:%M",
+    "%d-%m-%Y",
+    "%m-%d-%Y",
+    "%d.%m.%Y",
+    "%d %b %Y",
+    "%b %d, %Y",
+    "%Y-%m",
+]
+
+
+def stratified_positions(n_rows: int, sample_size: int, seed: int = 0) -> np.ndarray:
+    """One random row position from each of ``sample_size`` equal strata of the rows."""
+    if n_rows <= sample_size:
+        return np.arange(n_rows)
+    edges = np.linspace(0, n_rows, sample_size + 1).astype(np.int64)
+    rng = np.random.default_rng(seed)
+    return edges[:-1] + (rng.random(sample_size) * np.diff(edges)).astype(np.int64)
+
+
+def parse_rate(values: pd.Series, date_format: str) -> float:
+    """Share of ``values`` (non-null strings) that parse with ``date_format``."""
+    if len(values) == 0:
+        return 0.0
+    parsed = pd.to_datetime(values, format=date_format, errors="coerce")
+    return float(parsed.notna().mean())
+
+
+def guess_date_format(values: pd.Series, threshold: float = DATE_PARSE_THRESHOLD) -> Optional[str]:
+    """Find a strftime format that parses at least ``threshold`` of the sampled strings.
+
+    pandas' guess for the first value is tried first, then the common formats.
+    Free-form parsing is never used, so numbers and ids are not read as dates.
+    """
+    values = values.dropna().astype(str)
+    if len(values) == 0:
+        return None
+
+    candidates = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        guessed = pd.tseries.api.guess_datetime_format(values.iloc[0])
+    if guessed:
+        candidates.append(guessed)
+    candidates.extend(fmt for fmt in COMMON_DATE_FORMATS if fmt != guessed)
+
+    # Formats that fail on the first values are not tried on the whole sample
+    probe = values.iloc[:100]
+    best_format, best_rate = None, 0.0
+    for date_format in candidates:
+        if parse_rate(probe, date_format) < threshold:
+            continue
+        rate = parse_rate(values, date_format)
+        if rate == 1.0:
+            return date_format
+        if rate > best_rate:
+            best_format, best_rate = date_format, rate
+    return best_format if best_rate >= threshold else None
+
+
+def parse_dates(values: pd.Series, date_format: Optional[str] = None) -> pd.Series:
+    """Parse a column as dates, each distinct value once.
+
+    Values that do not match ``date_format`` become NaT; without a format
+    pandas' own parsing is used. Date columns repeat their values heavily,
+    so parsing the distinct values and mapping them back to the rows is
+    much cheaper than parsing every row.
+    """
+    codes, uniques = pd.factorize(values)
+    if date_format is None:
+        parsed = pd.to_datetime(uniques)
+    else:
+        parsed = pd.to_datetime(uniques, format=date_format, errors="coerce")
+    dates = pd.DatetimeIndex(parsed).array.take(codes, allow_fill=True)
+    return pd.Series(dates, index=values.index, name=values.name)
+
+
+def is_low_cardinality(sample: pd.Series, n_rows: int, ratio: float = CATEGORICAL_RATIO) -> bool:
+    """Decide from a sample whether a column has fewer than ``ratio * n_rows`` distinct values.
+
+    A column with exactly ``d = ratio * n_rows`` evenly used values is expected
+    to show ``d * (1 - exp(-n / d))`` distinct values in a sample of ``n``
+    rows; seeing fewer than that means the column has fewer distinct values.
+    """
+    distinct = sample.nunique()
+    if len(sample) >= n_rows:
+        return distinct < n_rows * ratio
+    threshold = n_rows * ratio
+    return distinct < threshold * -np.expm1(-len(sample) / threshold)
+
+
+class ColumnTypeProfiler:
+    """Classify DataFrame columns as date, numeric, categorical or text.
+
+    Columns with a numeric, boolean or datetime dtype are classified from
+    their dtype alone, and categoricals from their categories (dates stored
+    as categories are dates, anything else is categorical). The remaining
+    (string) columns are
+    classified from one stratified row sample shared by all of them, with date
+    formats guessed per column. Results are cached per column; ``confirm``
+    re-checks a date column against all of its values when an analysis
+    actually depends on it, and ``to_datetime`` parses a column only once.
+    """
+
+    def __init__(self, df: pd.DataFrame, sample_size: int = DEFAULT_TYPE_SAMPLE):
+        self.df = df
+        self.sample_size = sample_size
+        self.profiles: Dict[str, Dict] = {}
+        self.parsed: Dict[str, pd.Series] = {}
+
+    def profile(self, columns: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Return {column: {'type', 'date_format', 'confirmed'}} for the given (or all) columns."""
+        columns = list(self.df.columns) if columns is None else columns
+        pending = [col for col in columns if self._cached(col) is None]
+
+        string_columns = []
+        for col in pending:
+            dtype = self.df[col].dtype
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                self._store(col, 'date', confirmed=True)
+            elif pd.api.types.is_bool_dtype(dtype):
+                self._store(col, 'categorical', confirmed=True)
+            elif isinstance(dtype, pd.CategoricalDtype):
+                self._classify_categories(col)
+            elif pd.api.types.is_numeric_dtype(dtype):
+                self._store(col, 'numeric', confirmed=True)
+            else:
+                string_columns.append(col)
+
+        if string_columns:
+            # One row sample shared by every column that needs a look at its values
+            positions = stratified_positions(len(self.df), self.sample_size)
+            sample = self.df[string_columns].iloc[positions]
+            for col in string_columns:
+                self._classify_strings(col, sample[col])
+
+        return {col: self.profiles[col] for col in columns}
+
+    def column_type(self, col: str) -> str:
+        return self.profile([col])[col]['type']
+
+    def date_format(self, col: str) -> Optional[str]:
+        return self.profile([col])[col]['date_format']
+
+    def confirm(self, col: str) -> Dict:
+        """Check a sampled date classification against the full column.
+
+        Parses every distinct value with the guessed format once; if too few
+        parse, the column is reclassified from its values.
+        """
+        profile = self.profile([col])[col]
+        if profile['confirmed'] or profile['type'] != 'date':
+            return profile
+
+        values = pd.Series(self.df[col].dropna().unique()).astype(str)
+        if parse_rate(values, profile['date_format']) >= DATE_PARSE_THRESHOLD:
+            profile['confirmed'] = True
+        else:
+            self.profiles[col] = self._text_or_categorical(col, self.df[col])
+            profile = self.profiles[col]
+            profile['confirmed'] = True
+        return profile
+
+    def to_datetime(self, col: str) -> pd.Series:
+        """Parse a column as dates using its cached format.
+
+        Values that do not match a guessed format become NaT; columns without
+        a guessed format fall back to pandas' own parsing. The parsed column
+        is cached, so analyses sharing a date column parse it once.
+        """
+        series = self.df[col]
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return series
+        date_format = self.date_format(col)
+        if col not in self.parsed:
+            self.parsed[col] = parse_dates(series, date_format)
+        return self.parsed[col]
+
+    def _cached(self, col: str) -> Optional[Dict]:
+        profile = self.profiles.get(col)
+        # A column replaced with a different dtype needs a fresh profile
+        if profile is not None and profile['dtype'] != self.df[col].dtype:
+            self.parsed.pop(col, None)
+            return None
+        return profile
+
+    def _store(self, col: str, col_type: str, date_format: Optional[str] = None,
+               confirmed: bool = False) -> None:
+        self.profiles[col] = {'type': col_type, 'date_format': date_format,
+                              'confirmed': confirmed, 'dtype': self.df[col].dtype}
+
+    def _classify_categories(self, col: str) -> None:
+        # Optimized frames store repetitive date strings as categories
+        categories = pd.Series(self.df[col].cat.categories)
+        date_format = None
+        if pd.api.types.is_string_dtype(categories.dtype):
+            date_format = guess_date_format(categories.iloc[stratified_positions(len(categories), self.sample_size)])
+        if date_format is not None:
+            self._store(col, 'date', date_format=date_format, confirmed=len(categories) <= self.sample_size)
+        else:
+            self._store(col, 'categorical', confirmed=True)
+
+    def _classify_strings(self, col: str, sample: pd.Series) -> None:
+        values = sample.dropna()
+        date_format = guess_date_format(values) if len(values) else None
+        if date_format is not None:
+            self._store(col, 'date', date_format=date_format,
+                        confirmed=len(self.df) <= self.sample_size)
+        else:
+            self.profiles[col] = self._text_or_categorical(col, sample)
+
+    def _text_or_categorical(self, col: str, values: pd.Series) -> Dict:
+        col_type = 'categorical' if is_low_cardinality(values, len(self.df)) else 'text'
+        return {'type': col_type, 'date_format': None, 'confirmed': len(values) >= len(self.df),
+                'dtype': self.df[col].dtype}
@@ -1,24 +1,40 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
-import plotly.graph_objects as go
 import plotly.express as px
-import plotly.subplots as sp
 import webbrowser
 import os
-import numpy as np
 from datetime import datetime
-
-class VisualizationConfig:
-    def __init__(self, root, df):
+from jobs import BackgroundJob
+from analysis import ReportGenerator
+
+# Analysis names shown in the window -> ReportGenerator analysis names
+ANALYSIS_NAMES = {
+    "Time Series Analysis": "time_series",
+    "Category Analysis": "category",
+    "Correlation Analysis": "correlation",
+    "Distribution Analysis": "distribution",
+    "Comparative Analysis": "comparative",
+    "Trend Analysis": "trend"
+}
+
+class VisualizationConfig(ReportGenerator):
+    """Tk configuration window for the reports built by ReportGenerator.
+
+    Generated analyses are recorded in ``pipeline``, if one is given.
+    """
+
+    def __init__(self, root, df, pipeline=None):
+        super().__init__(df)
         self.root = root
-        self.df = df
+        self.pipeline = pipeline
         self.config_window = None
         self.selected_columns = []
         self.analysis_type = None
         self.date_column = None
         self.value_column = None
         self.category_column = None
+        self.status_label = None
+        self.job = None
 
     def show_config_window(self):
         """Show the configuration window for visualization settings."""
@@ -77,7 +93,7 @@ class VisualizationConfig:
         # Cancel Button
         cancel_button = tk.Button(button_frame, 
                                 text="Cancel", 
-                                command=self.config_window.destroy,
+                                command=self.cancel,
                                 bg="#f44336", 
                                 fg="white", 
                                 font=("Arial", 11), 
@@ -85,6 +101,12 @@ class VisualizationConfig:
                                 pady=5)
         cancel_button.pack(side="left", padx=10)
 
+        # Status bar
+        status_frame = tk.Frame(self.config_window, bg="#007BFF", height=25)
+        status_frame.pack(fill="x", side="bottom")
+        self.status_label = tk.Label(status_frame, text="Ready", fg="white", bg="#007BFF", anchor="w")
+        self.status_label.pack(fill="x", padx=10)
+
     def show_customization_options(self):
         """Show the customization options for advanced users."""
         # Clear the current window
@@ -110,6 +132,29 @@ class VisualizationConfig:
         self.column_frame = tk.Frame(self.config_window, bg="#f0f0f0")
         self.column_frame.pack(fill="x", pady=10)
 
+        # Point budget for line and scatter traces
+        points_frame = tk.Frame(self.config_window, bg="#f0f0f0")
+        points_frame.pack(fill="x", pady=5)
+        tk.Label(points_frame, text="Max Points per Trace:", bg="#f0f0f0").pack(side="left")
+        self.max_points_var = tk.IntVar(value=self.max_points)
+        tk.Spinbox(points_frame, from_=100, to=1000000, increment=1000, textvariable=self.max_points_var,
+                   width=10).pack(side="left", padx=5)
+        tk.Label(points_frame, text="Downsampling:", bg="#f0f0f0").pack(side="left", padx=(15, 0))
+        self.downsample_combo = ttk.Combobox(points_frame, values=["LTTB", "Min/Max"], state="readonly", width=10)
+        self.downsample_combo.set("LTTB" if self.downsample_method == "lttb" else "Min/Max")
+        self.downsample_combo.pack(side="left", padx=5)
+
+        # Generate Button
+        generate_button = tk.Button(self.config_window, 
+                                  text="Generate Analysis", 
+                                  command=self.generate_analysis,
+                                  bg="#4CAF50", 
+                                  fg="white", 
+                                  font=("Arial", 11), 
+                                  padx=15, 
+                                  pady=5)
+        generate_button.pack(anchor="w", pady=10)
+
     def update_column_selection(self, event=None):
         """Update the column selection interface based on the analysis type."""
         # Clear previous widgets
@@ -164,6 +209,12 @@ class VisualizationConfig:
             self.correlation_listbox.insert(tk.END, col)
         self.correlation_listbox.pack(fill="x", pady=5)
 
+        tk.Label(self.column_frame, text="Method:", bg="#f0f0f0").pack(anchor="w")
+        self.correlation_method_combo = ttk.Combobox(self.column_frame, values=["Pearson", "Spearman"],
+                                                    state="readonly", width=40)
+        self.correlation_method_combo.set("Pearson")
+        self.correlation_method_combo.pack(fill="x", pady=5)
+
     def setup_distribution_selection(self):
         """Setup interface for distribution analysis."""
         tk.Label(self.column_frame, text="Select Column:", bg="#f0f0f0").pack(anchor="w")
@@ -209,493 +260,110 @@ class VisualizationConfig:
             if not os.path.exists('visualizations'):
                 os.makedirs('visualizations')
 
-            # Generate the appropriate analysis
-            if analysis_type == "Time Series Analysis":
-                self.generate_time_series_analysis()
-            elif analysis_type == "Category Analysis":
-                self.generate_category_analysis()
-            elif analysis_type == "Correlation Analysis":
-                self.generate_correlation_analysis()
-            elif analysis_type == "Distribution Analysis":
-                self.generate_distribution_analysis()
-            elif analysis_type == "Comparative Analysis":
-                self.generate_comparative_analysis()
-            elif analysis_type == "Trend Analysis":
-                self.generate_trend_analysis()
-
-            messagebox.showinfo("Success", "Analysis generated and opened in your browser")
-            self.config_window.destroy()
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate analysis: {str(e)}")
-
-    def generate_time_series_analysis(self):
-        """Generate time series analysis with multiple visualizations."""
-        date_col = self.date_combo.get()
-        value_col = self.value_combo.get()
-        
-        if not date_col or not value_col:
-            messagebox.showerror("Error", "Please select both date and value columns")
-            return
+            # Read the selections here; the worker thread must not touch Tk widgets
+            selection = self.get_analysis_selection(analysis_type)
+            if selection is None:
+                return
+            self.max_points = max(int(self.max_points_var.get()), 3)
+            self.downsample_method = "lttb" if self.downsample_combo.get() == "LTTB" else "minmax"
 
-        # Convert date column to datetime
-        df = self.df.copy()
-        df[date_col] = pd.to_datetime(df[date_col])
-        
-        # Create subplots
-        fig = sp.make_subplots(rows=2, cols=2, 
-                              subplot_titles=("Time Series", "Monthly Trend", 
-                                            "Yearly Trend", "Moving Average"))
-
-        # Time Series Plot
-        fig.add_trace(
-            go.Scatter(x=df[date_col], y=df[value_col], mode='lines+markers', name='Time Series'),
-            row=1, col=1
-        )
-
-        # Monthly Trend
-        monthly = df.groupby(df[date_col].dt.to_period('M'))[value_col].mean()
-        fig.add_trace(
-            go.Bar(x=monthly.index.astype(str), y=monthly.values, name='Monthly Average'),
-            row=1, col=2
-        )
-
-        # Yearly Trend
-        yearly = df.groupby(df[date_col].dt.year)[value_col].mean()
-        fig.add_trace(
-            go.Bar(x=yearly.index, y=yearly.values, name='Yearly Average'),
-            row=2, col=1
-        )
-
-        # Moving Average
-        window = 7
-        df['MA'] = df[value_col].rolling(window=window).mean()
-        fig.add_trace(
-            go.Scatter(x=df[date_col], y=df['MA'], mode='lines', name=f'{window}-day MA'),
-            row=2, col=2
-        )
-
-        # Update layout
-        fig.update_layout(height=800, width=1200, title_text="Time Series Analysis")
-        
-        # Save and open
-        output_file = f'visualizations/time_series_analysis.html'
-        fig.write_html(output_file)
-        webbrowser.open('file://' + os.path.abspath(output_file))
+            name = ANALYSIS_NAMES[analysis_type]
 
-    def generate_category_analysis(self):
-        """Generate category analysis with multiple visualizations."""
-        category_col = self.category_combo.get()
-        value_col = self.value_combo.get()
-        
-        if not category_col or not value_col:
-            messagebox.showerror("Error", "Please select both category and value columns")
-            return
-
-        # Create subplots
-        fig = sp.make_subplots(rows=2, cols=2, 
-                              subplot_titles=("Category Distribution", "Category Comparison",
-                                            "Top Categories", "Category Statistics"))
-
-        # Category Distribution
-        fig.add_trace(
-            go.Bar(x=self.df[category_col].value_counts().index,
-                  y=self.df[category_col].value_counts().values,
-                  name='Distribution'),
-            row=1, col=1
-        )
-
-        # Category Comparison
-        category_means = self.df.groupby(category_col)[value_col].mean()
-        fig.add_trace(
-            go.Bar(x=category_means.index, y=category_means.values, name='Mean Values'),
-            row=1, col=2
-        )
-
-        # Top Categories
-        top_categories = self.df.groupby(category_col)[value_col].sum().nlargest(10)
-        fig.add_trace(
-            go.Bar(x=top_categories.index, y=top_categories.values, name='Top Categories'),
-            row=2, col=1
-        )
-
-        # Category Statistics
-        stats = self.df.groupby(category_col)[value_col].agg(['mean', 'std', 'min', 'max'])
-        fig.add_trace(
-            go.Box(x=self.df[category_col], y=self.df[value_col], name='Statistics'),
-            row=2, col=2
-        )
-
-        # Update layout
-        fig.update_layout(height=800, width=1200, title_text="Category Analysis")
-        
-        # Save and open
-        output_file = f'visualizations/category_analysis.html'
-        fig.write_html(output_file)
-        webbrowser.open('file://' + os.path.abspath(output_file))
+            def on_generated(output_file):
+                self.record_analysis(name, **selection)
+                self.on_analysis_generated(output_file)
 
-    def generate_correlation_analysis(self):
-        """Generate correlation analysis."""
-        selected_indices = self.correlation_listbox.curselection()
-        if not selected_indices:
-            messagebox.showerror("Error", "Please select at least two numeric columns")
-            return
-
-        selected_columns = [self.correlation_listbox.get(i) for i in selected_indices]
-        if len(selected_columns) < 2:
-            messagebox.showerror("Error", "Please select at least two numeric columns")
-            return
-
-        # Calculate correlation matrix
-        corr_matrix = self.df[selected_columns].corr()
-
-        # Create correlation heatmap
-        fig = go.Figure(data=go.Heatmap(
-            z=corr_matrix,
-            x=selected_columns,
-            y=selected_columns,
-            colorscale='RdBu',
-            zmin=-1,
-            zmax=1
-        ))
-
-        # Update layout
-        fig.update_layout(
-            title='Correlation Analysis',
-            height=800,
-            width=1200
-        )
-
-        # Save and open
-        output_file = f'visualizations/correlation_analysis.html'
-        fig.write_html(output_file)
-        webbrowser.open('file://' + os.path.abspath(output_file))
+            # Generate the appropriate analysis in the background
+            self.run_job(lambda job: self.generate(name, **selection),
+                         on_success=on_generated,
+                         error_message="Failed to generate analysis",
+                         message=f"Generating {analysis_type}...")
 
-    def generate_distribution_analysis(self):
-        """Generate distribution analysis."""
-        column = self.distribution_combo.get()
-        if not column:
-            messagebox.showerror("Error", "Please select a numeric column")
-            return
-
-        # Create subplots
-        fig = sp.make_subplots(rows=2, cols=2, 
-                              subplot_titles=("Histogram", "Box Plot",
-                                            "Density Plot", "Q-Q Plot"))
-
-        # Histogram
-        fig.add_trace(
-            go.Histogram(x=self.df[column], name='Histogram'),
-            row=1, col=1
-        )
-
-        # Box Plot
-        fig.add_trace(
-            go.Box(y=self.df[column], name='Box Plot'),
-            row=1, col=2
-        )
-
-        # Density Plot
-        fig.add_trace(
-            go.Histogram(x=self.df[column], histnorm='probability density', name='Density'),
-            row=2, col=1
-        )
-
-        # Q-Q Plot
-        sorted_data = np.sort(self.df[column].dropna())
-        theoretical_quantiles = np.percentile(sorted_data, np.linspace(0, 100, len(sorted_data)))
-        fig.add_trace(
-            go.Scatter(x=theoretical_quantiles, y=sorted_data, mode='markers', name='Q-Q Plot'),
-            row=2, col=2
-        )
-
-        # Update layout
-        fig.update_layout(height=800, width=1200, title_text="Distribution Analysis")
-        
-        # Save and open
-        output_file = f'visualizations/distribution_analysis.html'
-        fig.write_html(output_file)
-        webbrowser.open('file://' + os.path.abspath(output_file))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to generate analysis: {str(e)}")
 
-    def generate_comparative_analysis(self):
-        """Generate comparative analysis."""
-        category_col = self.category_combo.get()
-        value_col = self.value_combo.get()
-        
-        if not category_col or not value_col:
-            messagebox.showerror("Error", "Please select both category and value columns")
-            return
-
-        # Create subplots
-        fig = sp.make_subplots(rows=2, cols=2, 
-                              subplot_titles=("Category Comparison", "Category Distribution",
-                                            "Category Statistics", "Category Trends"))
-
-        # Category Comparison
-        category_means = self.df.groupby(category_col)[value_col].mean()
-        fig.add_trace(
-            go.Bar(x=category_means.index, y=category_means.values, name='Mean Values'),
-            row=1, col=1
-        )
-
-        # Category Distribution
-        fig.add_trace(
-            go.Box(x=self.df[category_col], y=self.df[value_col], name='Distribution'),
-            row=1, col=2
-        )
-
-        # Category Statistics
-        stats = self.df.groupby(category_col)[value_col].agg(['mean', 'std', 'min', 'max'])
-        fig.add_trace(
-            go.Table(
-                header=dict(values=['Category'] + list(stats.columns)),
-                cells=dict(values=[stats.index] + [stats[col] for col in stats.columns])
-            ),
-            row=2, col=1
-        )
-
-        # Category Trends
-        if pd.api.types.is_datetime64_any_dtype(self.df[category_col]):
-            trend = self.df.groupby(category_col)[value_col].mean()
-            fig.add_trace(
-                go.Scatter(x=trend.index, y=trend.values, mode='lines+markers', name='Trend'),
-                row=2, col=2
-            )
-
-        # Update layout
-        fig.update_layout(height=800, width=1200, title_text="Comparative Analysis")
-        
-        # Save and open
-        output_file = f'visualizations/comparative_analysis.html'
-        fig.write_html(output_file)
-        webbrowser.open('file://' + os.path.abspath(output_file))
-
-    def generate_trend_analysis(self):
-        """Generate trend analysis."""
-        date_col = self.date_combo.get()
-        value_col = self.value_combo.get()
-        
-        if not date_col or not value_col:
-            messagebox.showerror("Error", "Please select both date and value columns")
-            return
-
-        # Convert date column to datetime
-        df = self.df.copy()
-        df[date_col] = pd.to_datetime(df[date_col])
-        
-        # Create subplots
-        fig = sp.make_subplots(rows=2, cols=2, 
-                              subplot_titles=("Trend Line", "Seasonal Decomposition",
-                                            "Moving Average", "Trend Statistics"))
-
-        # Trend Line
-        fig.add_trace(
-            go.Scatter(x=df[date_col], y=df[value_col], mode='lines+markers', name='Trend'),
-            row=1, col=1
-        )
-
-        # Seasonal Decomposition
-        # Calculate moving average
-        window = 12
-        df['MA'] = df[value_col].rolling(window=window).mean()
-        fig.add_trace(
-            go.Scatter(x=df[date_col], y=df['MA'], mode='lines', name='Seasonal'),
-            row=1, col=2
-        )
-
-        # Moving Average
-        window = 7
-        df['MA'] = df[value_col].rolling(window=window).mean()
-        fig.add_trace(
-            go.Scatter(x=df[date_col], y=df['MA'], mode='lines', name=f'{window}-day MA'),
-            row=2, col=1
-        )
-
-        # Trend Statistics
-        stats = df[value_col].describe()
-        fig.add_trace(
-            go.Table(
-                header=dict(values=['Statistic', 'Value']),
-                cells=dict(values=[stats.index, stats.values])
-            ),
-            row=2, col=2
-        )
-
-        # Update layout
-        fig.update_layout(height=800, width=1200, title_text="Trend Analysis")
-        
-        # Save and open
-        output_file = f'visualizations/trend_analysis.html'
-        fig.write_html(output_file)
+    def get_analysis_selection(self, analysis_type):
+        """Read the column selections for an analysis type, or None if incomplete."""
+        if analysis_type in ("Time Series Analysis", "Trend Analysis"):
+            date_col = self.date_combo.get()
+            value_col = self.value_combo.get()
+            if not date_col or not value_col:
+                messagebox.showerror("Error", "Please select both date and value columns")
+                return None
+            return {'date_col': date_col, 'value_col': value_col}
+
+        if analysis_type in ("Category Analysis", "Comparative Analysis"):
+            category_col = self.category_combo.get()
+            value_col = self.value_combo.get()
+            if not category_col or not value_col:
+                messagebox.showerror("Error", "Please select both category and value columns")
+                return None
+            return {'category_col': category_col, 'value_col': value_col}
+
+        if analysis_type == "Correlation Analysis":
+            selected_columns = [self.correlation_listbox.get(i) for i in self.correlation_listbox.curselection()]
+            if len(selected_columns) < 2:
+                messagebox.showerror("Error", "Please select at least two numeric columns")
+                return None
+            return {'selected_columns': selected_columns,
+                    'method': self.correlation_method_combo.get().lower()}
+
+        if analysis_type == "Distribution Analysis":
+            column = self.distribution_combo.get()
+            if not column:
+                messagebox.showerror("Error", "Please select a numeric column")
+                return None
+            return {'column': column}
+
+        messagebox.showerror("Error", f"Unknown analysis type: {analysis_type}")
+        return None
+
+    def run_job(self, func, on_success, error_message, message="Working..."):
+        """Run func on a worker thread, reporting its state in the status label."""
+        def set_status(text):
+            if self.status_label is not None and self.status_label.winfo_exists():
+                self.status_label.config(text=text)
+
+        def on_error(e):
+            set_status("Ready")
+            messagebox.showerror("Error", f"{error_message}: {str(e)}")
+
+        def on_done(result):
+            set_status("Ready")
+            on_success(result)
+
+        set_status(message)
+        self.job = BackgroundJob(self.root, func, on_success=on_done, on_error=on_error,
+                                 on_progress=lambda text, fraction: set_status(text),
+                                 on_cancel=lambda: set_status("Cancelled")).start()
+
+    def record_analysis(self, name, **kwargs):
+        """Add a generated analysis, with its report settings, to the pipeline."""
+        if self.pipeline is not None:
+            self.pipeline.set_report_settings(max_points=self.max_points,
+                                              downsample_method=self.downsample_method)
+            self.pipeline.add_analysis(name, **kwargs)
+
+    def on_analysis_generated(self, output_file):
+        """Open a finished analysis in the browser (runs on the Tk thread)."""
         webbrowser.open('file://' + os.path.abspath(output_file))
+        messagebox.showinfo("Success", "Analysis generated and opened in your browser")
+        if self.config_window is not None and self.config_window.winfo_exists():
+            self.config_window.destroy()
 
-    def detect_data_types(self):
-        """Automatically detect column types and patterns in the data."""
-        self.column_types = {
-            'date_columns': [],
-            'numeric_columns': [],
-            'categorical_columns': [],
-            'text_columns': []
-        }
-        
-        # Detect column types
-        for col in self.df.columns:
-            # Try to detect date columns
-            try:
-                pd.to_datetime(self.df[col])
-                self.column_types['date_columns'].append(col)
-            except:
-                # Check if numeric
-                if pd.api.types.is_numeric_dtype(self.df[col]):
-                    self.column_types['numeric_columns'].append(col)
-                # Check if categorical (few unique values)
-                elif self.df[col].nunique() < len(self.df) * 0.1:  # Less than 10% unique values
-                    self.column_types['categorical_columns'].append(col)
-                else:
-                    self.column_types['text_columns'].append(col)
-        
-        # Find potential relationships
-        self.relationships = {
-            'time_series': [],
-            'category_analysis': [],
-            'correlation_pairs': []
-        }
-        
-        # Find time series relationships
-        for date_col in self.column_types['date_columns']:
-            for num_col in self.column_types['numeric_columns']:
-                self.relationships['time_series'].append((date_col, num_col))
-        
-        # Find category analysis relationships
-        for cat_col in self.column_types['categorical_columns']:
-            for num_col in self.column_types['numeric_columns']:
-                self.relationships['category_analysis'].append((cat_col, num_col))
-        
-        # Find correlation pairs
-        for i, num_col1 in enumerate(self.column_types['numeric_columns']):
-            for num_col2 in self.column_types['numeric_columns'][i+1:]:
-                correlation = self.df[num_col1].corr(self.df[num_col2])
-                if abs(correlation) > 0.3:  # Significant correlation
-                    self.relationships['correlation_pairs'].append((num_col1, num_col2, correlation))
-        
-        return self.column_types, self.relationships 
+    def cancel(self):
+        """Cancel any running analysis and close the configuration window."""
+        if self.job is not None and self.job.running:
+            self.job.cancel()
+        self.config_window.destroy()
 
     def generate_smart_dashboard(self):
         """Generate an automatic analysis dashboard based on detected data patterns."""
-        try:
-            # Create visualization directory if it doesn't exist
-            if not os.path.exists('visualizations'):
-                os.makedirs('visualizations')
-                
-            # Detect data types and relationships
-            self.detect_data_types()
-            
-            # Create a dashboard with multiple subplots
-            fig = sp.make_subplots(
-                rows=3, cols=2,
-                specs=[
-                    [{"type": "table"}, {"type": "xy"}],
-                    [{"type": "xy"}, {"type": "xy"}],
-                    [{"type": "xy"}, {"type": "table"}]
-                ],
-                subplot_titles=(
-                    "Data Overview", "Key Trends",
-                    "Category Analysis", "Distribution Analysis",
-                    "Correlation Analysis", "Insights"
-                )
-            )
-            
-            # 1. Data Overview (Table)
-            overview_data = {
-                'Column': list(self.df.columns),
-                'Type': [],
-                'Unique Values': [],
-                'Missing Values': []
-            }
-            
-            for col in self.df.columns:
-                col_type = 'Numeric' if col in self.column_types['numeric_columns'] else \
-                          'Date' if col in self.column_types['date_columns'] else \
-                          'Category' if col in self.column_types['categorical_columns'] else 'Text'
-                overview_data['Type'].append(col_type)
-                overview_data['Unique Values'].append(self.df[col].nunique())
-                overview_data['Missing Values'].append(self.df[col].isnull().sum())
-                
-            fig.add_trace(
-                go.Table(
-                    header=dict(values=list(overview_data.keys())),
-                    cells=dict(values=list(overview_data.values()))
-                ),
-                row=1, col=1
-            )
-            
-            # 2. Key Trends (Time Series if available)
-            if self.relationships['time_series']:
-                date_col, value_col = self.relationships['time_series'][0]
-                df = self.df.copy()
-                df[date_col] = pd.to_datetime(df[date_col])
-                monthly = df.groupby(df[date_col].dt.to_period('M'))[value_col].mean()
-                
-                fig.add_trace(
-                    go.Scatter(x=monthly.index.astype(str), y=monthly.values, mode='lines+markers'),
-                    row=1, col=2
-                )
-            
-            # 3. Category Analysis
-            if self.relationships['category_analysis']:
-                cat_col, value_col = self.relationships['category_analysis'][0]
-                top_categories = self.df.groupby(cat_col)[value_col].mean().nlargest(10)
-                
-                fig.add_trace(
-                    go.Bar(x=top_categories.index, y=top_categories.values),
-                    row=2, col=1
-                )
-            
-            # 4. Distribution Analysis
-            if self.column_types['numeric_columns']:
-                num_col = self.column_types['numeric_columns'][0]
-                fig.add_trace(
-                    go.Histogram(x=self.df[num_col], name='Distribution'),
-                    row=2, col=2
-                )
-            
-            # 5. Correlation Analysis
-            if self.relationships['correlation_pairs']:
-                num_col1, num_col2, _ = self.relationships['correlation_pairs'][0]
-                fig.add_trace(
-                    go.Scatter(x=self.df[num_col1], y=self.df[num_col2], mode='markers'),
-                    row=3, col=1
-                )
-            
-            # 6. Insights (Text)
-            insights = []
-            if self.relationships['time_series']:
-                insights.append("Time series data detected. Consider analyzing trends over time.")
-            if self.relationships['category_analysis']:
-                insights.append("Categorical data found. Look for patterns across different categories.")
-            if self.relationships['correlation_pairs']:
-                insights.append("Strong correlations detected between numeric columns.")
-            
-            fig.add_trace(
-                go.Table(
-                    header=dict(values=['Key Insights']),
-                    cells=dict(values=[insights])
-                ),
-                row=3, col=2
-            )
-            
-            # Update layout
-            fig.update_layout(
-                height=1200,
-                width=1600,
-                title_text="Automatic Data Analysis Dashboard",
-                showlegend=False
-            )
-            
-            # Save and open
-            output_file = 'visualizations/smart_dashboard.html'
-            fig.write_html(output_file)
+        def on_generated(output_file):
+            self.record_analysis("dashboard")
             webbrowser.open('file://' + os.path.abspath(output_file))
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate dashboard: {str(e)}") 
\ No newline at end of file
+
+        self.run_job(lambda job: self.build_smart_dashboard(),
+                     on_success=on_generated,
+                     error_message="Failed to generate dashboard",
+                     message="Generating smart dashboard...")